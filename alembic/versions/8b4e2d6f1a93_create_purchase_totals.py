@@ -0,0 +1,46 @@
+"""Create purchase_totals
+
+Revision ID: 8b4e2d6f1a93
+Revises: 3f1c9a7e5b21
+Create Date: 2026-10-18 14:03:27.518204
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "8b4e2d6f1a93"
+down_revision: Union[str, None] = "3f1c9a7e5b21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "purchase_totals",
+        sa.Column("company_code", sa.String(), nullable=False),
+        sa.Column("total_amount", sa.BigInteger(), nullable=False),
+        sa.Column("id", sa.Uuid(), server_default=sa.text("gen_random_uuid()"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("updated_at", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("company_code"),
+    )
+    op.create_index(op.f("ix_purchases_company_code"), "purchases", ["company_code"], unique=False)
+    op.execute(
+        """
+        INSERT INTO purchase_totals (company_code, total_amount, created_at, updated_at)
+        SELECT company_code, sum(amount), now(), now()
+        FROM purchases
+        GROUP BY company_code
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f("ix_purchases_company_code"), table_name="purchases")
+    op.drop_table("purchase_totals")
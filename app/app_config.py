@@ -1,18 +1,84 @@
+import importlib.util
 from functools import lru_cache
-from typing import Annotated
+from typing import Annotated, Literal, Self
 
 from fastapi import Depends
+from pydantic import field_validator, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     polygon_api_key: str
     polygon_base_url: str = "https://api.polygon.io"
+    polygon_max_connections: int = 100
+    polygon_max_keepalive_connections: int = 20
+    polygon_keepalive_expiry: float = 30.0
+    polygon_timeout: float = 10.0
+    polygon_http2: bool = False
     marketwatch_base_url: str = "https://www.marketwatch.com"
+    marketwatch_page_freshness_time: int = 60
+    marketwatch_page_cache_max_bytes: int = 4 * 1024 * 1024
+    page_archive_enabled: bool = False
+    page_archive_dir: str = "./data/page_archive"
+    page_archive_max_age: int = 604800
+    page_archive_seed_max_age: int = 3600
+    marketwatch_http_fetch_enabled: bool = True
+    marketwatch_http_timeout: float = 10.0
+    marketwatch_page_ready_timeout: float = 5.0
+    marketwatch_extractor: Literal["strained", "full"] = "strained"
+    marketwatch_html_parser: str = ""
+    marketwatch_pacing_initial_interval: float = 2.0
+    marketwatch_pacing_min_interval: float = 0.5
+    marketwatch_pacing_max_interval: float = 60.0
+    marketwatch_pacing_backoff_factor: float = 2.0
+    marketwatch_pacing_recovery_step: float = 0.1
+    marketwatch_pacing_target_captcha_rate: float = 0.05
+    marketwatch_pacing_window: int = 20
     remote_chrome_webdriver_address: str = "http://chrome:4444"
     selenium_headless_mode: bool = True
+    webdriver_pool_size: int = 2
+    webdriver_pool_max_uses: int = 50
+    webdriver_pool_max_age: int = 1800
+    cookie_store_backend: Literal["redis", "memory"] = "redis"
+    cookie_store_ttl: int = 86400
+    scraper_max_workers: int = 2
+    scraper_max_queue_depth: int = 16
+    scraper_queue_timeout: float = 30.0
     redis_url: str = "redis://cache"
-    default_caching_time: int = 60
+    cache_memory_max_entries: int = 1024
+    cache_memory_max_bytes: int = 16 * 1024 * 1024
+    cache_memory_ttl: int = 10
+    cache_invalidation_channel: str = "fastapi-cache:invalidate"
+    cache_stale_time: int = 300
+    cache_open_close_time: int = 60
+    cache_marketwatch_page_time: int = 3600
+    cache_company_name_time: int = 604800
+    cache_final_data_time: int = 31536000
+    cache_not_found_time: int = 300
+    cache_invalid_symbol_time: int = 86400
+    cache_upstream_failure_time: int = 5
+    cache_lock_timeout: float = 65.0
+    cache_lock_poll_interval: float = 0.1
+    cache_warmer_enabled: bool = True
+    cache_warmer_interval: int = 300
+    cache_warmer_lead_time: int = 600
+    cache_warmer_watchlist: list[str] = []
+    cache_warmer_top_symbols: int = 500
+    cache_warmer_rate: float = 2.0
+    cache_warmer_reserved_workers: int = 1
+    scrape_job_ttl: int = 3600
+    scrape_job_max_queue_depth: int = 1000
+    scrape_job_poll_timeout: int = 5
+    scrape_job_lease_timeout: int = 30
+    scrape_worker_concurrency: int = 4
+    stock_aggregation_timeout: float = 60.0
+    batch_max_symbols: int = 200
+    batch_max_concurrency: int = 8
+    purchase_bulk_max_rows: int = 100000
+    purchase_bulk_max_json_bytes: int = 16777216
+    purchase_group_commit_enabled: bool = False
+    purchase_group_commit_max_batch: int = 500
+    purchase_group_commit_interval: float = 0.005
     postgres_drivername: str = "postgresql+asyncpg"
     postgres_username: str = "postgres"
     postgres_password: str = "password"
@@ -22,6 +88,27 @@ class Settings(BaseSettings):
 
     model_config = SettingsConfigDict(env_file=".env")
 
+    @field_validator("polygon_http2")
+    @classmethod
+    def check_http2_support(cls, polygon_http2: bool) -> bool:
+        """Fails at startup, rather than when the Polygon client is created, if HTTP/2 is enabled without `h2`."""
+        if polygon_http2 and importlib.util.find_spec("h2") is None:
+            raise ValueError("POLYGON_HTTP2 requires the h2 package, install it with `pip install httpx[http2]`")
+        return polygon_http2
+
+    @model_validator(mode="after")
+    def check_webdriver_pool_size(self) -> Self:
+        """Fails at startup if a scraper worker could be admitted and then wait for a WebDriver session.
+
+        That wait happens after admission, so it would not be bounded by `scraper_queue_timeout`.
+        """
+        if self.webdriver_pool_size < self.scraper_max_workers:
+            raise ValueError(
+                f"WEBDRIVER_POOL_SIZE ({self.webdriver_pool_size}) must be at least "
+                f"SCRAPER_MAX_WORKERS ({self.scraper_max_workers})"
+            )
+        return self
+
 
 @lru_cache
 def get_settings() -> Settings:
@@ -1,24 +1,429 @@
-from functools import partial
-from typing import Any
+import asyncio
+import contextlib
+import json
+import logging
+import re
+import time
+import uuid
+from collections import Counter, OrderedDict
+from collections.abc import Awaitable, Callable
+from typing import Any, Generic, TypeVar
 
+from fastapi import HTTPException
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
-from fastapi_cache.decorator import cache
+from fastapi_cache.types import Backend
+from pydantic import TypeAdapter
 from redis import asyncio as aioredis
+from redis.exceptions import RedisError
 
 from app.app_config import Settings, get_settings
 
+logger: logging.Logger = logging.getLogger()
 settings: Settings = get_settings()
 
+CACHE_PREFIX = "fastapi-cache"
+INVALIDATION_RETRY_DELAY = 1.0
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+T = TypeVar("T")
+
+
+def escape_glob(pattern: str) -> str:
+    """Escapes the Redis glob metacharacters of a string so it only matches itself."""
+    return re.sub(r"([\\*?\[\]])", r"\\\1", pattern)
+
+
+class CacheTierMetrics:
+    """Counts, per cache tier, how many lookups were answered and how many missed."""
+
+    def __init__(self) -> None:
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def record(self, tier: str, hit: bool) -> None:
+        if hit:
+            self.hits[tier] += 1
+        else:
+            self.misses[tier] += 1
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {
+            tier: {
+                "hits": self.hits[tier],
+                "misses": self.misses[tier],
+                "hit_rate": self.hits[tier] / (self.hits[tier] + self.misses[tier]),
+            }
+            for tier in self.hits.keys() | self.misses.keys()
+        }
+
+
+class MemoryEntry:
+    def __init__(self, data: bytes, expires_at: float) -> None:
+        self.data: bytes = data
+        self.expires_at: float = expires_at
+
+
+class MemoryTier:
+    """Per-worker LRU cache bounded by entry count and total bytes.
+
+    Entries live at most `max_ttl` seconds, and never longer than the TTL they were stored with,
+    which bounds how stale a worker can be if it misses an invalidation message.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, max_ttl: int) -> None:
+        self.max_entries: int = max_entries
+        self.max_bytes: int = max_bytes
+        self.max_ttl: int = max_ttl
+        self.size_bytes: int = 0
+        self._entries: OrderedDict[str, MemoryEntry] = OrderedDict()
+
+    def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        entry: MemoryEntry | None = self._entries.get(key)
+        if entry is None:
+            return 0, None
+        ttl: float = entry.expires_at - time.monotonic()
+        if ttl <= 0:
+            self._pop(key)
+            return 0, None
+        self._entries.move_to_end(key)
+        return int(ttl), entry.data
+
+    def set(self, key: str, data: bytes, expire: int | None = None) -> None:
+        self._pop(key)
+        ttl: int = min(expire, self.max_ttl) if expire else self.max_ttl
+        if ttl <= 0 or len(data) > self.max_bytes:
+            return
+        self._entries[key] = MemoryEntry(data, time.monotonic() + ttl)
+        self.size_bytes += len(data)
+        while len(self._entries) > self.max_entries or self.size_bytes > self.max_bytes:
+            self._pop(next(iter(self._entries)))
+
+    def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        if namespace:
+            keys: list[str] = [cached_key for cached_key in self._entries if cached_key.startswith(f"{namespace}:")]
+        elif key:
+            keys = [key] if key in self._entries else []
+        else:
+            keys = []
+        for cached_key in keys:
+            self._pop(cached_key)
+        return len(keys)
+
+    def _pop(self, key: str) -> None:
+        entry: MemoryEntry | None = self._entries.pop(key, None)
+        if entry is not None:
+            self.size_bytes -= len(entry.data)
+
+
+class LayeredBackend(Backend):
+    """fastapi-cache backend reading through a per-worker memory tier before Redis.
+
+    Invalidations are applied locally and published on `channel`, so every worker listening with
+    `start` drops the same entries from its memory tier.
+    """
+
+    def __init__(self, memory: MemoryTier, redis: "aioredis.Redis[bytes]", channel: str) -> None:
+        self.memory: MemoryTier = memory
+        self.redis: aioredis.Redis[bytes] = redis
+        self.remote: RedisBackend = RedisBackend(redis)
+        self.channel: str = channel
+        self._listener: asyncio.Task[None] | None = None
+
+    async def get_with_ttl(self, key: str) -> tuple[int, bytes | None]:
+        ttl, data = self.memory.get_with_ttl(key)
+        cache_tier_metrics.record("memory", hit=data is not None)
+        if data is not None:
+            return ttl, data
+
+        ttl, data = await self.remote.get_with_ttl(key)
+        cache_tier_metrics.record("redis", hit=data is not None)
+        if data is not None:
+            self.memory.set(key, data, ttl)
+        return ttl, data
+
+    async def get(self, key: str) -> bytes | None:
+        _, data = await self.get_with_ttl(key)
+        return data
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        self.memory.set(key, value, expire)
+        await self.remote.set(key, value, expire)
+
+    async def clear(self, namespace: str | None = None, key: str | None = None) -> int:
+        self.memory.clear(namespace, key)
+        if namespace:
+            keys: list[bytes] = [
+                cached_key async for cached_key in self.redis.scan_iter(match=f"{escape_glob(namespace)}:*")
+            ]
+        else:
+            keys = [key.encode()] if key else []
+        count: int = await self.redis.delete(*keys) if keys else 0
+        await self.redis.publish(self.channel, json.dumps({"namespace": namespace, "key": key}))
+        return count
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(self.channel)
+                    async for message in pubsub.listen():
+                        if message["type"] == "message":
+                            self.memory.clear(**json.loads(message["data"]))
+            except RedisError as exp:
+                logger.warning("Cache invalidation listener disconnected: %s", exp)
+                await asyncio.sleep(INVALIDATION_RETRY_DELAY)
+
+    def start(self) -> None:
+        """Start listening for invalidations published by the other workers."""
+        if self._listener is None:
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._listener
+            self._listener = None
+        await self.redis.close()
+
+
+class StaleWhileRevalidateCache(Generic[T]):
+    """Shared cache of computed values with request coalescing and a stale-while-revalidate window.
+
+    Values are fresh for `ttl` seconds and then served stale for up to `stale_ttl` more seconds while a single
+    background task recomputes them. On a miss, one computation per key runs at a time: callers in the same
+    worker await the same task, and workers coordinate through a Redis lock so the others wait for the value to
+    appear in the cache instead of computing it too.
+    """
+
+    def __init__(self, namespace: str, type_: type[T], ttl: int, stale_ttl: int) -> None:
+        self.namespace: str = namespace
+        self.adapter: TypeAdapter[T] = TypeAdapter(type_)
+        self.ttl: int = ttl
+        self.stale_ttl: int = stale_ttl
+        self.backend: LayeredBackend = cache_backend
+        self._in_flight: dict[str, asyncio.Future[T]] = {}
+
+    def _cache_key(self, key: str) -> str:
+        return f"{CACHE_PREFIX}:{self.namespace}:{key}"
+
+    async def _read(self, cache_key: str) -> tuple[float, T] | None:
+        try:
+            cached: bytes | None = await self.backend.get(cache_key)
+        except RedisError as exp:
+            logger.warning("Failed to read cache key %s: %s", cache_key, exp)
+            return None
+        if cached is None:
+            return None
+        fresh_until, payload = cached.split(b"\n", 1)
+        return float(fresh_until), self.adapter.validate_json(payload)
+
+    async def _write(self, cache_key: str, value: T, ttl: int) -> None:
+        cached: bytes = f"{time.time() + ttl}\n".encode() + self.adapter.dump_json(value)
+        try:
+            await self.backend.set(cache_key, cached, ttl + self.stale_ttl)
+        except RedisError as exp:
+            logger.warning("Failed to write cache key %s: %s", cache_key, exp)
+
+    async def _acquire_lock(self, cache_key: str, token: str) -> bool:
+        try:
+            return bool(
+                await self.backend.redis.set(
+                    f"{cache_key}:lock", token, nx=True, px=int(settings.cache_lock_timeout * 1000)
+                )
+            )
+        except RedisError as exp:
+            logger.warning("Failed to lock cache key %s, computing without it: %s", cache_key, exp)
+            return True
+
+    async def _release_lock(self, cache_key: str, token: str) -> None:
+        try:
+            await self.backend.redis.eval(RELEASE_LOCK_SCRIPT, 1, f"{cache_key}:lock", token)
+        except RedisError as exp:
+            logger.warning("Failed to unlock cache key %s: %s", cache_key, exp)
+
+    async def _compute_once(self, cache_key: str, compute: Callable[[], Awaitable[T]], ttl: int) -> T:
+        token: str = uuid.uuid4().hex
+        deadline: float = time.monotonic() + settings.cache_lock_timeout
+        while not await self._acquire_lock(cache_key, token):
+            await asyncio.sleep(settings.cache_lock_poll_interval)
+            entry: tuple[float, T] | None = await self._read(cache_key)
+            if entry is not None:
+                cache_outcome_metrics[f"{self.namespace}.coalesced"] += 1
+                return entry[1]
+            if time.monotonic() >= deadline:
+                logger.warning("Lock of cache key %s was not released in time, computing anyway.", cache_key)
+                break
+        try:
+            value: T = await compute()
+            await self._write(cache_key, value, ttl)
+            return value
+        finally:
+            await self._release_lock(cache_key, token)
+
+    def _start_computing(self, cache_key: str, compute: Callable[[], Awaitable[T]], ttl: int) -> asyncio.Future[T]:
+        flight: asyncio.Future[T] | None = self._in_flight.get(cache_key)
+        if flight is not None:
+            cache_outcome_metrics[f"{self.namespace}.coalesced"] += 1
+            return flight
+        flight = asyncio.ensure_future(self._compute_once(cache_key, compute, ttl))
+        self._in_flight[cache_key] = flight
+        flight.add_done_callback(lambda _: self._in_flight.pop(cache_key, None))
+        return flight
+
+    def _refresh_in_background(self, cache_key: str, compute: Callable[[], Awaitable[T]], ttl: int) -> None:
+        if cache_key in self._in_flight:
+            return
+
+        def log_failure(flight: asyncio.Future[T]) -> None:
+            pending_refreshes.discard(flight)
+            if not flight.cancelled() and flight.exception() is not None:
+                logger.warning("Background refresh of cache key %s failed: %s", cache_key, flight.exception())
+
+        flight: asyncio.Future[T] = self._start_computing(cache_key, compute, ttl)
+        pending_refreshes.add(flight)
+        flight.add_done_callback(log_failure)
+
+    async def get(self, key: str, compute: Callable[[], Awaitable[T]], ttl: int | None = None) -> T:
+        """Returns the cached value of a key, computing it with `compute` if it is missing.
+
+        Args:
+            key (str): The key of the value inside this cache's namespace.
+            compute (Callable[[], Awaitable[T]]): Computes the value. It may run after the caller has returned,
+                so it must not depend on request-scoped resources.
+            ttl (int | None): How long a computed value stays fresh. Defaults to the TTL of this cache.
+
+        Returns:
+            T: The fresh value, or the stale one while it is being refreshed.
+        """
+        cache_key: str = self._cache_key(key)
+        ttl = self.ttl if ttl is None else ttl
+        entry: tuple[float, T] | None = await self._read(cache_key)
+        if entry is None:
+            cache_outcome_metrics[f"{self.namespace}.miss"] += 1
+            # Shielded so that a caller that goes away does not cancel the computation the others are awaiting.
+            return await asyncio.shield(self._start_computing(cache_key, compute, ttl))
+
+        fresh_until, value = entry
+        if time.time() < fresh_until:
+            cache_outcome_metrics[f"{self.namespace}.fresh"] += 1
+        else:
+            cache_outcome_metrics[f"{self.namespace}.stale"] += 1
+            self._refresh_in_background(cache_key, compute, ttl)
+        return value
+
+    async def peek(self, key: str) -> T | None:
+        """Returns the cached value of a key, fresh or stale, without ever computing or refreshing it.
+
+        Args:
+            key (str): The key of the value inside this cache's namespace.
+
+        Returns:
+            T | None: The cached value, or None if it is missing.
+        """
+        entry: tuple[float, T] | None = await self._read(self._cache_key(key))
+        return entry[1] if entry is not None else None
+
+    async def warm(
+        self, key: str, compute: Callable[[], Awaitable[T]], ttl: int | None = None, lead_time: int = 0
+    ) -> bool:
+        """Computes the value of a key ahead of its expiry, so that readers never find it missing or stale.
+
+        Args:
+            key (str): The key of the value inside this cache's namespace.
+            compute (Callable[[], Awaitable[T]]): Computes the value.
+            ttl (int | None): How long a computed value stays fresh. Defaults to the TTL of this cache.
+            lead_time (int): How long before the end of its freshness a value is recomputed.
+
+        Returns:
+            bool: True if the value was computed, False if it stays fresh for longer than `lead_time`.
+        """
+        cache_key: str = self._cache_key(key)
+        entry: tuple[float, T] | None = await self._read(cache_key)
+        if entry is not None and entry[0] - time.time() > lead_time:
+            return False
+        cache_outcome_metrics[f"{self.namespace}.warmed"] += 1
+        await asyncio.shield(self._start_computing(cache_key, compute, self.ttl if ttl is None else ttl))
+        return True
+
+
+class NegativeCache:
+    """Remembers lookups that failed with an HTTP error, so repeating them is answered without any upstream call."""
+
+    def __init__(self, namespace: str) -> None:
+        self.namespace: str = namespace
+        self.backend: LayeredBackend = cache_backend
+
+    def _cache_key(self, key: str) -> str:
+        return f"{CACHE_PREFIX}:{self.namespace}:{key}"
+
+    async def check(self, key: str) -> None:
+        """Raises the error remembered for a key, if any.
+
+        Args:
+            key (str): The key of the lookup inside this cache's namespace.
+
+        Raises:
+            HTTPException: The error the lookup failed with, while it is remembered.
+        """
+        try:
+            cached: bytes | None = await self.backend.get(self._cache_key(key))
+        except RedisError as exp:
+            logger.warning("Failed to read cache key %s: %s", self._cache_key(key), exp)
+            return
+        if cached is not None:
+            cache_outcome_metrics[f"{self.namespace}.hit"] += 1
+            raise HTTPException(**json.loads(cached))
+
+    async def remember(self, key: str, error: HTTPException, ttl: int) -> None:
+        """Remembers the error a lookup failed with for `ttl` seconds.
+
+        Args:
+            key (str): The key of the lookup inside this cache's namespace.
+            error (HTTPException): The error to answer the lookup with.
+            ttl (int): How long the error is remembered.
+        """
+        cached: bytes = json.dumps({"status_code": error.status_code, "detail": error.detail}).encode()
+        try:
+            await self.backend.set(self._cache_key(key), cached, ttl)
+        except RedisError as exp:
+            logger.warning("Failed to write cache key %s: %s", self._cache_key(key), exp)
+
+
+cache_tier_metrics = CacheTierMetrics()
+cache_outcome_metrics: Counter[str] = Counter()
+pending_refreshes: set[asyncio.Future[Any]] = set()
+cache_backend = LayeredBackend(
+    memory=MemoryTier(
+        max_entries=settings.cache_memory_max_entries,
+        max_bytes=settings.cache_memory_max_bytes,
+        max_ttl=settings.cache_memory_ttl,
+    ),
+    redis=aioredis.from_url(settings.redis_url),
+    channel=settings.cache_invalidation_channel,
+)
+
 
 async def init_cache() -> None:
     """
-    Initialize the cache using the provided Redis URL and set the cache prefix to 'fastapi-cache'.
+    Initialize the cache with the layered memory/Redis backend and set the cache prefix to 'fastapi-cache'.
 
-    This function connects to the Redis server using the URL specified in the settings and initializes the FastAPI cache with the Redis backend.
+    This function also starts listening for invalidations published by the other workers.
     """
-    redis: aioredis.Redis[Any] = aioredis.from_url(settings.redis_url)
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(cache_backend, prefix=CACHE_PREFIX)
+    cache_backend.start()
 
 
-default_cache = partial(cache, settings.default_caching_time)
+async def close_cache() -> None:
+    """
+    Cancel pending background refreshes, stop listening for invalidations and close the Redis connection.
+    """
+    for refresh in pending_refreshes:
+        refresh.cancel()
+    await asyncio.gather(*pending_refreshes, return_exceptions=True)
+    await cache_backend.close()
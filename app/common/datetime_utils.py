@@ -1,6 +1,14 @@
 from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
 
 
 def get_yesterday() -> date:
     """Return the date representing yesterday."""
     return (datetime.now() - timedelta(1)).date()
+
+
+def get_market_today() -> date:
+    """Return the current date on the exchange clock (US/Eastern)."""
+    return datetime.now(MARKET_TIMEZONE).date()
@@ -0,0 +1,141 @@
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+
+from app.common.datetime_utils import MARKET_TIMEZONE
+
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EXTENDED_CLOSE = time(20, 0)
+SATURDAY = 5
+SUNDAY = 6
+JUNETEENTH_FIRST_YEAR = 2022
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first_day = date(year, month, 1)
+    return first_day + timedelta(days=(weekday - first_day.weekday()) % 7 + 7 * (n - 1))
+
+
+def _last_weekday(year: int, month: int, weekday: int) -> date:
+    last_day: date = date(year, month + 1, 1) - timedelta(days=1)
+    return last_day - timedelta(days=(last_day.weekday() - weekday) % 7)
+
+
+def _easter_sunday(year: int) -> date:
+    # Anonymous Gregorian algorithm (Meeus/Jones/Butcher).
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    g = (8 * b + 13) // 25
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    weekday_offset = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * weekday_offset) // 451
+    month, day = divmod(h + weekday_offset - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(holiday: date) -> date:
+    if holiday.weekday() == SATURDAY:
+        return holiday - timedelta(days=1)
+    if holiday.weekday() == SUNDAY:
+        return holiday + timedelta(days=1)
+    return holiday
+
+
+@lru_cache
+def get_market_holidays(year: int) -> frozenset[date]:
+    """Returns the full-day NYSE holidays of a year, on the weekday they are observed.
+
+    Args:
+        year (int): The year to compute the holidays of.
+
+    Returns:
+        frozenset[date]: The dates the exchange is closed on, weekends excluded.
+    """
+    holidays: set[date] = {
+        _nth_weekday(year, 1, 0, 3),  # Martin Luther King Jr. Day
+        _nth_weekday(year, 2, 0, 3),  # Washington's Birthday
+        _easter_sunday(year) - timedelta(days=2),  # Good Friday
+        _last_weekday(year, 5, 0),  # Memorial Day
+        _observed(date(year, 7, 4)),  # Independence Day
+        _nth_weekday(year, 9, 0, 1),  # Labor Day
+        _nth_weekday(year, 11, 3, 4),  # Thanksgiving Day
+        _observed(date(year, 12, 25)),  # Christmas Day
+    }
+    # New Year's Day falling on a Saturday is not observed on the previous Friday, which closes another year.
+    if date(year, 1, 1).weekday() != SATURDAY:
+        holidays.add(_observed(date(year, 1, 1)))
+    if year >= JUNETEENTH_FIRST_YEAR:
+        holidays.add(_observed(date(year, 6, 19)))
+    return frozenset(holidays)
+
+
+def is_trading_day(day: date) -> bool:
+    """Return whether the exchange has a session on a given day."""
+    return day.weekday() < SATURDAY and day not in get_market_holidays(day.year)
+
+
+def is_market_open(now: datetime | None = None) -> bool:
+    """Return whether the regular session is running at a given moment, now by default."""
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    return is_trading_day(now.date()) and REGULAR_OPEN <= now.time() < REGULAR_CLOSE
+
+
+def get_next_market_open(now: datetime | None = None) -> datetime:
+    """Returns the start of the next regular session after a given moment, now by default.
+
+    Args:
+        now (datetime | None): The moment to look from. Defaults to now.
+
+    Returns:
+        datetime: The next session open, on the exchange clock.
+    """
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    day: date = now.date()
+    while True:
+        market_open = datetime.combine(day, REGULAR_OPEN, tzinfo=MARKET_TIMEZONE)
+        if is_trading_day(day) and market_open > now:
+            return market_open
+        day += timedelta(days=1)
+
+
+def is_session_final(session_date: date, now: datetime | None = None) -> bool:
+    """Returns whether the data of a session can no longer change.
+
+    A session is final once its extended hours have ended. Days without a session are final once they are over
+    on the exchange clock.
+
+    Args:
+        session_date (date): The day of the session.
+        now (datetime | None): The moment to look from. Defaults to now.
+
+    Returns:
+        bool: True if the data of the session is final.
+    """
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    if session_date != now.date():
+        return session_date < now.date()
+    return is_trading_day(session_date) and now.time() >= EXTENDED_CLOSE
+
+
+def get_cache_ttl(
+    default_ttl: int, final_ttl: int, session_date: date | None = None, now: datetime | None = None
+) -> int:
+    """Computes how long market data can be cached, from the exchange calendar.
+
+    Args:
+        default_ttl (int): The TTL while the market is open.
+        final_ttl (int): The TTL of data that can no longer change.
+        session_date (date | None): The session the data belongs to, if it belongs to a single one.
+        now (datetime | None): The moment to look from. Defaults to now.
+
+    Returns:
+        int: `final_ttl` for a final session, `default_ttl` from the open until the end of the extended hours
+            of a trading day, and the time left until the next open (at least `default_ttl`) otherwise.
+    """
+    now = (now or datetime.now(MARKET_TIMEZONE)).astimezone(MARKET_TIMEZONE)
+    if session_date is not None and is_session_final(session_date, now):
+        return final_ttl
+    if is_trading_day(now.date()) and REGULAR_OPEN <= now.time() < EXTENDED_CLOSE:
+        return default_ttl
+    return max(default_ttl, int((get_next_market_open(now) - now).total_seconds()))
@@ -0,0 +1,38 @@
+from collections.abc import AsyncIterator
+
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def accepts_ndjson(accept: str | None) -> bool:
+    """Tells whether an Accept header asks for newline-delimited JSON.
+
+    Args:
+        accept (str | None): The value of the Accept header, if any.
+
+    Returns:
+        bool: True if `application/x-ndjson` is one of the accepted media types.
+    """
+    if not accept:
+        return False
+    return any(media_range.split(";")[0].strip() == NDJSON_MEDIA_TYPE for media_range in accept.split(","))
+
+
+async def iter_ndjson(items: AsyncIterator[BaseModel]) -> AsyncIterator[str]:
+    """Serializes each model of an async iterator as one JSON line, as soon as it is yielded.
+
+    Args:
+        items (AsyncIterator[BaseModel]): The models to serialize.
+
+    Returns:
+        AsyncIterator[str]: One JSON document followed by a newline per model.
+    """
+    async for item in items:
+        yield item.model_dump_json() + "\n"
+
+
+def ndjson_response(items: AsyncIterator[BaseModel]) -> StreamingResponse:
+    """Streams the models of an async iterator as an `application/x-ndjson` response."""
+    return StreamingResponse(iter_ndjson(items), media_type=NDJSON_MEDIA_TYPE)
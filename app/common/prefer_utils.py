@@ -0,0 +1,15 @@
+RESPOND_ASYNC = "respond-async"
+
+
+def prefers_respond_async(prefer: str | None) -> bool:
+    """Tells whether a Prefer header (RFC 7240) asks for an asynchronous response.
+
+    Args:
+        prefer (str | None): The value of the Prefer header, if any.
+
+    Returns:
+        bool: True if `respond-async` is one of the preferences.
+    """
+    if not prefer:
+        return False
+    return any(preference.split(";")[0].strip() == RESPOND_ASYNC for preference in prefer.split(","))
@@ -0,0 +1,120 @@
+import codecs
+import csv
+from collections.abc import AsyncIterator
+
+from fastapi import HTTPException
+from pydantic import TypeAdapter, ValidationError
+
+from app.common.ndjson_utils import NDJSON_MEDIA_TYPE
+from app.models.dto.stock_endpoint_models import BulkPurchaseEntry
+
+JSON_MEDIA_TYPE = "application/json"
+CSV_MEDIA_TYPE = "text/csv"
+PURCHASE_UPLOAD_MEDIA_TYPES: tuple[str, ...] = (JSON_MEDIA_TYPE, CSV_MEDIA_TYPE, NDJSON_MEDIA_TYPE)
+CSV_COLUMNS: list[str] = ["symbol", "amount"]
+
+bulk_purchase_entries: TypeAdapter[list[BulkPurchaseEntry]] = TypeAdapter(list[BulkPurchaseEntry])
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Splits a stream of bytes into its lines, without their line breaks and skipping blank ones.
+
+    The lines are not decoded, so a line that is not valid UTF-8 can be reported with its line number.
+
+    Args:
+        chunks (AsyncIterator[bytes]): The stream, e.g. the body of a request.
+
+    Returns:
+        AsyncIterator[bytes]: The non-blank lines of the stream.
+    """
+    pending: bytes = b""
+    async for chunk in chunks:
+        *lines, pending = (pending + chunk).split(b"\n")
+        for line in lines:
+            if line.strip():
+                yield line.rstrip(b"\r")
+    if pending.strip():
+        yield pending.rstrip(b"\r")
+
+
+def _invalid_row(line_number: int, exp: Exception) -> HTTPException:
+    return HTTPException(status_code=422, detail=f"Invalid purchase on line {line_number}: {exp}")
+
+
+def _decode_line(line: bytes, line_number: int) -> str:
+    try:
+        decoded_line: str = line.decode()
+    except UnicodeDecodeError as exp:
+        raise _invalid_row(line_number, exp)
+    # Spreadsheet exports often start with a UTF-8 byte order mark.
+    return decoded_line.removeprefix("\ufeff") if line_number == 1 else decoded_line
+
+
+async def _read_json_body(chunks: AsyncIterator[bytes], max_json_bytes: int) -> bytes:
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        # Checked while reading, so an oversized body is rejected before it is buffered as a whole.
+        if len(body) > max_json_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"A JSON upload is limited to {max_json_bytes} bytes, upload NDJSON or CSV instead",
+            )
+    return bytes(body).removeprefix(codecs.BOM_UTF8)
+
+
+async def iter_purchase_entries(
+    content_type: str | None, chunks: AsyncIterator[bytes], max_json_bytes: int
+) -> AsyncIterator[BulkPurchaseEntry]:
+    """Parses an upload of purchases as it is received.
+
+    A JSON body is a list of `{"symbol", "amount"}` objects, read as a whole and therefore limited to
+    `max_json_bytes`. An NDJSON body has one such object per line, and a CSV body a `symbol,amount` header followed
+    by one purchase per row; both are parsed line by line, so the upload never has to be held in memory as a whole.
+
+    Args:
+        content_type (str | None): The Content-Type header of the upload.
+        chunks (AsyncIterator[bytes]): The body of the upload.
+        max_json_bytes (int): The size limit of a JSON body.
+
+    Returns:
+        AsyncIterator[BulkPurchaseEntry]: The purchases, in upload order.
+
+    Raises:
+        HTTPException: 413 if a JSON body exceeds `max_json_bytes`, 415 if the media type is not supported, 422 if a
+            purchase is invalid.
+    """
+    media_type: str = (content_type or "").split(";")[0].strip()
+    if media_type == JSON_MEDIA_TYPE:
+        body: bytes = await _read_json_body(chunks, max_json_bytes)
+        try:
+            entries: list[BulkPurchaseEntry] = bulk_purchase_entries.validate_json(body)
+        except ValidationError as exp:
+            raise HTTPException(status_code=422, detail=exp.errors(include_url=False, include_context=False))
+        for entry in entries:
+            yield entry
+    elif media_type == NDJSON_MEDIA_TYPE:
+        line_number: int = 0
+        async for line in iter_lines(chunks):
+            line_number += 1
+            try:
+                yield BulkPurchaseEntry.model_validate_json(_decode_line(line, line_number))
+            except ValidationError as exp:
+                raise _invalid_row(line_number, exp)
+    elif media_type == CSV_MEDIA_TYPE:
+        line_number = 0
+        async for line in iter_lines(chunks):
+            line_number += 1
+            row: list[str] = next(csv.reader([_decode_line(line, line_number)]))
+            if line_number == 1:
+                if [column.strip().lower() for column in row] != CSV_COLUMNS:
+                    raise HTTPException(status_code=422, detail=f"The CSV header must be {','.join(CSV_COLUMNS)}")
+                continue
+            try:
+                yield BulkPurchaseEntry.model_validate(dict(zip(CSV_COLUMNS, row, strict=True)))
+            except ValueError as exp:
+                raise _invalid_row(line_number, exp)
+    else:
+        raise HTTPException(
+            status_code=415, detail=f"Unsupported media type, use one of {', '.join(PURCHASE_UPLOAD_MEDIA_TYPES)}"
+        )
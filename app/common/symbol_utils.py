@@ -0,0 +1,10 @@
+def normalize_symbol(stock_symbol: str) -> str:
+    """Brings a stock symbol to the form it is cached, queued and stored under.
+
+    Args:
+        stock_symbol (str): The symbol as requested, e.g. ` aapl`.
+
+    Returns:
+        str: The symbol without surrounding whitespace and upper-cased, e.g. `AAPL`.
+    """
+    return stock_symbol.strip().upper()
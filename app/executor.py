@@ -0,0 +1,107 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
+from app.app_config import Settings, get_settings
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+T = TypeVar("T")
+
+
+class ExecutorSaturatedError(Exception): ...
+
+
+class BoundedExecutor:
+    """Thread pool for blocking work with an admission queue in front of it.
+
+    At most `max_workers` callers hold a slot at the same time and at most `max_queue_depth` wait for one.
+    Callers arriving when the queue is full, or waiting longer than `queue_timeout`, are rejected with
+    ExecutorSaturatedError instead of piling up.
+    """
+
+    def __init__(self, max_workers: int, max_queue_depth: int, queue_timeout: float) -> None:
+        self.max_workers: int = max_workers
+        self.max_queue_depth: int = max_queue_depth
+        self.queue_timeout: float = queue_timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._slots = asyncio.Semaphore(max_workers)
+        self.active: int = 0
+        self.queue_depth: int = 0
+        self.admitted: int = 0
+        self.rejected: int = 0
+        self.total_wait: float = 0.0
+        self.max_wait: float = 0.0
+
+    @contextlib.asynccontextmanager
+    async def admit(self) -> AsyncIterator[None]:
+        """Hold one of the `max_workers` slots for the duration of the block.
+
+        Raises:
+            ExecutorSaturatedError: If the admission queue is full or the slot is not granted in time.
+        """
+        if self._slots.locked() and self.queue_depth >= self.max_queue_depth:
+            self.rejected += 1
+            raise ExecutorSaturatedError(f"Admission queue is full ({self.queue_depth} waiting)")
+
+        self.queue_depth += 1
+        start_time: float = time.perf_counter()
+        try:
+            async with asyncio.timeout(self.queue_timeout):
+                await self._slots.acquire()
+        except TimeoutError:
+            self.rejected += 1
+            raise ExecutorSaturatedError(f"No slot granted in {self.queue_timeout} seconds")
+        finally:
+            self.queue_depth -= 1
+
+        wait_time: float = time.perf_counter() - start_time
+        self.admitted += 1
+        self.total_wait += wait_time
+        self.max_wait = max(self.max_wait, wait_time)
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        """Run `func(*args)` on the shared thread pool. Callers are expected to hold a slot from `admit`."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scraper")
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    def has_spare_capacity(self, reserved: int) -> bool:
+        """Return whether nobody is waiting for a slot and more than `reserved` slots are free."""
+        return self.queue_depth == 0 and self.active + reserved < self.max_workers
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue_depth": self.max_queue_depth,
+            "active": self.active,
+            "queue_depth": self.queue_depth,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "avg_wait": self.total_wait / self.admitted if self.admitted else 0.0,
+            "max_wait": self.max_wait,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the thread pool without waiting for running work; queued work is cancelled."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+scraper_executor = BoundedExecutor(
+    max_workers=settings.scraper_max_workers,
+    max_queue_depth=settings.scraper_max_queue_depth,
+    queue_timeout=settings.scraper_queue_timeout,
+)
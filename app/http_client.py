@@ -0,0 +1,52 @@
+from typing import Annotated, Any
+
+import httpx
+from fastapi import Depends
+
+from app.app_config import Settings, get_settings
+
+settings: Settings = get_settings()
+
+
+class HttpClientManager:
+    """Owns one long-lived httpx.AsyncClient so connections are kept alive and reused across requests."""
+
+    def __init__(self, **client_kwargs: Any) -> None:
+        self.client_kwargs: dict[str, Any] = client_kwargs
+        self._client: httpx.AsyncClient | None = None
+
+    def start(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        """Create the client. A transport can be given to serve requests locally, e.g. httpx.MockTransport in tests."""
+        self._client = httpx.AsyncClient(transport=transport, **self.client_kwargs)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self.start()
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+polygon_client_manager = HttpClientManager(
+    limits=httpx.Limits(
+        max_connections=settings.polygon_max_connections,
+        max_keepalive_connections=settings.polygon_max_keepalive_connections,
+        keepalive_expiry=settings.polygon_keepalive_expiry,
+    ),
+    timeout=httpx.Timeout(settings.polygon_timeout),
+    http2=settings.polygon_http2,
+)
+
+
+async def get_polygon_client() -> httpx.AsyncClient:
+    """
+    Returns the shared Polygon client managed by the app lifespan.
+    """
+    return polygon_client_manager.client
+
+
+PolygonClientDep = Annotated[httpx.AsyncClient, Depends(get_polygon_client)]
@@ -0,0 +1,195 @@
+import uuid
+from datetime import UTC, date, datetime
+from typing import Annotated
+
+from fastapi import Depends, HTTPException
+from redis.asyncio import Redis
+
+from app.app_config import Settings, get_settings
+from app.cache import cache_backend
+from app.common.symbol_utils import normalize_symbol
+from app.models.dto.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.models.dto.stock_response import StockData, StockError
+
+settings: Settings = get_settings()
+
+JOBS_PREFIX = "scrape-jobs"
+QUEUE_KEY = f"{JOBS_PREFIX}:queue"
+CONSUMERS_KEY = f"{JOBS_PREFIX}:consumers"
+
+
+class ScrapeJobQueue:
+    """Redis-backed queue of stock lookups, filled by the API and drained by the job workers.
+
+    Jobs are kept for `scrape_job_ttl` seconds. While a job for a symbol and date is queued or running, enqueuing
+    the same lookup again returns that job instead of queuing another one.
+
+    A consumer moves each job it takes into its own processing list and keeps a heartbeat alive for
+    `scrape_job_lease_timeout` seconds. The jobs of a consumer whose heartbeat expired, e.g. because its worker was
+    killed, are put back on the queue by `recover_abandoned`.
+    """
+
+    def __init__(self, settings: Settings, redis: Redis) -> None:
+        self.settings: Settings = settings
+        self.redis: Redis = redis
+
+    def _job_key(self, job_id: str) -> str:
+        return f"{JOBS_PREFIX}:job:{job_id}"
+
+    def _active_key(self, stock_symbol: str, date: date) -> str:
+        return f"{JOBS_PREFIX}:active:{stock_symbol}:{date}"
+
+    def _processing_key(self, consumer_id: str) -> str:
+        return f"{JOBS_PREFIX}:processing:{consumer_id}"
+
+    def _heartbeat_key(self, consumer_id: str) -> str:
+        return f"{JOBS_PREFIX}:heartbeat:{consumer_id}"
+
+    async def _save(self, job: ScrapeJob) -> None:
+        await self.redis.set(self._job_key(job.id), job.model_dump_json(), ex=self.settings.scrape_job_ttl)
+
+    async def get(self, job_id: str) -> ScrapeJob | None:
+        """Returns a job by id, or None if it does not exist or has expired."""
+        cached: bytes | None = await self.redis.get(self._job_key(job_id))
+        return ScrapeJob.model_validate_json(cached) if cached is not None else None
+
+    async def _get_active(self, active_key: str) -> ScrapeJob | None:
+        active_job_id: bytes | None = await self.redis.get(active_key)
+        return await self.get(active_job_id.decode()) if active_job_id is not None else None
+
+    async def enqueue(self, stock_symbol: str, date: date) -> ScrapeJob:
+        """Queues a lookup of the stock data of a symbol, unless the same lookup is already queued or running.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve data for.
+            date (date): The date for which to retrieve the stock data.
+
+        Returns:
+            ScrapeJob: The new job, or the pending job of the same lookup.
+
+        Raises:
+            HTTPException: 503 if `scrape_job_max_queue_depth` jobs are already waiting.
+        """
+        stock_symbol = normalize_symbol(stock_symbol)
+        active_key: str = self._active_key(stock_symbol, date)
+        active_job: ScrapeJob | None = await self._get_active(active_key)
+        if active_job is not None:
+            return active_job
+
+        if await self.redis.llen(QUEUE_KEY) >= self.settings.scrape_job_max_queue_depth:
+            raise HTTPException(status_code=503, detail="Too many pending jobs, try again later")
+
+        job = ScrapeJob(
+            id=uuid.uuid4().hex,
+            status=ScrapeJobStatus.QUEUED,
+            symbol=stock_symbol,
+            request_date=date,
+            created_at=datetime.now(UTC),
+        )
+        # The job is saved before the lookup is claimed, so a request losing the claim always finds the winner's job.
+        await self._save(job)
+        if not await self.redis.set(active_key, job.id, nx=True, ex=self.settings.scrape_job_ttl):
+            await self.redis.delete(self._job_key(job.id))
+            active_job = await self._get_active(active_key)
+            if active_job is not None:
+                return active_job
+            # The claiming job expired before its claim, take the claim over.
+            await self.redis.set(active_key, job.id, ex=self.settings.scrape_job_ttl)
+            await self._save(job)
+        await self.redis.lpush(QUEUE_KEY, job.id)
+        return job
+
+    async def heartbeat(self, consumer_id: str) -> None:
+        """Registers a consumer and keeps its jobs leased to it for another `scrape_job_lease_timeout` seconds."""
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.sadd(CONSUMERS_KEY, consumer_id)
+            pipe.set(self._heartbeat_key(consumer_id), 1, ex=self.settings.scrape_job_lease_timeout)
+            await pipe.execute()
+
+    async def dequeue(self, consumer_id: str) -> ScrapeJob | None:
+        """Moves the oldest queued job into the processing list of a consumer and marks it as running.
+
+        Args:
+            consumer_id (str): The consumer taking the job, which must keep sending heartbeats until it finishes.
+
+        Returns:
+            ScrapeJob | None: The job, or None if no job was queued within `scrape_job_poll_timeout` seconds or
+                the job expired while queued.
+        """
+        processing_key: str = self._processing_key(consumer_id)
+        job_id: bytes | None = await self.redis.blmove(
+            QUEUE_KEY, processing_key, self.settings.scrape_job_poll_timeout, src="RIGHT", dest="LEFT"
+        )
+        if job_id is None:
+            return None
+        job: ScrapeJob | None = await self.get(job_id.decode())
+        if job is None:
+            await self.redis.lrem(processing_key, 1, job_id)
+            return None
+        job.status = ScrapeJobStatus.RUNNING
+        await self._save(job)
+        return job
+
+    async def requeue(self, consumer_id: str, job: ScrapeJob) -> None:
+        """Puts a running job back at the head of the queue, e.g. when its worker stops before finishing it."""
+        job.status = ScrapeJobStatus.QUEUED
+        await self._save(job)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self._processing_key(consumer_id), 1, job.id)
+            pipe.rpush(QUEUE_KEY, job.id)
+            await pipe.execute()
+
+    async def recover_abandoned(self) -> int:
+        """Puts the jobs of consumers whose heartbeat expired back at the head of the queue.
+
+        Returns:
+            int: The number of jobs put back on the queue.
+        """
+        recovered = 0
+        for member in await self.redis.smembers(CONSUMERS_KEY):
+            consumer_id: str = member.decode()
+            if await self.redis.exists(self._heartbeat_key(consumer_id)):
+                continue
+            while (
+                job_id := await self.redis.lmove(self._processing_key(consumer_id), QUEUE_KEY, "RIGHT", "RIGHT")
+            ) is not None:
+                job: ScrapeJob | None = await self.get(job_id.decode())
+                if job is not None:
+                    job.status = ScrapeJobStatus.QUEUED
+                    await self._save(job)
+                recovered += 1
+            await self.redis.srem(CONSUMERS_KEY, consumer_id)
+        return recovered
+
+    async def _finish(self, consumer_id: str, job: ScrapeJob) -> None:
+        job.finished_at = datetime.now(UTC)
+        await self._save(job)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._active_key(job.symbol, job.request_date))
+            pipe.lrem(self._processing_key(consumer_id), 1, job.id)
+            await pipe.execute()
+
+    async def complete(self, consumer_id: str, job: ScrapeJob, result: StockData) -> None:
+        """Stores the result of a job and marks it as succeeded."""
+        job.status = ScrapeJobStatus.SUCCEEDED
+        job.result = result
+        await self._finish(consumer_id, job)
+
+    async def fail(self, consumer_id: str, job: ScrapeJob, error: StockError) -> None:
+        """Stores the error of a job and marks it as failed."""
+        job.status = ScrapeJobStatus.FAILED
+        job.error = error
+        await self._finish(consumer_id, job)
+
+
+scrape_job_queue = ScrapeJobQueue(settings=settings, redis=cache_backend.redis)
+
+
+def get_scrape_job_queue() -> ScrapeJobQueue:
+    """
+    Returns the shared scrape job queue.
+    """
+    return scrape_job_queue
+
+
+ScrapeJobQueueDep = Annotated[ScrapeJobQueue, Depends(get_scrape_job_queue)]
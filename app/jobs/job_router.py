@@ -0,0 +1,22 @@
+from fastapi import APIRouter, HTTPException
+
+from app.jobs.job_queue import ScrapeJobQueueDep
+from app.models.dto.scrape_job import ScrapeJob
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+
+@router.get("/{job_id}")
+async def get_job(job_id: str, job_queue: ScrapeJobQueueDep) -> ScrapeJob:
+    """Get the status of a scrape job, and its result or error once it is finished.
+
+    Parameters:
+    - job_id (str): The id returned when the job was accepted.
+
+    Returns:
+    - ScrapeJob: The job. Its `result` is set once its status is `succeeded`, its `error` once it is `failed`.
+    """
+    job: ScrapeJob | None = await job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
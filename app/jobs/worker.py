@@ -0,0 +1,133 @@
+import asyncio
+import contextlib
+import logging
+import signal
+import uuid
+from logging.config import dictConfig
+
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from app.app_config import Settings, get_settings
+from app.cache import close_cache, init_cache
+from app.database import sessionmanager
+from app.executor import scraper_executor
+from app.http_client import polygon_client_manager
+from app.jobs.job_queue import ScrapeJobQueue, scrape_job_queue
+from app.log_config import LogConfig
+from app.models.dto.scrape_job import ScrapeJob
+from app.models.dto.stock_response import StockData, StockError
+from app.repository.marketwatch_repository import marketwatch_client_manager, seed_stock_page_cache
+from app.repository.webdriver_pool import webdriver_pool
+from app.stocks.stock_service import StockService
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+DEQUEUE_RETRY_DELAY = 1.0
+
+
+async def process_job(job_queue: ScrapeJobQueue, consumer_id: str, job: ScrapeJob) -> None:
+    """Looks up the stock data of a job and stores the result or the error in the queue.
+
+    Args:
+        job_queue (ScrapeJobQueue): The queue the job was taken from.
+        consumer_id (str): The consumer running the job.
+        job (ScrapeJob): The running job.
+    """
+    try:
+        async with sessionmanager.session() as session:
+            stock_service = StockService(settings, session, polygon_client_manager.client)
+            stock_data: StockData = await stock_service.get_stock_by_symbol(job.symbol, job.request_date)
+    except HTTPException as exp:
+        await job_queue.fail(consumer_id, job, StockError(status_code=exp.status_code, detail=exp.detail))
+    except Exception:
+        logger.exception("Scrape job %s failed", job.id)
+        await job_queue.fail(
+            consumer_id, job, StockError(status_code=500, detail="Internal error. Please contact support.")
+        )
+    else:
+        await job_queue.complete(consumer_id, job, stock_data)
+
+
+async def keep_alive(job_queue: ScrapeJobQueue, consumer_id: str) -> None:
+    """Sends the heartbeat of a consumer three times per `scrape_job_lease_timeout` until cancelled."""
+    while True:
+        await asyncio.sleep(settings.scrape_job_lease_timeout / 3)
+        try:
+            await job_queue.heartbeat(consumer_id)
+        except RedisError as exp:
+            logger.warning("Failed to send the heartbeat of scrape job consumer %s: %s", consumer_id, exp)
+
+
+async def consume(job_queue: ScrapeJobQueue) -> None:
+    """Processes jobs one at a time until cancelled. A job interrupted by the cancellation is queued again."""
+    consumer_id: str = uuid.uuid4().hex
+    while True:
+        try:
+            await job_queue.heartbeat(consumer_id)
+            job: ScrapeJob | None = await job_queue.dequeue(consumer_id)
+        except RedisError as exp:
+            logger.warning("Failed to take a scrape job: %s", exp)
+            await asyncio.sleep(DEQUEUE_RETRY_DELAY)
+            continue
+        if job is None:
+            continue
+        heartbeat: asyncio.Future[None] = asyncio.ensure_future(keep_alive(job_queue, consumer_id))
+        try:
+            await process_job(job_queue, consumer_id, job)
+        except asyncio.CancelledError:
+            await asyncio.shield(job_queue.requeue(consumer_id, job))
+            raise
+        finally:
+            heartbeat.cancel()
+
+
+async def recover_abandoned_jobs(job_queue: ScrapeJobQueue) -> None:
+    """Puts the jobs of consumers that stopped sending heartbeats back on the queue, until cancelled."""
+    while True:
+        try:
+            recovered: int = await job_queue.recover_abandoned()
+        except RedisError as exp:
+            logger.warning("Failed to recover abandoned scrape jobs: %s", exp)
+        else:
+            if recovered:
+                logger.warning("Requeued %d scrape jobs of stopped consumers", recovered)
+        await asyncio.sleep(settings.scrape_job_lease_timeout)
+
+
+async def run_worker(concurrency: int) -> None:
+    """Runs `concurrency` consumers of the scrape job queue until SIGINT or SIGTERM."""
+    await init_cache()
+    polygon_client_manager.start()
+    marketwatch_client_manager.start()
+    if settings.page_archive_enabled:
+        await seed_stock_page_cache(settings)
+    consumers: asyncio.Future[list[None]] = asyncio.gather(
+        recover_abandoned_jobs(scrape_job_queue), *(consume(scrape_job_queue) for _ in range(concurrency))
+    )
+    loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(signum, consumers.cancel)
+    logger.info("Scrape job worker started with %d consumers", concurrency)
+    try:
+        with contextlib.suppress(asyncio.CancelledError):
+            await consumers
+    finally:
+        await webdriver_pool.close()
+        await marketwatch_client_manager.close()
+        await polygon_client_manager.close()
+        scraper_executor.shutdown()
+        await close_cache()
+        if sessionmanager._engine is not None:
+            await sessionmanager.close()
+
+
+def main() -> None:
+    """Entry point of the job worker processes, started with `python -m app.jobs.worker`."""
+    dictConfig(LogConfig().model_dump())
+    asyncio.run(run_worker(settings.scrape_worker_concurrency))
+
+
+if __name__ == "__main__":
+    main()
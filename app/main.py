@@ -7,19 +7,42 @@ from typing import Any, AsyncGenerator
 from fastapi import FastAPI, Request
 from fastapi.concurrency import asynccontextmanager
 
-from app.cache import init_cache
+from app.app_config import Settings, get_settings
+from app.cache import close_cache, init_cache
 from app.database import sessionmanager
+from app.executor import scraper_executor
+from app.http_client import polygon_client_manager
+from app.jobs.job_router import router as job_router
 from app.log_config import LogConfig
+from app.metrics.metrics_router import router as metrics_router
+from app.repository.marketwatch_repository import marketwatch_client_manager, seed_stock_page_cache
+from app.repository.purchase_buffer import purchase_buffer
+from app.repository.webdriver_pool import webdriver_pool
+from app.stocks.stock_cache_warmer import stock_cache_warmer
 from app.stocks.stock_router import router as stock_router
 
 dictConfig(LogConfig().model_dump())
 logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(_: FastAPI) -> AsyncGenerator[None, None]:
     await init_cache()
+    polygon_client_manager.start()
+    marketwatch_client_manager.start()
+    if settings.page_archive_enabled:
+        await seed_stock_page_cache(settings)
+    stock_cache_warmer.start()
+    purchase_buffer.start()
     yield
+    await purchase_buffer.close()
+    await stock_cache_warmer.close()
+    await webdriver_pool.close()
+    await marketwatch_client_manager.close()
+    await polygon_client_manager.close()
+    scraper_executor.shutdown()
+    await close_cache()
     if sessionmanager._engine is not None:
         await sessionmanager.close()
 
@@ -50,3 +73,5 @@ async def log_endpoint_start_and_end(request: Request, call_next: Callable[[Requ
 
 
 app.include_router(stock_router)
+app.include_router(job_router)
+app.include_router(metrics_router)
@@ -0,0 +1,32 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from app.cache import cache_outcome_metrics, cache_tier_metrics
+from app.executor import scraper_executor
+from app.repository.marketwatch_repository import fetch_tier_metrics
+from app.repository.page_snapshot_cache import stock_page_cache
+from app.repository.purchase_buffer import purchase_buffer
+from app.repository.scrape_pacer import scrape_pacer
+from app.stocks.stock_cache_warmer import stock_cache_warmer
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("")
+async def get_metrics() -> dict[str, Any]:
+    """Get the in-process performance counters of this worker.
+
+    Returns:
+    - dict: The counters grouped by component.
+    """
+    return {
+        "cache_tiers": cache_tier_metrics.snapshot(),
+        "cache_outcomes": dict(cache_outcome_metrics),
+        "cache_warmer": stock_cache_warmer.snapshot(),
+        "marketwatch_fetch_tiers": fetch_tier_metrics.snapshot(),
+        "marketwatch_page_cache": stock_page_cache.snapshot(),
+        "marketwatch_pacing": scrape_pacer.snapshot(),
+        "purchase_buffer": purchase_buffer.snapshot(),
+        "scraper_executor": scraper_executor.snapshot(),
+    }
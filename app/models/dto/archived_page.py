@@ -0,0 +1,10 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ArchivedPage(BaseModel):
+    symbol: str
+    fetched_at: datetime
+    digest: str
+    codec: str
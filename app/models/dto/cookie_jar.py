@@ -0,0 +1,8 @@
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+
+class CookieJar(BaseModel):
+    version: int = Field()
+    cookies: list[dict[str, Any]] = Field(default_factory=list)
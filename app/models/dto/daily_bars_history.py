@@ -0,0 +1,41 @@
+from pydantic import AliasChoices, BaseModel, Field
+
+
+class AggregateBar(BaseModel):
+    timestamp: int = Field(validation_alias=AliasChoices("t", "timestamp"))
+    open: float = Field(validation_alias=AliasChoices("o", "open"))
+    high: float = Field(validation_alias=AliasChoices("h", "high"))
+    low: float = Field(validation_alias=AliasChoices("l", "low"))
+    close: float = Field(validation_alias=AliasChoices("c", "close"))
+    volume: float = Field(validation_alias=AliasChoices("v", "volume"))
+
+
+class DailyBar(BaseModel):
+    date: str
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class DailyBarsHistory(BaseModel):
+    symbol: str
+    dates: list[str] = Field(default_factory=list)
+    open: list[float] = Field(default_factory=list)
+    high: list[float] = Field(default_factory=list)
+    low: list[float] = Field(default_factory=list)
+    close: list[float] = Field(default_factory=list)
+    volume: list[float] = Field(default_factory=list)
+
+    @classmethod
+    def from_bars(cls, symbol: str, bars: list[DailyBar]) -> "DailyBarsHistory":
+        return cls(
+            symbol=symbol,
+            dates=[bar.date for bar in bars],
+            open=[bar.open for bar in bars],
+            high=[bar.high for bar in bars],
+            low=[bar.low for bar in bars],
+            close=[bar.close for bar in bars],
+            volume=[bar.volume for bar in bars],
+        )
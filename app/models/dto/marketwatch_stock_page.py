@@ -0,0 +1,13 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+from app.models.dto.stock_response import CompetitorData, PerformanceData
+
+
+class MarketWatchStockPage(BaseModel):
+    symbol: str
+    company_name: str
+    performance: PerformanceData
+    competitors: list[CompetitorData] = Field(default_factory=list)
+    fetched_at: datetime
@@ -0,0 +1,24 @@
+from datetime import date, datetime
+from enum import StrEnum
+
+from pydantic import BaseModel, Field
+
+from app.models.dto.stock_response import StockData, StockError
+
+
+class ScrapeJobStatus(StrEnum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class ScrapeJob(BaseModel):
+    id: str = Field()
+    status: ScrapeJobStatus = Field()
+    symbol: str = Field()
+    request_date: date = Field()
+    created_at: datetime = Field()
+    finished_at: datetime | None = Field(None)
+    result: StockData | None = Field(None)
+    error: StockError | None = Field(None)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class PurchaseRequestBody(BaseModel):
@@ -7,3 +7,15 @@ class PurchaseRequestBody(BaseModel):
 
 class PurchaseResponse(BaseModel):
     message: str
+
+
+class BulkPurchaseEntry(BaseModel):
+    symbol: str = Field(min_length=1)
+    amount: int
+
+
+class BulkPurchaseResponse(BaseModel):
+    rows: int
+    symbols: int
+    elapsed_seconds: float
+    rows_per_second: float
@@ -38,3 +38,19 @@ class StockData(BaseModel):
     stock_values: StockValuesData = Field()
     performance_data: PerformanceData = Field()
     competitors: list[CompetitorData] = Field(default_factory=list)
+
+
+class StockError(BaseModel):
+    status_code: int = Field()
+    detail: str = Field()
+
+
+class BatchStockItem(BaseModel):
+    symbol: str = Field()
+    data: StockData | None = Field(None)
+    error: StockError | None = Field(None)
+
+
+class BatchStockData(BaseModel):
+    results: dict[str, StockData] = Field(default_factory=dict)
+    errors: dict[str, StockError] = Field(default_factory=dict)
@@ -1,5 +1,9 @@
+from app.models.tables.daily_bars import DailyBars
+from app.models.tables.purchase_totals import PurchaseTotals
 from app.models.tables.purchases import Purchases
 
 __all__: list[str] = [
+    "DailyBars",
+    "PurchaseTotals",
     "Purchases",
 ]
@@ -0,0 +1,22 @@
+import datetime
+
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.tables.base import Base
+
+
+class DailyBars(Base):
+    __tablename__: str = "daily_bars"
+    __table_args__ = (UniqueConstraint("symbol", "date", name="uq_daily_bars_symbol_date"),)
+
+    symbol: Mapped[str] = mapped_column()
+    date: Mapped[datetime.date] = mapped_column()
+    status: Mapped[str] = mapped_column()
+    open: Mapped[float] = mapped_column()
+    high: Mapped[float] = mapped_column()
+    low: Mapped[float] = mapped_column()
+    close: Mapped[float] = mapped_column()
+    volume: Mapped[float] = mapped_column()
+    after_hours: Mapped[float] = mapped_column()
+    pre_market: Mapped[float] = mapped_column()
@@ -0,0 +1,12 @@
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.models.tables.base import Base
+
+
+class PurchaseTotals(Base):
+    __tablename__: str = "purchase_totals"
+
+    company_code: Mapped[str] = mapped_column(unique=True)
+    # A running total outgrows a 32-bit integer long before any single purchase does.
+    total_amount: Mapped[int] = mapped_column(BigInteger)
@@ -6,5 +6,5 @@ from app.models.tables.base import Base
 class Purchases(Base):
     __tablename__: str = "purchases"
 
-    company_code: Mapped[str] = mapped_column()
+    company_code: Mapped[str] = mapped_column(index=True)
     amount: Mapped[int] = mapped_column()
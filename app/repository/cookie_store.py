@@ -0,0 +1,106 @@
+import json
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from app.app_config import Settings, get_settings
+from app.cache import cache_backend
+from app.models.dto.cookie_jar import CookieJar
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+COOKIE_JAR_KEY = "marketwatch:cookies"
+# Bumps the version and replaces the cookies in one step, so readers never see a version with other cookies.
+SAVE_COOKIES_SCRIPT = """
+local version = redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('HSET', KEYS[1], 'cookies', ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return version
+"""
+
+
+class CookieStoreInterface(ABC):
+    @abstractmethod
+    async def load(self) -> CookieJar | None:
+        """
+        Returns the most recently saved session cookies.
+
+        Returns:
+            CookieJar | None: The cookies and their version, or None if none were saved or they expired.
+        """
+
+    @abstractmethod
+    async def save(self, cookies: list[dict[str, Any]]) -> int:
+        """
+        Replaces the session cookies with a newer set.
+
+        Args:
+            cookies (list[dict[str, Any]]): The cookies of a session that just loaded a page without a CAPTCHA.
+
+        Returns:
+            int: The version of the saved cookies.
+        """
+
+
+class MemoryCookieStore(CookieStoreInterface):
+    """Cookie store private to the worker process."""
+
+    def __init__(self, ttl: int) -> None:
+        self.ttl: int = ttl
+        self._jar: CookieJar | None = None
+        self._expires_at: float = 0.0
+
+    async def load(self) -> CookieJar | None:
+        if self._jar is None or time.monotonic() >= self._expires_at:
+            return None
+        return self._jar
+
+    async def save(self, cookies: list[dict[str, Any]]) -> int:
+        version: int = (self._jar.version if self._jar is not None else 0) + 1
+        self._jar = CookieJar(version=version, cookies=cookies)
+        self._expires_at = time.monotonic() + self.ttl
+        return version
+
+
+class RedisCookieStore(CookieStoreInterface):
+    """Cookie store shared by every worker and container through Redis.
+
+    The cookies expire `ttl` seconds after they were last saved. Redis failures are logged and treated as a
+    missing jar, so scrapers fall back to their initial cookies instead of failing.
+    """
+
+    def __init__(self, ttl: int, redis: Redis) -> None:
+        self.ttl: int = ttl
+        self.redis: Redis = redis
+
+    async def load(self) -> CookieJar | None:
+        try:
+            cookie_jar: dict[bytes, bytes] = await self.redis.hgetall(COOKIE_JAR_KEY)
+        except RedisError as exp:
+            logger.warning("Failed to load the session cookies: %s", exp)
+            return None
+        if b"cookies" not in cookie_jar:
+            return None
+        return CookieJar(version=int(cookie_jar[b"version"]), cookies=json.loads(cookie_jar[b"cookies"]))
+
+    async def save(self, cookies: list[dict[str, Any]]) -> int:
+        try:
+            return await self.redis.eval(SAVE_COOKIES_SCRIPT, 1, COOKIE_JAR_KEY, json.dumps(cookies), self.ttl)
+        except RedisError as exp:
+            logger.warning("Failed to save the session cookies: %s", exp)
+            return 0
+
+
+def build_cookie_store(settings: Settings) -> CookieStoreInterface:
+    """Builds the cookie store selected by `cookie_store_backend`: "redis" (default) or "memory"."""
+    if settings.cookie_store_backend == "memory":
+        return MemoryCookieStore(ttl=settings.cookie_store_ttl)
+    return RedisCookieStore(ttl=settings.cookie_store_ttl, redis=cache_backend.redis)
+
+
+cookie_store: CookieStoreInterface = build_cookie_store(settings)
@@ -0,0 +1,116 @@
+import logging
+from abc import ABC, abstractmethod
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from datetime import date, datetime, timezone
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app_config import Settings
+from app.database import sessionmanager
+from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
+from app.models.tables.daily_bars import DailyBars
+
+logger: logging.Logger = logging.getLogger()
+SessionFactory = Callable[[], AbstractAsyncContextManager[AsyncSession]]
+
+
+class DailyBarsRepositoryInterface(ABC):
+    @abstractmethod
+    async def get_daily_bar(self, stock_symbol: str, date: date) -> DailyOpenCloseStock | None:
+        """
+        Retrieve the stored daily bar of a stock symbol for a given date.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve the bar for.
+            date (date): The date of the bar.
+
+        Returns:
+            DailyOpenCloseStock | None: The stored bar, or None if it was never stored.
+        """
+
+    @abstractmethod
+    async def get_daily_bars(self, stock_symbol: str, from_date: date, to_date: date) -> list[DailyOpenCloseStock]:
+        """
+        Retrieve the stored daily bars of a stock symbol for a date range.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve the bars for.
+            from_date (date): The first date of the range.
+            to_date (date): The last date of the range, inclusive.
+
+        Returns:
+            list[DailyOpenCloseStock]: The stored bars in the range, sorted by date.
+        """
+
+    @abstractmethod
+    async def save_daily_bar(self, daily_bar: DailyOpenCloseStock) -> None:
+        """
+        Store a daily bar. A bar already stored for the same symbol and date is kept as is.
+
+        Args:
+            daily_bar (DailyOpenCloseStock): The bar to store.
+        """
+
+
+class DailyBarsRepository(DailyBarsRepositoryInterface):
+    """Daily bars stored in Postgres.
+
+    Each call uses its own short-lived session, so lookups can run concurrently with the queries made on the
+    request session.
+    """
+
+    def __init__(self, settings: Settings, session_factory: SessionFactory = sessionmanager.session) -> None:
+        self.settings: Settings = settings
+        self.session_factory: SessionFactory = session_factory
+
+    async def get_daily_bar(self, stock_symbol: str, date: date) -> DailyOpenCloseStock | None:
+        async with self.session_factory() as session:
+            daily_bar: DailyBars | None = await session.scalar(
+                select(DailyBars).where(DailyBars.symbol == stock_symbol, DailyBars.date == date)
+            )
+        if daily_bar is None:
+            return None
+        return self._to_daily_open_close_stock(daily_bar)
+
+    async def get_daily_bars(self, stock_symbol: str, from_date: date, to_date: date) -> list[DailyOpenCloseStock]:
+        async with self.session_factory() as session:
+            daily_bars = await session.scalars(
+                select(DailyBars)
+                .where(DailyBars.symbol == stock_symbol, DailyBars.date.between(from_date, to_date))
+                .order_by(DailyBars.date)
+            )
+            return [self._to_daily_open_close_stock(daily_bar) for daily_bar in daily_bars]
+
+    def _to_daily_open_close_stock(self, daily_bar: DailyBars) -> DailyOpenCloseStock:
+        return DailyOpenCloseStock(
+            status=daily_bar.status,
+            date=daily_bar.date.isoformat(),
+            symbol=daily_bar.symbol,
+            open=daily_bar.open,
+            high=daily_bar.high,
+            low=daily_bar.low,
+            close=daily_bar.close,
+            volume=daily_bar.volume,
+            after_hours=daily_bar.after_hours,
+            pre_market=daily_bar.pre_market,
+        )
+
+    async def save_daily_bar(self, daily_bar: DailyOpenCloseStock) -> None:
+        # Core inserts skip the ORM timestamp events, so the timestamps are set here.
+        now = datetime.now(timezone.utc)
+        statement = (
+            insert(DailyBars)
+            .values(
+                **daily_bar.model_dump(exclude={"date"}),
+                date=date.fromisoformat(daily_bar.date),
+                created_at=now,
+                updated_at=now,
+            )
+            .on_conflict_do_nothing(index_elements=[DailyBars.symbol, DailyBars.date])
+        )
+        async with self.session_factory() as session:
+            await session.execute(statement)
+            await session.commit()
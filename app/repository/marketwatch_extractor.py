@@ -0,0 +1,102 @@
+import importlib.util
+import re
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from app.app_config import Settings
+from app.common.currency_utils import convert_currency_string
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+from app.models.dto.stock_response import CompetitorData, PerformanceData
+
+# Matched against the whole class attribute, which the strainer may see before it is split into classes.
+STOCK_PAGE_REGIONS = SoupStrainer(
+    ["div", "h1"], class_=re.compile(r"(^|\s)(performance|Competitors|company__name)(\s|$)")
+)
+
+
+@lru_cache
+def get_fastest_parser() -> str:
+    """Returns the fastest HTML parser BeautifulSoup can use here: lxml (C-backed) if installed, html.parser
+    otherwise.
+    """
+    return "lxml" if importlib.util.find_spec("lxml") is not None else "html.parser"
+
+
+class StockPageExtractorInterface(ABC):
+    @abstractmethod
+    def extract(self, stock_symbol: str, page_html: str) -> MarketWatchStockPage:
+        """
+        Extracts the performance data, competitors and company name from the HTML of a stock page.
+
+        Args:
+            stock_symbol (str): The symbol of the stock the page belongs to.
+            page_html (str): The HTML of the stock page.
+
+        Returns:
+            MarketWatchStockPage: The values extracted from the page.
+        """
+
+
+class FullPageExtractor(StockPageExtractorInterface):
+    """Parses the whole page into a tree before reading the values from it."""
+
+    def __init__(self, parser: str) -> None:
+        self.parser: str = parser
+
+    def _parse(self, page_html: str) -> BeautifulSoup:
+        return BeautifulSoup(page_html, self.parser)
+
+    def extract(self, stock_symbol: str, page_html: str) -> MarketWatchStockPage:
+        stock_page: BeautifulSoup = self._parse(page_html)
+
+        performance_div = stock_page.find("div", class_="performance")
+        performance_rows = performance_div.find_all("tr", class_="table__row")
+        performance_data = {
+            table_row.find("td").text: table_row.find("li").text.replace("%", "") for table_row in performance_rows
+        }
+
+        competitors_div = stock_page.find("div", class_="Competitors")
+        competitors_rows = competitors_div.find("tbody").find_all("tr")
+        competitors_data: list[CompetitorData] = [
+            CompetitorData.model_validate(
+                {
+                    "name": table_row.find("a", class_="link").text,
+                    "market_cap": convert_currency_string(table_row.find_all("td")[2].text),
+                }
+            )
+            for table_row in competitors_rows
+        ]
+
+        return MarketWatchStockPage(
+            symbol=stock_symbol,
+            company_name=stock_page.find("h1", class_="company__name").text,
+            performance=PerformanceData.model_validate(performance_data),
+            competitors=competitors_data,
+            fetched_at=datetime.now(timezone.utc),
+        )
+
+
+class StrainedPageExtractor(FullPageExtractor):
+    """Only builds the tree of the three regions the values are read from, skipping the rest of the page."""
+
+    def _parse(self, page_html: str) -> BeautifulSoup:
+        return BeautifulSoup(page_html, self.parser, parse_only=STOCK_PAGE_REGIONS)
+
+
+def build_stock_page_extractor(settings: Settings) -> StockPageExtractorInterface:
+    """Builds the stock page extractor configured in the settings.
+
+    Args:
+        settings (Settings): `marketwatch_extractor` selects "strained" (default) or "full", and
+            `marketwatch_html_parser` the BeautifulSoup parser; the fastest one available when it is empty.
+
+    Returns:
+        StockPageExtractorInterface: The extractor.
+    """
+    parser: str = settings.marketwatch_html_parser or get_fastest_parser()
+    if settings.marketwatch_extractor == "full":
+        return FullPageExtractor(parser)
+    return StrainedPageExtractor(parser)
@@ -1,16 +1,16 @@
 import asyncio
 import logging
-import random
-import time
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
-from functools import lru_cache
-from typing import Any, ClassVar, List
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, ClassVar
+from weakref import WeakKeyDictionary
 
-from bs4 import BeautifulSoup
+import httpx
 from fake_useragent import UserAgent
+from fastapi import HTTPException
 from selenium import webdriver
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.remote.webelement import WebElement
@@ -21,19 +21,44 @@ from tenacity import (
     retry,
     retry_if_exception_type,
     stop_after_attempt,
-    wait_random,
 )
 
 from app.app_config import Settings
-from app.common.currency_utils import convert_currency_string
+from app.executor import ExecutorSaturatedError, scraper_executor
+from app.http_client import HttpClientManager
+from app.models.dto.archived_page import ArchivedPage
+from app.models.dto.cookie_jar import CookieJar
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
 from app.models.dto.stock_response import (
     CompetitorData,
     PerformanceData,
 )
+from app.repository.cookie_store import cookie_store
+from app.repository.marketwatch_extractor import StockPageExtractorInterface, build_stock_page_extractor
+from app.repository.page_archive import page_archive
+from app.repository.page_snapshot_cache import stock_page_cache
+from app.repository.scrape_pacer import scrape_pacer
+from app.repository.webdriver_pool import webdriver_pool
 
 logger: logging.Logger = logging.getLogger()
 OPEN_CLOSE_ENDPOINT = "/v1/open-close/{stock_symbol}/{date}?adjusted=true&apiKey={api_key}"
 STOCK_DETAILS_ENDPOINT = "/investing/stock/{stock_symbol}"
+CAPTCHA_MARKER = "captcha-delivery"
+PAGE_RENDERED_SCRIPT = (
+    "return document.querySelector('h1.company__name') !== null"
+    f" || document.documentElement.innerHTML.includes('{CAPTCHA_MARKER}')"
+)
+HTTP_FETCH_HEADERS: dict[str, str] = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Sec-Fetch-Dest": "document",
+    "Sec-Fetch-Mode": "navigate",
+    "Sec-Fetch-Site": "none",
+    "Sec-Fetch-User": "?1",
+    "Upgrade-Insecure-Requests": "1",
+}
 INITIAL_COOKIES_VALUE: list[dict[str, Any]] = [
     {
         "domain": ".marketwatch.com",
@@ -45,7 +70,10 @@ INITIAL_COOKIES_VALUE: list[dict[str, Any]] = [
         "secure": True,
         "session": False,
         "storeId": "0",
-        "value": "Zx~2lSVM4otlHRuJdSmuaWEFopnrcmo5f58eaqgvFdj3iSVkbdNzEuaVjIVPpZoiAR_n3obvgc7vzjrDTaJs163lH5vb2Pz6qlOWA0PXuuZ4wvL3z8QZplcsCZwUGAaV",
+        "value": (
+            "Zx~2lSVM4otlHRuJdSmuaWEFopnrcmo5f58eaqgvFdj3iSVkbdNzEuaVjIVPpZoiAR_n3obvgc7vzjrDTaJs163lH5vb2Pz6qlOWA0PXuu"
+            "Z4wvL3z8QZplcsCZwUGAaV"
+        ),
     },
 ]
 
@@ -53,7 +81,49 @@ INITIAL_COOKIES_VALUE: list[dict[str, Any]] = [
 class CatchByBotDetectionError(Exception): ...
 
 
+class FetchTierMetrics:
+    """Counts, per fetch tier, how many page fetches were attempted and how many succeeded."""
+
+    def __init__(self) -> None:
+        self.attempts: Counter[str] = Counter()
+        self.hits: Counter[str] = Counter()
+
+    def record(self, tier: str, hit: bool) -> None:
+        self.attempts[tier] += 1
+        if hit:
+            self.hits[tier] += 1
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {
+            tier: {
+                "attempts": attempts,
+                "hits": self.hits[tier],
+                "hit_rate": self.hits[tier] / attempts,
+            }
+            for tier, attempts in self.attempts.items()
+        }
+
+
+fetch_tier_metrics = FetchTierMetrics()
+marketwatch_client_manager = HttpClientManager(
+    headers={**HTTP_FETCH_HEADERS, "User-Agent": UserAgent(browsers=["Chrome"]).random},
+    follow_redirects=True,
+)
+
+
 class MarketWatchRepositoryInterface(ABC):
+    @abstractmethod
+    async def get_stock_page(self, stock_symbol: str) -> MarketWatchStockPage:
+        """
+        Retrieves a snapshot of the stock page with every value extracted from a single fetch.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve the page for.
+
+        Returns:
+            MarketWatchStockPage: The company name, performance data and competitors of the stock.
+        """
+
     @abstractmethod
     async def get_stock_performance_by_symbol(self, stock_symbol: str) -> PerformanceData:
         """
@@ -74,7 +144,8 @@ class MarketWatchRepositoryInterface(ABC):
             stock_symbol (str): The symbol of the stock to retrieve competitors for.
 
         Returns:
-            list[CompetitorData]: A list of CompetitorData objects containing competitor names and market capitalizations.
+            list[CompetitorData]: A list of CompetitorData objects containing competitor names and market
+                capitalizations.
         """
 
     @abstractmethod
@@ -91,10 +162,16 @@ class MarketWatchRepositoryInterface(ABC):
 
 
 class MarketWatchRepository(MarketWatchRepositoryInterface):
-    cookies: ClassVar[list[dict[str, Any]] | None] = INITIAL_COOKIES_VALUE
+    _applied_cookie_versions: ClassVar[WeakKeyDictionary[webdriver.Remote, int]] = WeakKeyDictionary()
+    _stock_page_requests: ClassVar[dict[str, asyncio.Task[MarketWatchStockPage]]] = {}
 
     def __init__(self, settings: Settings) -> None:
         self.settings: Settings = settings
+        self.extractor: StockPageExtractorInterface = build_stock_page_extractor(settings)
+
+    @property
+    def _host(self) -> str:
+        return httpx.URL(self.settings.marketwatch_base_url).host
 
     @property
     def _chrome_options(self) -> Options:
@@ -156,122 +233,285 @@ class MarketWatchRepository(MarketWatchRepositoryInterface):
         Returns:
             bool: True if a CAPTCHA script is found, False otherwise.
         """
-        return "captcha-delivery" in driver.page_source
+        return CAPTCHA_MARKER in driver.page_source
+
+    async def _load_cookies(self) -> CookieJar:
+        """
+        Returns the session cookies shared through the cookie store, or the initial cookies if none are stored.
+        """
+        return await cookie_store.load() or CookieJar(version=0, cookies=INITIAL_COOKIES_VALUE)
 
-    def _set_cookies(self, driver: webdriver.Chrome) -> None:
+    def _set_cookies(self, driver: webdriver.Chrome, cookie_jar: CookieJar) -> None:
         """
-        Sets cookies for the provided Chrome driver by adding cookies from the MarketWatchRepository class if available.
+        Sets the cookies of a cookie jar on the provided Chrome driver, unless the driver already carries that version.
 
         Args:
             driver (webdriver.Chrome): The Chrome driver instance to set cookies for.
+            cookie_jar (CookieJar): The cookies to set.
         """
+        if MarketWatchRepository._applied_cookie_versions.get(driver) == cookie_jar.version:
+            return
         driver.get(self.settings.marketwatch_base_url)
-        if (cookies := MarketWatchRepository.cookies) is not None:
-            for cookie in cookies:
-                driver.add_cookie(cookie)
+        for cookie in cookie_jar.cookies:
+            driver.add_cookie(cookie)
+        MarketWatchRepository._applied_cookie_versions[driver] = cookie_jar.version
+
+    @staticmethod
+    def _datadome_cookie(cookies: list[dict[str, Any]]) -> str | None:
+        return next((cookie["value"] for cookie in cookies if cookie.get("name") == "datadome"), None)
 
-    def _save_cookies(self, driver: webdriver.Chrome) -> None:
+    async def _save_cookies(self, driver: webdriver.Chrome, cookie_jar: CookieJar) -> None:
         """
-        Save the cookies from the WebDriver to the MarketWatchRepository class variable.
+        Saves the cookies of a WebDriver that just loaded a page without a CAPTCHA to the cookie store, so every
+        scraper reuses them. Nothing is saved while the datadome session cookie is still the one of the cookie jar
+        the driver was given, so other drivers do not reload unchanged cookies. Callers are expected to hold a scraper
+        executor slot.
 
         Args:
             driver (webdriver.Chrome): The Chrome WebDriver instance.
+            cookie_jar (CookieJar): The cookies the driver was given before loading the page.
         """
-        MarketWatchRepository.cookies = driver.get_cookies()
-
-    def _random_sleep(self) -> None:
-        time.sleep(random.uniform(0.5, 3.5))
+        cookies: list[dict[str, Any]] = await scraper_executor.run(driver.get_cookies)
+        if self._datadome_cookie(cookies) == self._datadome_cookie(cookie_jar.cookies):
+            MarketWatchRepository._applied_cookie_versions[driver] = cookie_jar.version
+            return
+        version: int = await cookie_store.save(cookies)
+        MarketWatchRepository._applied_cookie_versions[driver] = version
 
-    @lru_cache
-    @retry(
-        stop=stop_after_attempt(10),
-        wait=wait_random(min=1, max=2),
-        retry=retry_if_exception_type(CatchByBotDetectionError),
-        before=before_log(logger, logging.INFO),
-        after=after_log(logger, logging.INFO),
-    )
-    def _get_stock_page_html(self, stock_symbol: str) -> BeautifulSoup:
+    def _wait_for_page(self, driver: webdriver.Chrome) -> None:
         """
-        Retrieves the HTML content of a stock page using the provided stock symbol.
-        Utilizes caching and retry mechanisms with a maximum of 10 attempts.
-        Handles bot detection errors and closes subscriber banners if necessary.
+        Waits until the stock page or a CAPTCHA is rendered, for at most `marketwatch_page_ready_timeout` seconds.
 
         Args:
-            stock_symbol (str): The symbol of the stock to retrieve the page for.
+            driver (webdriver.Chrome): The Chrome driver instance used to access the webpage.
+        """
+        try:
+            WebDriverWait(driver, timeout=self.settings.marketwatch_page_ready_timeout).until(
+                lambda d: d.execute_script(PAGE_RENDERED_SCRIPT)
+            )
+        except TimeoutException:
+            logger.info("Stock page was not rendered in time, reading it as it is.")
+
+    def _create_webdriver(self) -> webdriver.Remote:
+        """
+        Starts a remote Chrome session ready to be pooled. The shared cookies are applied before its first scrape.
 
         Returns:
-            BeautifulSoup: The parsed HTML content of the stock page.
+            webdriver.Remote: The new WebDriver session.
         """
-        with webdriver.Remote(
+        driver = webdriver.Remote(
             command_executor=self.settings.remote_chrome_webdriver_address,
             options=self._chrome_options,
-        ) as driver:
-            driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-            driver.maximize_window()
-            driver.set_page_load_timeout(60)
-            driver.implicitly_wait(2)
-            self._set_cookies(driver)
+        )
+        driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
+        driver.maximize_window()
+        driver.set_page_load_timeout(60)
+        driver.implicitly_wait(2)
+        return driver
+
+    def _get_stock_page_html(self, driver: webdriver.Remote, stock_symbol: str, cookie_jar: CookieJar) -> str:
+        """
+        Retrieves the HTML content of a stock page using the provided stock symbol and WebDriver session.
+        Applies the shared cookies if the session does not carry them yet, waits for the page to render instead of
+        sleeping, then handles bot detection errors and closes subscriber banners if necessary.
+
+        Args:
+            driver (webdriver.Remote): The WebDriver session used to load the page.
+            stock_symbol (str): The symbol of the stock to retrieve the page for.
+            cookie_jar (CookieJar): The shared session cookies.
 
-            self._random_sleep()
+        Returns:
+            str: The HTML of the stock page.
+
+        Raises:
+            CatchByBotDetectionError: If the page was answered with a CAPTCHA.
+        """
+        self._set_cookies(driver, cookie_jar)
+        uri: str = f"{self.settings.marketwatch_base_url}{STOCK_DETAILS_ENDPOINT.format(stock_symbol=stock_symbol)}"
+        driver.get(uri)
 
-            uri: str = f"{self.settings.marketwatch_base_url}{STOCK_DETAILS_ENDPOINT.format(stock_symbol=stock_symbol)}"
-            driver.get(uri)
+        self._wait_for_page(driver)
+        if self._is_captcha_open(driver):
+            logger.warning("Catch by bot detection.")
+            raise CatchByBotDetectionError()
 
-            self._random_sleep()
-            if self._is_captcha_open(driver):
-                logger.warning("Catch by bot detection.")
-                raise CatchByBotDetectionError()
+        self._close_subscriber_banner(driver)
+        return driver.page_source
 
-            self._close_subscriber_banner(driver)
-            page_html: str = driver.page_source
-            self._save_cookies(driver)
-            return BeautifulSoup(page_html, "html.parser")
+    async def _http_get_stock_page_html(self, stock_symbol: str) -> str | None:
+        """Fetches the stock page with a plain HTTP request carrying the saved cookies, paced by `scrape_pacer`.
 
-    async def _async_get_stock_page_html(self, stock_symbol: str) -> BeautifulSoup:
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve the page for.
+
+        Returns:
+            str | None: The page HTML, or None if the request failed or was answered with a CAPTCHA.
+        """
+        uri: str = f"{self.settings.marketwatch_base_url}{STOCK_DETAILS_ENDPOINT.format(stock_symbol=stock_symbol)}"
+        cookie_jar: CookieJar = await self._load_cookies()
+        cookie_header: str = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookie_jar.cookies)
+        await scrape_pacer.wait(self._host)
+        try:
+            response: httpx.Response = await marketwatch_client_manager.client.get(
+                uri, headers={"Cookie": cookie_header}, timeout=self.settings.marketwatch_http_timeout
+            )
+        except httpx.HTTPError as exp:
+            logger.warning("HTTP fetch of %s failed: %s", uri, exp)
+            return None
+
+        captcha: bool = CAPTCHA_MARKER in response.text
+        if captcha or response.status_code == httpx.codes.OK:
+            scrape_pacer.record(self._host, captcha=captcha)
+        if response.status_code != httpx.codes.OK or captcha:
+            logger.info("HTTP fetch of %s answered with %s, escalating to browser.", uri, response.status_code)
+            return None
+        return response.text
+
+    @retry(
+        stop=stop_after_attempt(10),
+        retry=retry_if_exception_type(CatchByBotDetectionError),
+        before=before_log(logger, logging.INFO),
+        after=after_log(logger, logging.INFO),
+    )
+    async def _browser_get_stock_page_html(self, stock_symbol: str) -> str:
         """Asynchronously retrieves the HTML content of a stock page using a provided stock symbol.
+        Borrows a warm session from the WebDriver pool and retries with a maximum of 10 attempts; a session
+        caught by bot detection is discarded, so every retry runs on a different one. The cookies of a session that
+        gets through are saved to the cookie store for every other scraper.
+        Each attempt first waits for its slot from `scrape_pacer`, which also sets the spacing between retries;
+        the scrape then runs on the shared scraper executor and is rejected right away when it is saturated.
 
         Args:
             stock_symbol (str): The symbol of the stock to retrieve the page for.
 
         Returns:
-            BeautifulSoup: The parsed HTML content of the stock page.
+            str: The HTML of the stock page.
+
+        Raises:
+            HTTPException: 503 if the scraper executor is saturated.
         """
-        executor = ThreadPoolExecutor(max_workers=5)
-        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        await scrape_pacer.wait(self._host)
+        cookie_jar: CookieJar = await self._load_cookies()
         try:
-            return await loop.run_in_executor(executor, self._get_stock_page_html, stock_symbol)
-        finally:
-            executor.shutdown(wait=True)
+            async with scraper_executor.admit(), webdriver_pool.acquire(self._create_webdriver) as session:
+                page_html: str = await scraper_executor.run(
+                    self._get_stock_page_html, session.driver, stock_symbol, cookie_jar
+                )
+                await self._save_cookies(session.driver, cookie_jar)
+        except CatchByBotDetectionError:
+            scrape_pacer.record(self._host, captcha=True)
+            raise
+        except ExecutorSaturatedError as exp:
+            logger.warning("Scraper saturated, shedding %s: %s", stock_symbol, exp)
+            raise HTTPException(status_code=503, detail="Scraper is busy. Please try again later.")
+        scrape_pacer.record(self._host, captcha=False)
+        return page_html
+
+    async def _async_get_stock_page_html(self, stock_symbol: str) -> str:
+        """Retrieves the stock page through the cheapest tier that works.
+
+        A plain HTTP request is tried first; only when it fails or hits a CAPTCHA does the fetch escalate to a
+        pooled browser session. The outcome of each tier is recorded in `fetch_tier_metrics`.
 
-    async def get_stock_performance_by_symbol(self, stock_symbol: str) -> PerformanceData:
-        stock_page: BeautifulSoup = await self._async_get_stock_page_html(stock_symbol)
-        performance_div = stock_page.find("div", class_="performance")
-        table_rows = performance_div.find_all("tr", class_="table__row")
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve the page for.
 
-        performance_data = {
-            table_row.find("td").text: table_row.find("li").text.replace("%", "") for table_row in table_rows
-        }
+        Returns:
+            str: The HTML of the stock page.
+        """
+        if self.settings.marketwatch_http_fetch_enabled:
+            page_html: str | None = await self._http_get_stock_page_html(stock_symbol)
+            fetch_tier_metrics.record("http", hit=page_html is not None)
+            if page_html is not None:
+                return page_html
 
-        return PerformanceData.model_validate(performance_data)
+        try:
+            page_html = await self._browser_get_stock_page_html(stock_symbol)
+        except Exception:
+            fetch_tier_metrics.record("browser", hit=False)
+            raise
+        fetch_tier_metrics.record("browser", hit=True)
+        return page_html
+
+    async def _archive_stock_page(self, stock_symbol: str, page_html: str) -> None:
+        """Writes the HTML of a fetched page to `page_archive`. A failed write is logged and does not fail the fetch."""
+        try:
+            await asyncio.to_thread(page_archive.save, stock_symbol, page_html, datetime.now(timezone.utc))
+        except (OSError, ValueError) as exp:
+            logger.warning("Failed to archive the stock page of %s: %s", stock_symbol, exp)
+
+    async def _fetch_stock_page(self, stock_symbol: str) -> MarketWatchStockPage:
+        page_html: str = await self._async_get_stock_page_html(stock_symbol)
+        if self.settings.page_archive_enabled:
+            await self._archive_stock_page(stock_symbol, page_html)
+        # Parsing is CPU bound, so it runs off the event loop; only the extracted values outlive it.
+        snapshot: MarketWatchStockPage = await asyncio.to_thread(self.extractor.extract, stock_symbol, page_html)
+        stock_page_cache.put(stock_symbol, snapshot)
+        logger.info(f"Fetched stock page for stock symbol: {stock_symbol}")
+        return snapshot
+
+    async def get_stock_page(self, stock_symbol: str) -> MarketWatchStockPage:
+        """
+        Returns the snapshot of the stock page held by `stock_page_cache` while it is fresher than
+        `marketwatch_page_freshness_time`. Otherwise fetches the page once; concurrent callers for the same symbol
+        wait on the same fetch.
+        """
+        snapshot: MarketWatchStockPage | None = stock_page_cache.get(
+            stock_symbol, ttl=self.settings.marketwatch_page_freshness_time
+        )
+        if snapshot is not None:
+            return snapshot
+
+        requests = MarketWatchRepository._stock_page_requests
+        if (request := requests.get(stock_symbol)) is None:
+            request = asyncio.ensure_future(self._fetch_stock_page(stock_symbol))
+            requests[stock_symbol] = request
+            request.add_done_callback(lambda _: requests.pop(stock_symbol, None))
+        return await asyncio.shield(request)
+
+    async def get_stock_performance_by_symbol(self, stock_symbol: str) -> PerformanceData:
+        stock_page: MarketWatchStockPage = await self.get_stock_page(stock_symbol)
+        return stock_page.performance
 
     async def get_stock_competitors_by_symbol(self, stock_symbol: str) -> list[CompetitorData]:
-        competitors_class = "Competitors"
         logger.info(f"Retrieving competitors for stock symbol: {stock_symbol}")
-        stock_page: BeautifulSoup = await self._async_get_stock_page_html(stock_symbol)
-        competitors_div = stock_page.find("div", class_=competitors_class)
-        table_rows = competitors_div.find("tbody").find_all("tr")
-        competitors_data: List[CompetitorData] = [
-            CompetitorData.model_validate(
-                {
-                    "name": table_row.find("a", class_="link").text,
-                    "market_cap": convert_currency_string(table_row.find_all("td")[2].text),
-                }
-            )
-            for table_row in table_rows
-        ]
-        logger.info(f"Retrieved {len(competitors_data)} competitors for stock symbol: {stock_symbol}")
-        return competitors_data
+        stock_page: MarketWatchStockPage = await self.get_stock_page(stock_symbol)
+        return stock_page.competitors
 
     async def get_company_name_by_symbol(self, stock_symbol: str) -> str:
-        stock_page: BeautifulSoup = await self._async_get_stock_page_html(stock_symbol)
-        return stock_page.find("h1", class_="company__name").text
+        stock_page: MarketWatchStockPage = await self.get_stock_page(stock_symbol)
+        return stock_page.company_name
+
+
+async def seed_stock_page_cache(settings: Settings) -> int:
+    """
+    Fills `stock_page_cache` from the latest archived page of every symbol fetched less than
+    `page_archive_seed_max_age` seconds ago, so a restarted worker does not scrape those pages again. The default
+    window matches `cache_marketwatch_page_time`, the age of the pages the shared cache serves anyway. Seeded
+    snapshots are served for `marketwatch_page_freshness_time` after startup, as if they had just been fetched.
+
+    Args:
+        settings (Settings): The application settings.
+
+    Returns:
+        int: The number of snapshots seeded.
+    """
+    extractor: StockPageExtractorInterface = build_stock_page_extractor(settings)
+
+    def extract_archived_pages() -> list[MarketWatchStockPage]:
+        snapshots: list[MarketWatchStockPage] = []
+        archived_page: ArchivedPage
+        for archived_page, page_html in page_archive.latest(settings.page_archive_seed_max_age):
+            try:
+                snapshot: MarketWatchStockPage = extractor.extract(archived_page.symbol, page_html)
+            except Exception as exp:
+                logger.warning("Failed to extract the archived page %s: %s", archived_page.digest, exp)
+                continue
+            snapshots.append(snapshot.model_copy(update={"fetched_at": archived_page.fetched_at}))
+        return snapshots
+
+    snapshots: list[MarketWatchStockPage] = await asyncio.to_thread(extract_archived_pages)
+    for snapshot in snapshots:
+        stock_page_cache.put(snapshot.symbol, snapshot)
+    logger.info("Seeded %d stock page snapshots from the page archive", len(snapshots))
+    return len(snapshots)
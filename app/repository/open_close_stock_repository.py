@@ -1,18 +1,27 @@
 import logging
 from abc import ABC, abstractmethod
-from concurrent.futures import ThreadPoolExecutor
-from datetime import date
+from datetime import date, datetime
 
 import httpx
 from fastapi import HTTPException
+from sqlalchemy.exc import SQLAlchemyError
 
 from app.app_config import Settings
+from app.common.datetime_utils import MARKET_TIMEZONE
+from app.common.market_calendar import is_session_final
+from app.http_client import polygon_client_manager
+from app.models.dto.daily_bars_history import AggregateBar, DailyBar
 from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
+from app.repository.daily_bars_repository import DailyBarsRepositoryInterface
 
 logger: logging.Logger = logging.getLogger()
 OPEN_CLOSE_ENDPOINT = "/v1/open-close/{stock_symbol}/{date}?adjusted=true&apiKey={api_key}"
+AGGREGATES_ENDPOINT = (
+    "/v2/aggs/ticker/{stock_symbol}/range/1/day/{from_date}/{to_date}"
+    "?adjusted=true&sort=asc&limit=50000&apiKey={api_key}"
+)
+TICKER_DETAILS_ENDPOINT = "/v3/reference/tickers/{stock_symbol}?apiKey={api_key}"
 STOCK_DETAILS_ENDPOINT = "/investing/stock/{stock_symbol}"
-executor = ThreadPoolExecutor(max_workers=5)
 
 
 class OpenCloseStockRepositoryInterface(ABC):
@@ -32,19 +41,85 @@ class OpenCloseStockRepositoryInterface(ABC):
             HTTPException: If there is an internal error or the stock is not found.
         """
 
+    @abstractmethod
+    async def get_daily_bars(self, stock_symbol: str, from_date: date, to_date: date) -> list[DailyBar]:
+        """
+        Asynchronous method to retrieve the daily bars of a stock symbol for a date range in a single request.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve data for.
+            from_date (date): The first date of the range.
+            to_date (date): The last date of the range, inclusive.
+
+        Returns:
+            list[DailyBar]: The bars of the trading days in the range, sorted by date.
+
+        Raises:
+            HTTPException: If there is an internal error.
+        """
+
+    @abstractmethod
+    async def is_known_symbol(self, stock_symbol: str) -> bool:
+        """
+        Asynchronous method to check whether Polygon knows a stock symbol at all.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to check.
+
+        Returns:
+            bool: False only if Polygon answered that the symbol does not exist.
+        """
+
 
 class OpenCloseStockRepository(OpenCloseStockRepositoryInterface):
-    def __init__(self, settings: Settings) -> None:
+    def __init__(
+        self,
+        settings: Settings,
+        client: httpx.AsyncClient | None = None,
+        daily_bars_repository: DailyBarsRepositoryInterface | None = None,
+    ) -> None:
         self.settings: Settings = settings
+        self.client: httpx.AsyncClient = client or polygon_client_manager.client
+        self.daily_bars_repository: DailyBarsRepositoryInterface | None = daily_bars_repository
 
     async def get_daily_open_close_sotck(self, stock_symbol: str, date: date) -> DailyOpenCloseStock:
-        uri: str = f"{self.settings.polygon_base_url}{OPEN_CLOSE_ENDPOINT.format(stock_symbol=stock_symbol, date=date, api_key=self.settings.polygon_api_key)}"
-        async with httpx.AsyncClient() as client:
-            try:
-                response_data: httpx.Response = await client.get(uri)
-            except httpx.RequestError as exp:
-                logger.error("Failed to request data: %s", exp)
-                raise HTTPException(status_code=500, detail="Internal error. Please contact support.")
+        """
+        Bars of final sessions never change, so when a daily bars repository is given they are read from it first
+        and stored in it after being fetched from Polygon. Bars of a session still trading, including its extended
+        hours, always go to Polygon.
+        """
+        is_final: bool = self.daily_bars_repository is not None and is_session_final(date)
+        if is_final and (daily_bar := await self._get_stored_daily_bar(stock_symbol, date)) is not None:
+            return daily_bar
+
+        daily_bar = await self._request_daily_open_close_stock(stock_symbol, date)
+        if is_final:
+            await self._store_daily_bar(daily_bar)
+        return daily_bar
+
+    async def _get_stored_daily_bar(self, stock_symbol: str, date: date) -> DailyOpenCloseStock | None:
+        try:
+            return await self.daily_bars_repository.get_daily_bar(stock_symbol, date)
+        except SQLAlchemyError as exp:
+            logger.warning("Failed to read stored daily bar of %s (%s): %s", stock_symbol, date, exp)
+            return None
+
+    async def _store_daily_bar(self, daily_bar: DailyOpenCloseStock) -> None:
+        try:
+            await self.daily_bars_repository.save_daily_bar(daily_bar)
+        except SQLAlchemyError as exp:
+            logger.warning("Failed to store daily bar of %s (%s): %s", daily_bar.symbol, daily_bar.date, exp)
+
+    async def _request_daily_open_close_stock(self, stock_symbol: str, date: date) -> DailyOpenCloseStock:
+        endpoint: str = OPEN_CLOSE_ENDPOINT.format(
+            stock_symbol=stock_symbol, date=date, api_key=self.settings.polygon_api_key
+        )
+        uri: str = f"{self.settings.polygon_base_url}{endpoint}"
+        try:
+            response_data: httpx.Response = await self.client.get(uri)
+        except httpx.RequestError as exp:
+            logger.error("Failed to request data: %s", exp)
+            raise HTTPException(status_code=500, detail="Internal error. Please contact support.")
         match response_data.status_code:
             case 200:
                 return DailyOpenCloseStock.model_validate(response_data.json())
@@ -59,3 +134,43 @@ class OpenCloseStockRepository(OpenCloseStockRepositoryInterface):
                     response_data.json(),
                 )
                 raise HTTPException(status_code=500, detail="Internal error. Please contact support.")
+
+    async def get_daily_bars(self, stock_symbol: str, from_date: date, to_date: date) -> list[DailyBar]:
+        endpoint: str = AGGREGATES_ENDPOINT.format(
+            stock_symbol=stock_symbol, from_date=from_date, to_date=to_date, api_key=self.settings.polygon_api_key
+        )
+        uri: str = f"{self.settings.polygon_base_url}{endpoint}"
+        try:
+            response_data: httpx.Response = await self.client.get(uri)
+        except httpx.RequestError as exp:
+            logger.error("Failed to request data: %s", exp)
+            raise HTTPException(status_code=500, detail="Internal error. Please contact support.")
+        if response_data.status_code != httpx.codes.OK:
+            logger.error(
+                "Request failed for %s. Returned data: %s",
+                stock_symbol,
+                response_data.json(),
+            )
+            raise HTTPException(status_code=500, detail="Internal error. Please contact support.")
+
+        # Daily aggregates are stamped with the start of the trading day on the exchange clock.
+        aggregate_bars: list[AggregateBar] = [
+            AggregateBar.model_validate(result) for result in response_data.json().get("results", [])
+        ]
+        return [
+            DailyBar(
+                date=datetime.fromtimestamp(aggregate_bar.timestamp / 1000, MARKET_TIMEZONE).date().isoformat(),
+                **aggregate_bar.model_dump(exclude={"timestamp"}),
+            )
+            for aggregate_bar in aggregate_bars
+        ]
+
+    async def is_known_symbol(self, stock_symbol: str) -> bool:
+        endpoint: str = TICKER_DETAILS_ENDPOINT.format(stock_symbol=stock_symbol, api_key=self.settings.polygon_api_key)
+        uri: str = f"{self.settings.polygon_base_url}{endpoint}"
+        try:
+            response_data: httpx.Response = await self.client.get(uri)
+        except httpx.RequestError as exp:
+            logger.error("Failed to request data: %s", exp)
+            return True
+        return response_data.status_code != httpx.codes.NOT_FOUND
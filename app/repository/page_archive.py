@@ -0,0 +1,219 @@
+import gzip
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from app.app_config import Settings, get_settings
+from app.common.symbol_utils import normalize_symbol
+from app.models.dto.archived_page import ArchivedPage
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+SNAPSHOT_TIME_FORMAT = "%Y%m%dT%H%M%S%fZ"
+# Seconds between two prunings of the archive, started by the first save that follows.
+PRUNE_INTERVAL = 3600.0
+# A symbol names a directory, so it must not contain path separators or be made of dots only.
+SYMBOL_PATTERN: re.Pattern[str] = re.compile(r"[A-Z0-9][A-Z0-9.\-]{0,9}")
+
+
+class PageCodec:
+    def __init__(
+        self,
+        name: str,
+        suffix: str,
+        compress: Callable[[bytes], bytes],
+        decompress: Callable[[bytes], bytes],
+    ) -> None:
+        self.name: str = name
+        self.suffix: str = suffix
+        self.compress: Callable[[bytes], bytes] = compress
+        self.decompress: Callable[[bytes], bytes] = decompress
+
+
+GZIP_CODEC = PageCodec(
+    name="gzip",
+    suffix=".html.gz",
+    compress=lambda data: gzip.compress(data, compresslevel=6, mtime=0),
+    decompress=gzip.decompress,
+)
+PAGE_CODECS: dict[str, PageCodec] = {GZIP_CODEC.name: GZIP_CODEC}
+
+
+def _write_atomically(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=path.parent, delete=False) as tmp_file:
+        tmp_file.write(data)
+    os.replace(tmp_file.name, path)
+
+
+class PageArchive:
+    """Content-addressed archive of the HTML of the stock pages, compressed on local disk.
+
+    The HTML is stored once per distinct content under `blobs/`, named by its SHA-256 digest and compressed with
+    gzip. Every fetch adds a small reference under `snapshots/{symbol}/`, named by its fetch time, pointing at the
+    blob. Writes are atomic, so a crashed worker never leaves a truncated page behind. The methods do blocking file
+    I/O and are meant to run in a thread.
+
+    With a `max_age`, a save starts pruning the archive in a background thread at most once per `PRUNE_INTERVAL`:
+    snapshots older than `max_age` are deleted, then the blobs no snapshot refers to any more.
+    """
+
+    def __init__(self, directory: str, codec: str = "gzip", max_age: float | None = None) -> None:
+        self.directory: Path = Path(directory)
+        if codec not in PAGE_CODECS:
+            raise ValueError(f"Page archive codec {codec} is not available")
+        self.codec: PageCodec = PAGE_CODECS[codec]
+        self.max_age: float | None = max_age
+        self._next_prune: float = 0.0
+        self._prune_lock: threading.Lock = threading.Lock()
+
+    def _blob_path(self, digest: str, codec: PageCodec) -> Path:
+        return self.directory / "blobs" / digest[:2] / f"{digest}{codec.suffix}"
+
+    @staticmethod
+    def _normalize_symbol(stock_symbol: str) -> str:
+        normalized_symbol: str = normalize_symbol(stock_symbol)
+        if not SYMBOL_PATTERN.fullmatch(normalized_symbol):
+            raise ValueError(f"Invalid stock symbol {stock_symbol!r}")
+        return normalized_symbol
+
+    def _symbol_dir(self, stock_symbol: str) -> Path:
+        return self.directory / "snapshots" / self._normalize_symbol(stock_symbol)
+
+    def save(self, stock_symbol: str, page_html: str, fetched_at: datetime) -> ArchivedPage:
+        """Archives the HTML of a stock page, writing the compressed content only if it is not archived yet.
+
+        Args:
+            stock_symbol (str): The symbol of the stock the page belongs to.
+            page_html (str): The HTML of the stock page.
+            fetched_at (datetime): When the page was fetched.
+
+        Returns:
+            ArchivedPage: The reference to the archived page.
+
+        Raises:
+            ValueError: If the symbol is not a valid stock symbol.
+        """
+        stock_symbol = self._normalize_symbol(stock_symbol)
+        content: bytes = page_html.encode()
+        archived_page = ArchivedPage(
+            symbol=stock_symbol,
+            fetched_at=fetched_at,
+            digest=hashlib.sha256(content).hexdigest(),
+            codec=self.codec.name,
+        )
+        blob_path: Path = self._blob_path(archived_page.digest, self.codec)
+        if blob_path.exists():
+            # Touched, so pruning sees the blob as recently used even before its new snapshot is written.
+            blob_path.touch()
+        else:
+            _write_atomically(blob_path, self.codec.compress(content))
+        snapshot_name: str = fetched_at.astimezone(timezone.utc).strftime(SNAPSHOT_TIME_FORMAT)
+        _write_atomically(
+            self._symbol_dir(stock_symbol) / f"{snapshot_name}.json", archived_page.model_dump_json().encode()
+        )
+        self._prune_if_due()
+        return archived_page
+
+    def _prune_if_due(self) -> None:
+        if self.max_age is None or time.monotonic() < self._next_prune:
+            return
+        self._next_prune = time.monotonic() + PRUNE_INTERVAL
+        threading.Thread(target=self._prune_in_background, args=(self.max_age,), daemon=True).start()
+
+    def _prune_in_background(self, max_age: float) -> None:
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            logger.info("Pruned %d files from the page archive", self.prune(max_age))
+        except OSError as exp:
+            logger.warning("Failed to prune the page archive: %s", exp)
+        finally:
+            self._prune_lock.release()
+
+    def prune(self, max_age: float) -> int:
+        """Deletes the snapshots fetched more than `max_age` seconds ago, and the blobs no snapshot refers to.
+
+        A blob is only deleted once it has not been written or reused for `max_age` seconds either, so a page being
+        saved concurrently never loses its blob.
+
+        Args:
+            max_age (float): How long snapshots are kept, in seconds.
+
+        Returns:
+            int: The number of files deleted.
+        """
+        oldest: datetime = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        oldest_snapshot_name: str = oldest.strftime(SNAPSHOT_TIME_FORMAT)
+        deleted = 0
+        referenced_digests: set[str] = set()
+        for stock_symbol in self.symbols():
+            for snapshot_path in self._symbol_dir(stock_symbol).glob("*.json"):
+                # Snapshot names are fetch times that sort chronologically.
+                if snapshot_path.stem < oldest_snapshot_name:
+                    snapshot_path.unlink(missing_ok=True)
+                    deleted += 1
+                    continue
+                try:
+                    referenced_digests.add(ArchivedPage.model_validate_json(snapshot_path.read_bytes()).digest)
+                except (OSError, ValueError) as exp:
+                    logger.warning("Skipping archived page %s: %s", snapshot_path, exp)
+        for blob_path in (self.directory / "blobs").glob("*/*"):
+            digest: str = blob_path.name.split(".", 1)[0]
+            try:
+                if digest in referenced_digests or blob_path.stat().st_mtime >= oldest.timestamp():
+                    continue
+                blob_path.unlink()
+            except FileNotFoundError:
+                continue
+            deleted += 1
+        return deleted
+
+    def load(self, archived_page: ArchivedPage) -> str:
+        """Returns the HTML of an archived page."""
+        codec: PageCodec = PAGE_CODECS[archived_page.codec]
+        return codec.decompress(self._blob_path(archived_page.digest, codec).read_bytes()).decode()
+
+    def snapshots(self, stock_symbol: str) -> list[ArchivedPage]:
+        """Returns the archived pages of a stock, oldest first."""
+        return [
+            ArchivedPage.model_validate_json(path.read_bytes())
+            for path in sorted(self._symbol_dir(stock_symbol).glob("*.json"))
+        ]
+
+    def symbols(self) -> list[str]:
+        """Returns the symbols with at least one archived page."""
+        snapshots_dir: Path = self.directory / "snapshots"
+        if not snapshots_dir.is_dir():
+            return []
+        return sorted(
+            path.name for path in snapshots_dir.iterdir() if path.is_dir() and SYMBOL_PATTERN.fullmatch(path.name)
+        )
+
+    def latest(self, max_age: float) -> Iterator[tuple[ArchivedPage, str]]:
+        """Yields the most recent archived page of every symbol fetched less than `max_age` seconds ago, with its
+        HTML. Pages that cannot be read are logged and skipped.
+        """
+        oldest: datetime = datetime.now(timezone.utc) - timedelta(seconds=max_age)
+        for stock_symbol in self.symbols():
+            snapshot_paths: list[Path] = sorted(self._symbol_dir(stock_symbol).glob("*.json"))
+            if not snapshot_paths:
+                continue
+            try:
+                archived_page = ArchivedPage.model_validate_json(snapshot_paths[-1].read_bytes())
+                if archived_page.fetched_at < oldest:
+                    continue
+                yield archived_page, self.load(archived_page)
+            except (OSError, ValueError, KeyError) as exp:
+                logger.warning("Skipping archived page %s: %s", snapshot_paths[-1], exp)
+
+
+page_archive = PageArchive(directory=settings.page_archive_dir, max_age=settings.page_archive_max_age)
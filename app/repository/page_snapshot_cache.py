@@ -0,0 +1,101 @@
+import time
+from collections import OrderedDict
+
+from app.app_config import Settings, get_settings
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+
+settings: Settings = get_settings()
+
+
+class PageSnapshotCache:
+    """In-process LRU cache of the values extracted from stock pages, keyed on the stock symbol.
+
+    Only the compact `MarketWatchStockPage` snapshots are kept, never the page HTML or its parse tree. Each entry is
+    weighed by the size of its JSON form, and the least recently used entries are evicted once the total exceeds
+    `max_bytes`. Entries older than `ttl` seconds are dropped when they are read.
+    """
+
+    def __init__(self, max_bytes: int, ttl: float) -> None:
+        self.max_bytes: int = max_bytes
+        self.ttl: float = ttl
+        self.size_bytes: int = 0
+        self._entries: OrderedDict[str, tuple[MarketWatchStockPage, int, float]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+        self.rejections: int = 0
+
+    def _remove(self, stock_symbol: str) -> None:
+        _, size, _ = self._entries.pop(stock_symbol)
+        self.size_bytes -= size
+
+    def get(self, stock_symbol: str, ttl: float | None = None) -> MarketWatchStockPage | None:
+        """Returns the snapshot of a stock page if it was stored less than `ttl` seconds ago.
+
+        Args:
+            stock_symbol (str): The symbol of the stock.
+            ttl (float | None): Overrides the time to live of the cache for this read.
+
+        Returns:
+            MarketWatchStockPage | None: The snapshot, or None if it is missing or expired.
+        """
+        entry: tuple[MarketWatchStockPage, int, float] | None = self._entries.get(stock_symbol)
+        if entry is None:
+            self.misses += 1
+            return None
+        snapshot, _, stored_at = entry
+        if time.monotonic() - stored_at >= (self.ttl if ttl is None else ttl):
+            self._remove(stock_symbol)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._entries.move_to_end(stock_symbol)
+        self.hits += 1
+        return snapshot
+
+    def put(self, stock_symbol: str, snapshot: MarketWatchStockPage, age: float = 0.0) -> None:
+        """Stores the snapshot of a stock page, evicting the least recently used ones beyond the byte budget.
+
+        Args:
+            stock_symbol (str): The symbol of the stock.
+            snapshot (MarketWatchStockPage): The values extracted from the page.
+            age (float): How many seconds ago the page was fetched, counted against the time to live.
+        """
+        size: int = len(snapshot.model_dump_json())
+        if stock_symbol in self._entries:
+            self._remove(stock_symbol)
+        if size > self.max_bytes:
+            self.rejections += 1
+            return
+        self._entries[stock_symbol] = (snapshot, size, time.monotonic() - age)
+        self.size_bytes += size
+        while self.size_bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def snapshot(self) -> dict[str, float]:
+        lookups: int = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self.size_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "rejections": self.rejections,
+        }
+
+
+stock_page_cache = PageSnapshotCache(
+    max_bytes=settings.marketwatch_page_cache_max_bytes, ttl=settings.marketwatch_page_freshness_time
+)
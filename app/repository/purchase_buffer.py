@@ -0,0 +1,141 @@
+import asyncio
+import contextlib
+import logging
+
+from sqlalchemy.exc import DataError, IntegrityError
+
+from app.app_config import Settings, get_settings
+from app.database import sessionmanager
+from app.repository.daily_bars_repository import SessionFactory
+from app.repository.purchases_repository import PurchasesRepository
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+PendingPurchase = tuple[str, int, asyncio.Future[None]]
+
+# Errors raised by the database for the rows themselves, which are known to have rolled the whole batch back.
+ROLLED_BACK_ERRORS: tuple[type[Exception], ...] = (IntegrityError, DataError)
+
+
+class PurchaseBuffer:
+    """Write-behind buffer that commits the purchases of concurrent requests together.
+
+    Purchases are queued in the worker and written by a background task in batches of at most
+    `purchase_group_commit_max_batch` purchases, each batch with one multi-row insert and one commit. A batch is
+    written as soon as it is full, or `purchase_group_commit_interval` seconds after its first purchase. Callers wait
+    until the batch holding their purchase is committed, or get its error, so a purchase is durable when the call
+    returns, exactly as with a commit per purchase. When a batch is rejected for its rows (`ROLLED_BACK_ERRORS`), its
+    purchases are retried one by one, so only the callers whose own purchase cannot be committed get an error. Any
+    other error, e.g. a connection lost during the commit, leaves the outcome unknown, so the purchases are not
+    retried and every caller of the batch gets the error.
+    """
+
+    def __init__(self, settings: Settings, session_factory: SessionFactory = sessionmanager.session) -> None:
+        self.settings: Settings = settings
+        self.session_factory: SessionFactory = session_factory
+        self._queue: asyncio.Queue[PendingPurchase] | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.flushes: int = 0
+        self.purchases: int = 0
+        self.failed_flushes: int = 0
+
+    @property
+    def running(self) -> bool:
+        return self._queue is not None
+
+    async def purchase_stock(self, company_code: str, amount: int) -> None:
+        """Queues a purchase and waits until it is committed.
+
+        Args:
+            company_code (str): The code of the company for which the stock is being purchased.
+            amount (int): The quantity of stock being purchased.
+
+        Raises:
+            RuntimeError: If the buffer is not running.
+        """
+        if self._queue is None:
+            raise RuntimeError("The purchase buffer is not running")
+        committed: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((company_code, amount, committed))
+        await committed
+
+    async def _next_batch(self, queue: asyncio.Queue[PendingPurchase]) -> list[PendingPurchase]:
+        batch: list[PendingPurchase] = [await queue.get()]
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        deadline: float = loop.time() + self.settings.purchase_group_commit_interval
+        while len(batch) < self.settings.purchase_group_commit_max_batch:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout=deadline - loop.time()))
+            except TimeoutError:
+                break
+        return batch
+
+    async def _commit(self, batch: list[PendingPurchase]) -> None:
+        async with self.session_factory() as session:
+            await PurchasesRepository(self.settings, session).purchase_stocks(
+                [(company_code, amount) for company_code, amount, _ in batch]
+            )
+
+    async def _flush(self, batch: list[PendingPurchase]) -> None:
+        try:
+            await self._commit(batch)
+        except Exception as exp:
+            self.failed_flushes += 1
+            logger.warning("Failed to commit a batch of %d purchases: %s", len(batch), exp)
+            if len(batch) > 1 and isinstance(exp, ROLLED_BACK_ERRORS):
+                for pending_purchase in batch:
+                    await self._flush([pending_purchase])
+                return
+            for _, _, committed in batch:
+                if not committed.done():
+                    committed.set_exception(exp)
+        else:
+            self.flushes += 1
+            self.purchases += len(batch)
+            for _, _, committed in batch:
+                if not committed.done():
+                    committed.set_result(None)
+
+    async def _run(self, queue: asyncio.Queue[PendingPurchase]) -> None:
+        while True:
+            batch: list[PendingPurchase] = await self._next_batch(queue)
+            # Shielded, so that stopping the buffer never abandons a batch in the middle of its commit.
+            await asyncio.shield(self._flush(batch))
+            for _ in batch:
+                queue.task_done()
+
+    def start(self) -> None:
+        """Start committing purchases in batches, unless `purchase_group_commit_enabled` is off."""
+        if self.settings.purchase_group_commit_enabled and self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = asyncio.ensure_future(self._run(self._queue))
+
+    async def close(self) -> None:
+        """Stop accepting purchases and commit the ones already queued."""
+        if self._task is None or self._queue is None:
+            return
+        queue: asyncio.Queue[PendingPurchase] = self._queue
+        self._queue = None
+        await queue.join()
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "running": self.running,
+            "flushes": self.flushes,
+            "purchases": self.purchases,
+            "mean_batch_size": self.purchases / self.flushes if self.flushes else 0.0,
+            "failed_flushes": self.failed_flushes,
+        }
+
+
+purchase_buffer = PurchaseBuffer(settings=settings)
@@ -1,11 +1,19 @@
 from abc import ABC, abstractmethod
+from collections import Counter
+from collections.abc import Mapping
+from datetime import datetime, timezone
 
-from sqlalchemy import func, select
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import Insert, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.app_config import Settings
+from app.models.tables.purchase_totals import PurchaseTotals
 from app.models.tables.purchases import Purchases
 
+# Rows per upsert of the totals, well under the bind parameter limit of PostgreSQL.
+PURCHASE_TOTALS_BATCH_SIZE = 1000
+
 
 class PurchasesRepositoryInterface(ABC):
     @abstractmethod
@@ -20,6 +28,14 @@ class PurchasesRepositoryInterface(ABC):
         - None
         """
 
+    @abstractmethod
+    async def purchase_stocks(self, purchases: list[tuple[str, int]]) -> None:
+        """Add many purchase records to the database in a single transaction.
+
+        Args:
+            purchases (list[tuple[str, int]]): The company code and amount of each purchase.
+        """
+
     @abstractmethod
     async def get_purchases_total_amount_by_symbol(self, stock_symbol: str) -> float:
         """Get the total purchase amount for a specific stock symbol.
@@ -32,6 +48,14 @@ class PurchasesRepositoryInterface(ABC):
             float: The total purchase amount for the specified stock symbol. Returns 0.0 if no amount is found.
         """
 
+    @abstractmethod
+    async def get_purchased_symbols(self) -> list[str]:
+        """Get every stock symbol that has been purchased at least once.
+
+        Returns:
+            list[str]: The distinct purchased stock symbols.
+        """
+
 
 class PurchasesRepository(PurchasesRepositoryInterface):
     def __init__(self, settings: Settings, session: AsyncSession) -> None:
@@ -41,10 +65,51 @@ class PurchasesRepository(PurchasesRepositoryInterface):
     async def purchase_stock(self, company_code: str, amount: int) -> None:
         purchases = Purchases(company_code=company_code, amount=amount)
         self.session.add(purchases)
+        await self.session.execute(self._add_to_totals_statement({company_code: amount}))
+        await self.session.commit()
+
+    async def purchase_stocks(self, purchases: list[tuple[str, int]]) -> None:
+        # Core inserts skip the ORM timestamp events, so the timestamps are set here.
+        now = datetime.now(timezone.utc)
+        # An executemany insert, which SQLAlchemy sends as multi-row INSERTs.
+        await self.session.execute(
+            insert(Purchases),
+            [
+                {"company_code": company_code, "amount": amount, "created_at": now, "updated_at": now}
+                for company_code, amount in purchases
+            ],
+        )
+        totals: Counter[str] = Counter()
+        for company_code, amount in purchases:
+            totals[company_code] += amount
+        # Sorted, so concurrent bulk purchases lock the totals in the same order and cannot deadlock.
+        company_codes: list[str] = sorted(totals)
+        for start in range(0, len(company_codes), PURCHASE_TOTALS_BATCH_SIZE):
+            batch: list[str] = company_codes[start : start + PURCHASE_TOTALS_BATCH_SIZE]
+            await self.session.execute(self._add_to_totals_statement({code: totals[code] for code in batch}))
         await self.session.commit()
 
+    def _add_to_totals_statement(self, amounts: Mapping[str, int]) -> Insert:
+        # The increment runs in the database, so concurrent purchases of a symbol never overwrite each other's total.
+        # Core inserts skip the ORM timestamp events, so the timestamps are set here.
+        now = datetime.now(timezone.utc)
+        statement: Insert = insert(PurchaseTotals).values(
+            [
+                {"company_code": company_code, "total_amount": amount, "created_at": now, "updated_at": now}
+                for company_code, amount in amounts.items()
+            ]
+        )
+        return statement.on_conflict_do_update(
+            index_elements=[PurchaseTotals.company_code],
+            set_={"total_amount": PurchaseTotals.total_amount + statement.excluded.total_amount, "updated_at": now},
+        )
+
     async def get_purchases_total_amount_by_symbol(self, stock_symbol: str) -> int:
         total_amount: int | None = await self.session.scalar(
-            select(func.sum(Purchases.amount)).where(Purchases.company_code == stock_symbol)
+            select(PurchaseTotals.total_amount).where(PurchaseTotals.company_code == stock_symbol)
         )
         return total_amount if total_amount is not None else 0
+
+    async def get_purchased_symbols(self) -> list[str]:
+        purchased_symbols = await self.session.scalars(select(PurchaseTotals.company_code))
+        return list(purchased_symbols)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+
+from app.app_config import Settings, get_settings
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+# Each slot is spread by up to this fraction of the interval, so scrapes do not arrive at a fixed cadence.
+PACING_JITTER = 0.25
+
+
+class HostPacing:
+    def __init__(self, interval: float, window: int) -> None:
+        self.interval: float = interval
+        self.next_slot: float = 0.0
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.scrapes: int = 0
+        self.captchas: int = 0
+
+    @property
+    def captcha_rate(self) -> float:
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class AdaptivePacer:
+    """Spaces the scrapes sent to each host, adapting the spacing to how often they are caught by bot detection.
+
+    Scrapes of a host start at least `interval` seconds apart; callers wait for their slot on an async timer,
+    without holding a thread or a scraper slot. A CAPTCHA multiplies the interval of its host by
+    `marketwatch_pacing_backoff_factor` (up to `marketwatch_pacing_max_interval`) and delays the next slot by the
+    new interval. A clean scrape narrows the interval by `marketwatch_pacing_recovery_step` (down to
+    `marketwatch_pacing_min_interval`) while the CAPTCHA rate over the last `marketwatch_pacing_window` scrapes is
+    at most `marketwatch_pacing_target_captcha_rate`, so each host converges to the fastest pace it tolerates.
+    Pacing is per worker process.
+    """
+
+    def __init__(self, settings: Settings) -> None:
+        self.settings: Settings = settings
+        self._hosts: dict[str, HostPacing] = {}
+
+    def _host(self, host: str) -> HostPacing:
+        if (pacing := self._hosts.get(host)) is None:
+            pacing = HostPacing(
+                self.settings.marketwatch_pacing_initial_interval, self.settings.marketwatch_pacing_window
+            )
+            self._hosts[host] = pacing
+        return pacing
+
+    async def wait(self, host: str) -> None:
+        """Waits for the next free slot of a host and reserves it."""
+        pacing: HostPacing = self._host(host)
+        now: float = time.monotonic()
+        slot: float = max(now, pacing.next_slot)
+        pacing.next_slot = slot + pacing.interval * random.uniform(1 - PACING_JITTER, 1 + PACING_JITTER)
+        await asyncio.sleep(slot - now)
+
+    def record(self, host: str, captcha: bool) -> None:
+        """Adapts the spacing of a host to the outcome of a scrape.
+
+        Args:
+            host (str): The host the scrape was sent to.
+            captcha (bool): Whether the scrape was answered with a CAPTCHA.
+        """
+        pacing: HostPacing = self._host(host)
+        pacing.scrapes += 1
+        pacing.outcomes.append(captcha)
+        if captcha:
+            pacing.captchas += 1
+            pacing.interval = min(
+                pacing.interval * self.settings.marketwatch_pacing_backoff_factor,
+                self.settings.marketwatch_pacing_max_interval,
+            )
+            pacing.next_slot = max(pacing.next_slot, time.monotonic() + pacing.interval)
+            logger.info("Bot detection on %s, spacing scrapes %.2f seconds apart", host, pacing.interval)
+        elif pacing.captcha_rate <= self.settings.marketwatch_pacing_target_captcha_rate:
+            pacing.interval = max(
+                pacing.interval - self.settings.marketwatch_pacing_recovery_step,
+                self.settings.marketwatch_pacing_min_interval,
+            )
+
+    def snapshot(self) -> dict[str, dict[str, float]]:
+        return {
+            host: {
+                "interval": pacing.interval,
+                "captcha_rate": pacing.captcha_rate,
+                "scrapes": pacing.scrapes,
+                "captchas": pacing.captchas,
+            }
+            for host, pacing in self._hosts.items()
+        }
+
+
+scrape_pacer = AdaptivePacer(settings=settings)
@@ -0,0 +1,108 @@
+import asyncio
+import contextlib
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+
+from selenium.common.exceptions import WebDriverException
+from selenium.webdriver.remote.webdriver import WebDriver
+
+from app.app_config import Settings, get_settings
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+
+class PooledWebDriver:
+    def __init__(self, driver: WebDriver) -> None:
+        self.driver: WebDriver = driver
+        self.created_at: float = time.monotonic()
+        self.uses: int = 0
+        self.healthy: bool = True
+
+
+class WebDriverPool:
+    """Bounded pool of long-lived WebDriver sessions.
+
+    At most `size` sessions exist at the same time. Idle sessions are health checked before being lent
+    and are recycled once they have served `max_uses` borrows or are older than `max_age` seconds.
+    """
+
+    def __init__(self, size: int, max_uses: int, max_age: float) -> None:
+        self.size: int = size
+        self.max_uses: int = max_uses
+        self.max_age: float = max_age
+        self._idle: deque[PooledWebDriver] = deque()
+        self._slots = asyncio.Semaphore(size)
+        self._closed: bool = False
+
+    def _is_expired(self, session: PooledWebDriver) -> bool:
+        return session.uses >= self.max_uses or time.monotonic() - session.created_at >= self.max_age
+
+    def _is_alive(self, session: PooledWebDriver) -> bool:
+        try:
+            _ = session.driver.current_url
+        except WebDriverException:
+            return False
+        return True
+
+    def _quit(self, session: PooledWebDriver) -> None:
+        try:
+            session.driver.quit()
+        except WebDriverException as exp:
+            logger.warning("Failed to quit WebDriver session: %s", exp)
+
+    async def _checkout(self, factory: Callable[[], WebDriver]) -> PooledWebDriver:
+        while self._idle:
+            session: PooledWebDriver = self._idle.pop()
+            if not self._is_expired(session) and await asyncio.to_thread(self._is_alive, session):
+                return session
+            logger.info("Recycling WebDriver session after %s uses.", session.uses)
+            await asyncio.to_thread(self._quit, session)
+        logger.info("Starting a new WebDriver session.")
+        return PooledWebDriver(await asyncio.to_thread(factory))
+
+    async def _checkin(self, session: PooledWebDriver) -> None:
+        if self._closed or not session.healthy or self._is_expired(session):
+            await asyncio.to_thread(self._quit, session)
+        else:
+            self._idle.append(session)
+
+    @contextlib.asynccontextmanager
+    async def acquire(self, factory: Callable[[], WebDriver]) -> AsyncIterator[PooledWebDriver]:
+        """Borrow a warm session, starting one with `factory` if none is idle.
+
+        Sessions whose borrower fails or is cancelled are discarded instead of being returned to the pool,
+        since the page they were left on (or a thread still driving them) is unknown.
+
+        Usage:
+            async with webdriver_pool.acquire(factory) as session:
+                <body>
+        """
+        if self._closed:
+            raise RuntimeError("WebDriverPool is closed")
+
+        async with self._slots:
+            session: PooledWebDriver = await self._checkout(factory)
+            try:
+                yield session
+            except BaseException:
+                session.healthy = False
+                raise
+            finally:
+                session.uses += 1
+                await self._checkin(session)
+
+    async def close(self) -> None:
+        """Quit every idle session and stop lending new ones."""
+        self._closed = True
+        while self._idle:
+            await asyncio.to_thread(self._quit, self._idle.pop())
+
+
+webdriver_pool = WebDriverPool(
+    size=settings.webdriver_pool_size,
+    max_uses=settings.webdriver_pool_max_uses,
+    max_age=settings.webdriver_pool_max_age,
+)
@@ -0,0 +1,181 @@
+import asyncio
+import contextlib
+import logging
+import time
+import uuid
+from datetime import date
+
+from fastapi import HTTPException
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.app_config import Settings, get_settings
+from app.cache import CACHE_PREFIX, cache_backend
+from app.common.datetime_utils import get_yesterday
+from app.database import sessionmanager
+from app.executor import BoundedExecutor, scraper_executor
+from app.http_client import polygon_client_manager
+from app.repository.purchases_repository import PurchasesRepository
+from app.stocks.stock_service import StockService, requested_symbols
+
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+
+REQUESTED_SYMBOLS_KEY = f"{CACHE_PREFIX}:cache_warmer:requested_symbols"
+REQUESTED_SYMBOLS_TTL = 7 * 24 * 3600
+LEADER_KEY = f"{CACHE_PREFIX}:cache_warmer:leader"
+# The leader lock expires a little before the next run, so that a late timer does not skip a whole interval.
+LEADER_LOCK_RATIO = 0.9
+CAPACITY_POLL_INTERVAL = 1.0
+
+
+class StockCacheWarmer:
+    """Keeps the cached market data of a watchlist of stock symbols fresh, refreshing it ahead of expiry.
+
+    The watchlist is `cache_warmer_watchlist`, the `cache_warmer_top_symbols` symbols requested the most across
+    workers and every purchased symbol. Every `cache_warmer_interval` seconds one worker, elected through a Redis
+    lock, walks the watchlist at most `cache_warmer_rate` symbols per second. It only starts a symbol while the
+    scraper executor has nobody waiting and more than `cache_warmer_reserved_workers` free slots, so that live
+    requests keep their scraper capacity.
+    """
+
+    def __init__(self, settings: Settings, executor: BoundedExecutor, redis: Redis) -> None:
+        self.settings: Settings = settings
+        self.executor: BoundedExecutor = executor
+        self.redis: Redis = redis
+        self._token: str = uuid.uuid4().hex
+        self._task: asyncio.Task[None] | None = None
+        self.runs: int = 0
+        self.warmed_symbols: int = 0
+        self.warmed_components: int = 0
+        self.failed_symbols: int = 0
+        self.capacity_waits: int = 0
+        self.last_run_duration: float = 0.0
+
+    async def flush_requested_symbols(self) -> None:
+        """Adds the symbols requested from this worker since the last flush to the counts shared by all workers,
+        keeping only the `cache_warmer_top_symbols` most requested ones.
+        """
+        counts: dict[str, int] = requested_symbols.take()
+        if not counts:
+            return
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for stock_symbol, count in counts.items():
+                    pipe.zincrby(REQUESTED_SYMBOLS_KEY, count, stock_symbol)
+                # Only the top symbols are ever read, so the rest is dropped instead of growing the set forever.
+                pipe.zremrangebyrank(REQUESTED_SYMBOLS_KEY, 0, -(self.settings.cache_warmer_top_symbols + 1))
+                pipe.expire(REQUESTED_SYMBOLS_KEY, REQUESTED_SYMBOLS_TTL)
+                await pipe.execute()
+        except RedisError as exp:
+            requested_symbols.restore(counts)
+            logger.warning("Failed to flush the requested symbols: %s", exp)
+
+    async def get_watchlist(self) -> list[str]:
+        """Returns the symbols to keep warm: the configured ones, then the most requested ones, then the purchased ones.
+
+        Returns:
+            list[str]: The unique symbols of the watchlist. A source that cannot be read is left out.
+        """
+        watchlist: dict[str, None] = dict.fromkeys(symbol.upper() for symbol in self.settings.cache_warmer_watchlist)
+        try:
+            top_symbols: list[bytes] = await self.redis.zrevrange(
+                REQUESTED_SYMBOLS_KEY, 0, self.settings.cache_warmer_top_symbols - 1
+            )
+            watchlist.update(dict.fromkeys(symbol.decode() for symbol in top_symbols))
+        except RedisError as exp:
+            logger.warning("Failed to read the most requested symbols: %s", exp)
+        try:
+            async with sessionmanager.session() as session:
+                purchased_symbols: list[str] = await PurchasesRepository(
+                    settings=self.settings, session=session
+                ).get_purchased_symbols()
+            watchlist.update(dict.fromkeys(purchased_symbols))
+        except SQLAlchemyError as exp:
+            logger.warning("Failed to read the purchased symbols: %s", exp)
+        return list(watchlist)
+
+    async def _acquire_run(self) -> bool:
+        lock_timeout = int(self.settings.cache_warmer_interval * 1000 * LEADER_LOCK_RATIO)
+        try:
+            return bool(await self.redis.set(LEADER_KEY, self._token, nx=True, px=lock_timeout))
+        except RedisError as exp:
+            logger.warning("Failed to elect the cache warmer, warming from this worker: %s", exp)
+            return True
+
+    async def _wait_for_scraper_capacity(self) -> None:
+        if self.executor.has_spare_capacity(self.settings.cache_warmer_reserved_workers):
+            return
+        self.capacity_waits += 1
+        while not self.executor.has_spare_capacity(self.settings.cache_warmer_reserved_workers):
+            await asyncio.sleep(CAPACITY_POLL_INTERVAL)
+
+    async def _warm_symbol(self, stock_symbol: str, date: date) -> None:
+        try:
+            async with sessionmanager.session() as session:
+                stock_service = StockService(self.settings, session, polygon_client_manager.client)
+                self.warmed_components += await stock_service.warm_stock(
+                    stock_symbol, date, self.settings.cache_warmer_lead_time
+                )
+            self.warmed_symbols += 1
+        except HTTPException as exp:
+            self.failed_symbols += 1
+            logger.warning("Failed to warm the cache of stock %s: %s", stock_symbol, exp.detail)
+        except Exception:
+            self.failed_symbols += 1
+            logger.exception("Failed to warm the cache of stock %s", stock_symbol)
+
+    async def run_once(self) -> None:
+        """Warms every symbol of the watchlist once, pacing them to `cache_warmer_rate` symbols per second."""
+        start_time: float = time.perf_counter()
+        watchlist: list[str] = await self.get_watchlist()
+        warm_date: date = get_yesterday()
+        pacing: float = 1 / self.settings.cache_warmer_rate
+        for stock_symbol in watchlist:
+            next_start: float = time.monotonic() + pacing
+            await self._wait_for_scraper_capacity()
+            await self._warm_symbol(stock_symbol, warm_date)
+            await asyncio.sleep(max(0.0, next_start - time.monotonic()))
+        self.runs += 1
+        self.last_run_duration = time.perf_counter() - start_time
+        logger.info("Cache warmer walked %d symbols in %.2f seconds", len(watchlist), self.last_run_duration)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.flush_requested_symbols()
+                if await self._acquire_run():
+                    await self.run_once()
+            except Exception:
+                logger.exception("Cache warmer run failed")
+            await asyncio.sleep(self.settings.cache_warmer_interval)
+
+    def start(self) -> None:
+        """Start warming the watchlist in the background, unless `cache_warmer_enabled` is off."""
+        if self.settings.cache_warmer_enabled and self._task is None:
+            requested_symbols.enabled = True
+            self._task = asyncio.ensure_future(self._run())
+
+    async def close(self) -> None:
+        """Stop warming and share the symbols requested from this worker one last time."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        requested_symbols.enabled = False
+        await self.flush_requested_symbols()
+
+    def snapshot(self) -> dict[str, float]:
+        return {
+            "runs": self.runs,
+            "warmed_symbols": self.warmed_symbols,
+            "warmed_components": self.warmed_components,
+            "failed_symbols": self.failed_symbols,
+            "capacity_waits": self.capacity_waits,
+            "last_run_duration": self.last_run_duration,
+        }
+
+
+stock_cache_warmer = StockCacheWarmer(settings=settings, executor=scraper_executor, redis=cache_backend.redis)
@@ -1,29 +1,83 @@
 import datetime
 from typing import Annotated
 
-from fastapi import APIRouter, Body, Query
+from fastapi import APIRouter, Body, Header, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
-from app.app_config import SettingsDep
-from app.cache import default_cache
 from app.common.datetime_utils import get_yesterday
-from app.database import SessionDep
-from app.models.dto.stock_endpoint_models import PurchaseRequestBody, PurchaseResponse
-from app.models.dto.stock_response import StockData
-from app.stocks.stock_service import StockService
+from app.common.ndjson_utils import NDJSON_MEDIA_TYPE, accepts_ndjson, ndjson_response
+from app.common.prefer_utils import RESPOND_ASYNC, prefers_respond_async
+from app.common.purchase_upload_utils import (
+    CSV_MEDIA_TYPE,
+    JSON_MEDIA_TYPE,
+    iter_purchase_entries,
+)
+from app.jobs.job_queue import ScrapeJobQueueDep
+from app.models.dto.daily_bars_history import DailyBarsHistory
+from app.models.dto.scrape_job import ScrapeJob
+from app.models.dto.stock_endpoint_models import (
+    BulkPurchaseEntry,
+    BulkPurchaseResponse,
+    PurchaseRequestBody,
+    PurchaseResponse,
+)
+from app.models.dto.stock_response import BatchStockData, StockData
+from app.stocks.stock_service import StockServiceDep
 
 router = APIRouter(prefix="/stock", tags=["stock"])
 
+NDJSON_RESPONSE = {200: {"content": {NDJSON_MEDIA_TYPE: {}}}}
+ACCEPTED_RESPONSE = {202: {"model": ScrapeJob, "description": "The lookup was queued as a job"}}
+BULK_PURCHASE_REQUEST_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            JSON_MEDIA_TYPE: {"schema": {"type": "array", "items": BulkPurchaseEntry.model_json_schema()}},
+            NDJSON_MEDIA_TYPE: {"schema": BulkPurchaseEntry.model_json_schema()},
+            CSV_MEDIA_TYPE: {"schema": {"type": "string"}, "example": "symbol,amount\nAAPL,10\nMSFT,5\n"},
+        },
+    }
+}
 
-@router.get("/{stock_symbol}")
-@default_cache()
+
+@router.get("", response_model=BatchStockData, responses=NDJSON_RESPONSE)
+async def get_stocks(
+    stock_service: StockServiceDep,
+    symbols: str = Query(description="Comma-separated stock symbols, e.g. AAPL,MSFT"),
+    date: datetime.date = Query(default_factory=get_yesterday),
+    accept: Annotated[str | None, Header()] = None,
+) -> BatchStockData | StreamingResponse:
+    """Get stock data for many stock symbols in one request.
+
+    With `Accept: application/x-ndjson`, one `{"symbol", "data", "error"}` object per line is streamed as soon as
+    each symbol is ready, in completion order.
+
+    Parameters:
+    - symbols (str): Comma-separated symbols of the stocks to retrieve data for. Duplicates are ignored.
+    - date (date): The date for which to retrieve the stock data. Defaults to yesterday.
+
+    Returns:
+    - BatchStockData: The stock data of each symbol that succeeded and the error of each one that failed.
+    """
+    if accepts_ndjson(accept):
+        return ndjson_response(stock_service.iter_stocks_by_symbols(stock_symbols=symbols.split(","), date=date))
+    return await stock_service.get_stocks_by_symbols(stock_symbols=symbols.split(","), date=date)
+
+
+@router.get("/{stock_symbol}", response_model=StockData, responses=ACCEPTED_RESPONSE)
 async def get_stock(
     stock_symbol: str,
-    session: SessionDep,
-    settings: SettingsDep,
+    stock_service: StockServiceDep,
+    job_queue: ScrapeJobQueueDep,
     date: datetime.date = Query(default_factory=get_yesterday),
-) -> StockData:
+    prefer: Annotated[str | None, Header()] = None,
+) -> StockData | JSONResponse:
     """Get stock data for a specific stock symbol.
 
+    With `Prefer: respond-async`, stock data that is already cached is returned right away. Otherwise the lookup is
+    queued for the job workers and a `202` is returned with the job, whose result can be polled from the `Location`
+    header (`GET /jobs/{job_id}`).
+
     Parameters:
     - stock_symbol (str): The symbol of the stock to retrieve data for.
     - date (date): The date for which to retrieve the stock data. Defaults to yesterday.
@@ -31,18 +85,74 @@ async def get_stock(
     Returns:
     - StockData: The stock data for the specified symbol.
     """
-    return await StockService(
-        settings,
-        session,
-    ).get_stock_by_symbol(stock_symbol=stock_symbol, date=date)
+    if prefers_respond_async(prefer):
+        cached_stock: StockData | None = await stock_service.get_cached_stock_by_symbol(
+            stock_symbol=stock_symbol, date=date
+        )
+        if cached_stock is not None:
+            return cached_stock
+        job: ScrapeJob = await job_queue.enqueue(stock_symbol=stock_symbol, date=date)
+        return JSONResponse(
+            status_code=202,
+            content=job.model_dump(mode="json"),
+            headers={"Location": f"/jobs/{job.id}", "Preference-Applied": RESPOND_ASYNC},
+        )
+    return await stock_service.get_stock_by_symbol(stock_symbol=stock_symbol, date=date)
+
+
+@router.get("/{stock_symbol}/history", response_model=DailyBarsHistory, responses=NDJSON_RESPONSE)
+async def get_stock_history(
+    stock_symbol: str,
+    stock_service: StockServiceDep,
+    from_date: datetime.date = Query(alias="from"),
+    to_date: datetime.date = Query(alias="to", default_factory=get_yesterday),
+    accept: Annotated[str | None, Header()] = None,
+) -> DailyBarsHistory | StreamingResponse:
+    """Get the daily bars of a stock symbol for a date range.
+
+    With `Accept: application/x-ndjson`, one bar object per line is streamed, sorted by date.
+
+    Parameters:
+    - stock_symbol (str): The symbol of the stock to retrieve data for.
+    - from (date): The first date of the range.
+    - to (date): The last date of the range, inclusive. Defaults to yesterday.
+
+    Returns:
+    - DailyBarsHistory: The dates, open, high, low, close and volume of the range as columns.
+    """
+    if accepts_ndjson(accept):
+        return ndjson_response(
+            await stock_service.iter_stock_history(stock_symbol=stock_symbol, from_date=from_date, to_date=to_date)
+        )
+    return await stock_service.get_stock_history(stock_symbol=stock_symbol, from_date=from_date, to_date=to_date)
+
+
+# Declared before `POST /{stock_symbol}`, which would otherwise take `purchases:bulk` as a symbol.
+@router.post("/purchases:bulk", status_code=201, openapi_extra=BULK_PURCHASE_REQUEST_BODY)
+async def purchase_stocks(
+    request: Request,
+    stock_service: StockServiceDep,
+    content_type: Annotated[str | None, Header()] = None,
+) -> BulkPurchaseResponse:
+    """Endpoint to purchase many stocks in one request and one database transaction.
+
+    The body is a JSON list of `{"symbol", "amount"}` objects, the same objects as NDJSON
+    (`application/x-ndjson`), or a CSV (`text/csv`) with a `symbol,amount` header. NDJSON and CSV uploads are parsed
+    as they are received; a JSON body is limited to `purchase_bulk_max_json_bytes`.
+
+    Returns:
+    - BulkPurchaseResponse: The number of purchases and symbols written, and the rows written per second.
+    """
+    return await stock_service.purchase_stocks(
+        iter_purchase_entries(content_type, request.stream(), stock_service.settings.purchase_bulk_max_json_bytes)
+    )
 
 
 @router.post("/{stock_symbol}", status_code=201)
 async def purchase_stock(
     request_body: Annotated[PurchaseRequestBody, Body()],
     stock_symbol: str,
-    session: SessionDep,
-    settings: SettingsDep,
+    stock_service: StockServiceDep,
 ) -> PurchaseResponse:
     """Endpoint to purchase a specified amount of a stock.
 
@@ -53,7 +163,7 @@ async def purchase_stock(
     Returns:
     - PurchaseResponse: A message confirming the purchase of the stock.
     """
-    await StockService(settings, session).purchase_stock(stock_symbol=stock_symbol, amount=request_body.amount)
+    await stock_service.purchase_stock(stock_symbol=stock_symbol, amount=request_body.amount)
 
     return PurchaseResponse(
         message=f"{request_body.amount} units of stock {stock_symbol} were added to your stock record."
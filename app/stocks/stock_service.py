@@ -1,53 +1,323 @@
+import asyncio
+import logging
+import time
+from collections import Counter
+from collections.abc import AsyncIterator, Awaitable
 from datetime import date
-from typing import Any
+from functools import partial
+from http import HTTPStatus
+from typing import Annotated, Any, TypeVar
 
+import httpx
+from fastapi import Depends, HTTPException
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.app_config import Settings
+from app.app_config import Settings, SettingsDep, get_settings
+from app.cache import NegativeCache, StaleWhileRevalidateCache
+from app.common.market_calendar import get_cache_ttl, is_session_final, is_trading_day
+from app.common.symbol_utils import normalize_symbol
+from app.database import SessionDep, sessionmanager
+from app.http_client import PolygonClientDep
+from app.models.dto.daily_bars_history import DailyBar, DailyBarsHistory
 from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
-from app.models.dto.stock_response import (
-    CompetitorData,
-    PerformanceData,
-    StockData,
-    StockValuesData,
-)
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+from app.models.dto.stock_endpoint_models import BulkPurchaseEntry, BulkPurchaseResponse
+from app.models.dto.stock_response import BatchStockData, BatchStockItem, StockData, StockError, StockValuesData
+from app.repository.daily_bars_repository import DailyBarsRepository
 from app.repository.marketwatch_repository import MarketWatchRepository
 from app.repository.open_close_stock_repository import OpenCloseStockRepository
+from app.repository.purchase_buffer import purchase_buffer
 from app.repository.purchases_repository import PurchasesRepository
 
+logger: logging.Logger = logging.getLogger()
+settings: Settings = get_settings()
+T = TypeVar("T")
+
+# `cache_open_close_time` is short: the open/close of a session that is still trading keeps changing. Final
+# sessions are cached for `cache_final_data_time` instead.
+open_close_cache: StaleWhileRevalidateCache[DailyOpenCloseStock] = StaleWhileRevalidateCache(
+    namespace="open_close", type_=DailyOpenCloseStock, ttl=settings.cache_open_close_time, stale_ttl=0
+)
+marketwatch_page_cache: StaleWhileRevalidateCache[MarketWatchStockPage] = StaleWhileRevalidateCache(
+    namespace="marketwatch_page",
+    type_=MarketWatchStockPage,
+    ttl=settings.cache_marketwatch_page_time,
+    stale_ttl=settings.cache_stale_time,
+)
+company_name_cache: StaleWhileRevalidateCache[str] = StaleWhileRevalidateCache(
+    namespace="company_name", type_=str, ttl=settings.cache_company_name_time, stale_ttl=settings.cache_stale_time
+)
+invalid_symbols = NegativeCache(namespace="invalid_symbol")
+failed_lookups = NegativeCache(namespace="failed_lookup")
+
+
+class RequestedSymbols:
+    """Counts the symbols looked up successfully from this worker, for the cache warmer to share.
+
+    Nothing is counted until the warmer enables counting, so workers that never flush the counts do not keep them.
+    """
+
+    def __init__(self) -> None:
+        self.enabled: bool = False
+        self.counts: Counter[str] = Counter()
+
+    def record(self, stock_symbol: str) -> None:
+        if self.enabled:
+            self.counts[stock_symbol] += 1
+
+    def take(self) -> dict[str, int]:
+        """Returns the counts since the last call and starts counting from zero."""
+        counts: dict[str, int] = dict(self.counts)
+        self.counts.clear()
+        return counts
+
+    def restore(self, counts: dict[str, int]) -> None:
+        """Adds back counts that were taken but could not be shared."""
+        self.counts.update(counts)
+
+
+requested_symbols = RequestedSymbols()
+
 
 class StockService:
-    def __init__(self, settings: Settings, session: AsyncSession) -> None:
-        self.open_close_stock_repository: OpenCloseStockRepository = OpenCloseStockRepository(settings=settings)
+    def __init__(self, settings: Settings, session: AsyncSession, http_client: httpx.AsyncClient | None = None) -> None:
+        self.settings: Settings = settings
+        self.http_client: httpx.AsyncClient | None = http_client
+        self.daily_bars_repository: DailyBarsRepository = DailyBarsRepository(settings=settings)
+        self.open_close_stock_repository: OpenCloseStockRepository = OpenCloseStockRepository(
+            settings=settings,
+            client=http_client,
+            daily_bars_repository=self.daily_bars_repository,
+        )
         self.marketwatch_repository: MarketWatchRepository = MarketWatchRepository(settings=settings)
         self.purchases_repository: PurchasesRepository = PurchasesRepository(settings=settings, session=session)
 
+    async def _timed(self, source: str, awaitable: Awaitable[T], source_timings: dict[str, float]) -> T:
+        """Await a source and record how long it took in `source_timings`, even if it fails.
+
+        Args:
+            source (str): The name under which the elapsed time is recorded.
+            awaitable (Awaitable[T]): The source call to await.
+            source_timings (dict[str, float]): The elapsed time of each source, by name.
+
+        Returns:
+            T: The result of the awaited source.
+        """
+        start_time: float = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            source_timings[source] = time.perf_counter() - start_time
+
     async def get_stock_by_symbol(self, stock_symbol: str, date: date) -> StockData:
         """Retrieves stock data for a given stock symbol and date.
 
+        The response is assembled from components cached separately, each with its own TTL: the daily open/close
+        of the date, the MarketWatch page (performance and competitors) and the company name. The purchased amount
+        is read from the database on every lookup. The market data components are kept until the next open while
+        the market is closed, and the open/close of a final session is kept for `cache_final_data_time`. All
+        components are fetched under a single deadline (`stock_aggregation_timeout`). The open/close and the
+        purchased amount are fetched concurrently, and the components scraped from MarketWatch only start once
+        Polygon has answered the open/close, so an unknown symbol costs one Polygon request instead of a browser
+        scrape.
+
+        The symbol is normalized first, so `aapl` and `AAPL` share their cache entries. Symbols known to be invalid,
+        and symbol/date lookups that recently failed, are answered with their error before any source is called.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve data for.
+            date (date): The date for which to retrieve the stock data.
+
+        Returns:
+            StockData: An object containing various data points related to the stock, including stock values,
+                performance data, and competitors.
+
+        Raises:
+            HTTPException: 504 if the sources do not answer before the deadline, or any error raised by a source.
+        """
+        stock_symbol = normalize_symbol(stock_symbol)
+        await invalid_symbols.check(stock_symbol)
+        await failed_lookups.check(f"{stock_symbol}:{date}")
+        try:
+            stock_data: StockData = await self._aggregate_stock_by_symbol(stock_symbol, date)
+        except HTTPException as exp:
+            await self._remember_failure(stock_symbol, date, exp)
+            raise
+        # Only symbols that resolved are counted, so typos and garbage input never reach the warmer's watchlist.
+        requested_symbols.record(stock_symbol)
+        return stock_data
+
+    async def get_cached_stock_by_symbol(self, stock_symbol: str, date: date) -> StockData | None:
+        """Retrieves stock data for a given stock symbol and date only if no upstream source has to be called.
+
+        The open/close, the MarketWatch page and the company name are read from their caches, fresh or stale,
+        without being computed or refreshed; the purchased amount is read from the database as usual.
+
         Args:
             stock_symbol (str): The symbol of the stock to retrieve data for.
             date (date): The date for which to retrieve the stock data.
 
         Returns:
-            StockData: An object containing various data points related to the stock, including stock values, performance data, and competitors.
+            StockData | None: The stock data, or None if any cached component is missing.
+
+        Raises:
+            HTTPException: The error remembered for an invalid symbol or a recently failed lookup.
         """
-        daily_open_close_data: DailyOpenCloseStock = await self.open_close_stock_repository.get_daily_open_close_sotck(
-            stock_symbol, date
+        stock_symbol = normalize_symbol(stock_symbol)
+        await invalid_symbols.check(stock_symbol)
+        await failed_lookups.check(f"{stock_symbol}:{date}")
+        daily_open_close_data, marketwatch_page, company_name = await asyncio.gather(
+            open_close_cache.peek(f"{stock_symbol}:{date}"),
+            marketwatch_page_cache.peek(stock_symbol),
+            company_name_cache.peek(stock_symbol),
+        )
+        if daily_open_close_data is None or marketwatch_page is None or company_name is None:
+            return None
+        return self._build_stock_data(
+            daily_open_close_data, marketwatch_page, company_name, await self._load_purchased_amount(stock_symbol)
         )
 
-        stock_values: StockValuesData = StockValuesData.model_validate(daily_open_close_data.model_dump())
-        performance_data: PerformanceData = await self.marketwatch_repository.get_stock_performance_by_symbol(
-            stock_symbol
+    async def _remember_failure(self, stock_symbol: str, date: date, error: HTTPException) -> None:
+        """Negatively caches a failed lookup, for a time depending on why it failed.
+
+        A 404 on a final trading session means either the symbol does not exist, which is confirmed with Polygon
+        before the whole symbol is remembered as invalid, or it was not listed yet. A 404 on a day without a
+        session stays true forever. Upstream failures are only remembered very briefly, to absorb retry storms;
+        timeouts are not remembered since the shared computation keeps running and fills the cache.
+
+        Args:
+            stock_symbol (str): The symbol of the failed lookup.
+            date (date): The date of the failed lookup.
+            error (HTTPException): The error the lookup failed with.
+        """
+        lookup_key = f"{stock_symbol}:{date}"
+        if error.status_code == HTTPStatus.NOT_FOUND:
+            if not is_trading_day(date):
+                await failed_lookups.remember(lookup_key, error, self.settings.cache_final_data_time)
+            elif is_session_final(date) and not await self.open_close_stock_repository.is_known_symbol(stock_symbol):
+                await invalid_symbols.remember(
+                    stock_symbol,
+                    HTTPException(status_code=HTTPStatus.NOT_FOUND, detail=f"Stock {stock_symbol} not found"),
+                    self.settings.cache_invalid_symbol_time,
+                )
+            else:
+                await failed_lookups.remember(lookup_key, error, self.settings.cache_not_found_time)
+        elif error.status_code >= HTTPStatus.INTERNAL_SERVER_ERROR and error.status_code != HTTPStatus.GATEWAY_TIMEOUT:
+            await failed_lookups.remember(lookup_key, error, self.settings.cache_upstream_failure_time)
+
+    def _open_close_ttl(self, date: date) -> int:
+        # Until its extended hours end, the bar of a session keeps changing, even outside the regular hours.
+        if is_session_final(date):
+            return self.settings.cache_final_data_time
+        return self.settings.cache_open_close_time
+
+    def _marketwatch_page_ttl(self) -> int:
+        return get_cache_ttl(self.settings.cache_marketwatch_page_time, self.settings.cache_final_data_time)
+
+    async def warm_stock(self, stock_symbol: str, date: date, lead_time: int) -> int:
+        """Refreshes the cached market data of a stock symbol that is missing or about to expire.
+
+        Only the components coming from upstream sources are warmed: the open/close of the date, the MarketWatch
+        page and the company name. Symbols known to be invalid are skipped.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to warm the cache of.
+            date (date): The date of the open/close to warm.
+            lead_time (int): How long before the end of its freshness a component is refreshed.
+
+        Returns:
+            int: The number of components that were refreshed.
+
+        Raises:
+            HTTPException: The error remembered for an invalid symbol, or the first error raised by a source.
+        """
+        stock_symbol = normalize_symbol(stock_symbol)
+        await invalid_symbols.check(stock_symbol)
+        warmed: list[bool] = await asyncio.gather(
+            open_close_cache.warm(
+                f"{stock_symbol}:{date}",
+                partial(self.open_close_stock_repository.get_daily_open_close_sotck, stock_symbol, date),
+                ttl=self._open_close_ttl(date),
+                lead_time=lead_time,
+            ),
+            marketwatch_page_cache.warm(
+                stock_symbol,
+                partial(self.marketwatch_repository.get_stock_page, stock_symbol),
+                ttl=self._marketwatch_page_ttl(),
+                lead_time=lead_time,
+            ),
+            company_name_cache.warm(stock_symbol, partial(self._load_company_name, stock_symbol), lead_time=lead_time),
         )
-        competitors: list[CompetitorData] = await self.marketwatch_repository.get_stock_competitors_by_symbol(
-            stock_symbol=stock_symbol
+        return sum(warmed)
+
+    async def _aggregate_stock_by_symbol(self, stock_symbol: str, date: date) -> StockData:
+        source_timings: dict[str, float] = {}
+        tasks: dict[str, asyncio.Future[Any]] = {}
+
+        def start(source: str, awaitable: Awaitable[Any]) -> None:
+            tasks[source] = asyncio.ensure_future(self._timed(source, awaitable, source_timings))
+
+        start(
+            "open_close",
+            open_close_cache.get(
+                f"{stock_symbol}:{date}",
+                partial(self.open_close_stock_repository.get_daily_open_close_sotck, stock_symbol, date),
+                ttl=self._open_close_ttl(date),
+            ),
         )
+        # Read on every request rather than cached: it is a single indexed lookup, and a cached total could be
+        # overwritten with the one a request read just before a purchase committed.
+        start("purchased_amount", self._load_purchased_amount(stock_symbol))
+        try:
+            async with asyncio.timeout(self.settings.stock_aggregation_timeout):
+                # The page computations are shared and outlive this request, so cancelling them cannot stop a
+                # scrape. They only start once Polygon knows the symbol and date.
+                await tasks["open_close"]
+                start(
+                    "marketwatch_page",
+                    marketwatch_page_cache.get(
+                        stock_symbol,
+                        partial(self.marketwatch_repository.get_stock_page, stock_symbol),
+                        ttl=self._marketwatch_page_ttl(),
+                    ),
+                )
+                start(
+                    "company_name",
+                    company_name_cache.get(stock_symbol, partial(self._load_company_name, stock_symbol)),
+                )
+                await asyncio.gather(*tasks.values())
+        except TimeoutError:
+            detail = f"Timed out retrieving data for stock {stock_symbol}"
+            logger.error("%s. Source timings: %s", detail, source_timings)
+            raise HTTPException(status_code=504, detail=detail)
+        finally:
+            # A failing source must not leave the others running in the background.
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
 
-        company_name: str = await self.marketwatch_repository.get_company_name_by_symbol(stock_symbol=stock_symbol)
+        logger.info(
+            "Sources for %s retrieved in: %s",
+            stock_symbol,
+            ", ".join(f"{source}={elapsed:.2f}s" for source, elapsed in source_timings.items()),
+        )
 
-        purchased_amount: float = await self.purchases_repository.get_purchases_total_amount_by_symbol(stock_symbol)
+        return self._build_stock_data(
+            tasks["open_close"].result(),
+            tasks["marketwatch_page"].result(),
+            tasks["company_name"].result(),
+            tasks["purchased_amount"].result(),
+        )
 
+    @staticmethod
+    def _build_stock_data(
+        daily_open_close_data: DailyOpenCloseStock,
+        marketwatch_page: MarketWatchStockPage,
+        company_name: str,
+        purchased_amount: int,
+    ) -> StockData:
+        stock_values: StockValuesData = StockValuesData.model_validate(daily_open_close_data.model_dump())
         return_data: dict[str, Any] = {
             "status": daily_open_close_data.status,
             "purchased_amount": purchased_amount,
@@ -56,15 +326,190 @@ class StockService:
             "company_code": daily_open_close_data.symbol,
             "company_name": company_name,
             "stock_values": stock_values,
-            "performance_data": performance_data,
-            "competitors": competitors,
+            "performance_data": marketwatch_page.performance,
+            "competitors": marketwatch_page.competitors,
         }
 
         return StockData.model_validate(return_data)
 
+    async def _load_company_name(self, stock_symbol: str) -> str:
+        marketwatch_page: MarketWatchStockPage = await self.marketwatch_repository.get_stock_page(stock_symbol)
+        return marketwatch_page.company_name
+
+    async def _load_purchased_amount(self, stock_symbol: str) -> int:
+        # Batch lookups read the totals of many symbols concurrently, so each read uses its own session.
+        async with sessionmanager.session() as session:
+            return await PurchasesRepository(
+                settings=self.settings, session=session
+            ).get_purchases_total_amount_by_symbol(stock_symbol)
+
+    def _normalize_symbols(self, stock_symbols: list[str]) -> list[str]:
+        """Upper-cases and deduplicates the requested symbols, keeping the order they were requested in.
+
+        Args:
+            stock_symbols (list[str]): The symbols as requested.
+
+        Returns:
+            list[str]: The unique symbols.
+
+        Raises:
+            HTTPException: 400 if no symbol or more than `batch_max_symbols` symbols are requested.
+        """
+        unique_symbols: list[str] = list(
+            dict.fromkeys(normalize_symbol(symbol) for symbol in stock_symbols if symbol.strip())
+        )
+        if not unique_symbols or len(unique_symbols) > self.settings.batch_max_symbols:
+            raise HTTPException(
+                status_code=400, detail=f"Between 1 and {self.settings.batch_max_symbols} symbols must be requested"
+            )
+        return unique_symbols
+
+    async def _get_batch_item(self, stock_symbol: str, date: date, slots: asyncio.Semaphore) -> BatchStockItem:
+        async with slots:
+            try:
+                stock_data: StockData = await self.get_stock_by_symbol(stock_symbol, date)
+            except HTTPException as exp:
+                return BatchStockItem(
+                    symbol=stock_symbol, error=StockError(status_code=exp.status_code, detail=exp.detail)
+                )
+            except Exception:
+                logger.exception("Failed to retrieve stock %s", stock_symbol)
+                return BatchStockItem(
+                    symbol=stock_symbol,
+                    error=StockError(status_code=500, detail="Internal error. Please contact support."),
+                )
+        return BatchStockItem(symbol=stock_symbol, data=stock_data)
+
+    async def _iter_batch_items(self, unique_symbols: list[str], date: date) -> AsyncIterator[BatchStockItem]:
+        slots = asyncio.Semaphore(self.settings.batch_max_concurrency)
+        tasks: list[asyncio.Task[BatchStockItem]] = [
+            asyncio.ensure_future(self._get_batch_item(stock_symbol, date, slots)) for stock_symbol in unique_symbols
+        ]
+        try:
+            for next_item in asyncio.as_completed(tasks):
+                yield await next_item
+        finally:
+            # A client that disconnects mid-stream must not leave the remaining symbols running.
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def iter_stocks_by_symbols(self, stock_symbols: list[str], date: date) -> AsyncIterator[BatchStockItem]:
+        """Retrieves stock data for many stock symbols, yielding each one as soon as it is ready.
+
+        Symbols are deduplicated and fetched concurrently, at most `batch_max_concurrency` at a time. Items are
+        yielded in completion order; a symbol that fails is yielded with its error without failing the others. The
+        symbols are validated before the first item is awaited, so a bad request is rejected before a streamed
+        response starts.
+
+        Args:
+            stock_symbols (list[str]): The symbols of the stocks to retrieve data for.
+            date (date): The date for which to retrieve the stock data.
+
+        Returns:
+            AsyncIterator[BatchStockItem]: The stock data or the error of each symbol.
+
+        Raises:
+            HTTPException: 400 if no symbol or more than `batch_max_symbols` symbols are requested.
+        """
+        return self._iter_batch_items(self._normalize_symbols(stock_symbols), date)
+
+    async def get_stocks_by_symbols(self, stock_symbols: list[str], date: date) -> BatchStockData:
+        """Retrieves stock data for many stock symbols at once.
+
+        Collects `iter_stocks_by_symbols` into a single object, ordered as the symbols were requested.
+
+        Args:
+            stock_symbols (list[str]): The symbols of the stocks to retrieve data for.
+            date (date): The date for which to retrieve the stock data.
+
+        Returns:
+            BatchStockData: The stock data of each symbol that succeeded and the error of each one that failed.
+
+        Raises:
+            HTTPException: 400 if no symbol or more than `batch_max_symbols` symbols are requested.
+        """
+        unique_symbols: list[str] = self._normalize_symbols(stock_symbols)
+        items: dict[str, BatchStockItem] = {
+            item.symbol: item async for item in self._iter_batch_items(unique_symbols, date)
+        }
+        return BatchStockData(
+            results={symbol: items[symbol].data for symbol in unique_symbols if items[symbol].data is not None},
+            errors={symbol: items[symbol].error for symbol in unique_symbols if items[symbol].error is not None},
+        )
+
+    async def iter_stock_history(self, stock_symbol: str, from_date: date, to_date: date) -> AsyncIterator[DailyBar]:
+        """Retrieves the daily bars of a stock symbol for a date range, one bar at a time.
+
+        The range is fetched from Polygon in a single request; days missing from the answer are filled in with the
+        bars stored locally. If the stored bars cannot be read, only the Polygon bars are served. Both sources are
+        awaited before returning, so their errors surface before a streamed response starts.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve data for.
+            from_date (date): The first date of the range.
+            to_date (date): The last date of the range, inclusive.
+
+        Returns:
+            AsyncIterator[DailyBar]: The bars of the range, sorted by date.
+
+        Raises:
+            HTTPException: 400 if the range is empty, or any error raised by Polygon.
+        """
+        if from_date > to_date:
+            raise HTTPException(status_code=400, detail=f"Invalid range: {from_date} is after {to_date}")
+
+        stock_symbol = normalize_symbol(stock_symbol)
+        upstream_bars, stored_bars = await asyncio.gather(
+            self.open_close_stock_repository.get_daily_bars(stock_symbol, from_date, to_date),
+            self._get_stored_daily_bars(stock_symbol, from_date, to_date),
+        )
+        bars_by_date: dict[str, DailyBar] = {
+            stored_bar.date: DailyBar.model_validate(stored_bar.model_dump()) for stored_bar in stored_bars
+        }
+        bars_by_date.update((upstream_bar.date, upstream_bar) for upstream_bar in upstream_bars)
+
+        async def iter_bars() -> AsyncIterator[DailyBar]:
+            for bar_date in sorted(bars_by_date):
+                yield bars_by_date[bar_date]
+
+        return iter_bars()
+
+    async def _get_stored_daily_bars(
+        self, stock_symbol: str, from_date: date, to_date: date
+    ) -> list[DailyOpenCloseStock]:
+        try:
+            return await self.daily_bars_repository.get_daily_bars(stock_symbol, from_date, to_date)
+        except SQLAlchemyError as exp:
+            logger.warning(
+                "Failed to read stored daily bars of %s (%s to %s): %s", stock_symbol, from_date, to_date, exp
+            )
+            return []
+
+    async def get_stock_history(self, stock_symbol: str, from_date: date, to_date: date) -> DailyBarsHistory:
+        """Retrieves the daily bars of a stock symbol for a date range as columns.
+
+        Args:
+            stock_symbol (str): The symbol of the stock to retrieve data for.
+            from_date (date): The first date of the range.
+            to_date (date): The last date of the range, inclusive.
+
+        Returns:
+            DailyBarsHistory: The dates, open, high, low, close and volume of the range, sorted by date.
+
+        Raises:
+            HTTPException: 400 if the range is empty, or any error raised by Polygon.
+        """
+        bars: AsyncIterator[DailyBar] = await self.iter_stock_history(stock_symbol, from_date, to_date)
+        return DailyBarsHistory.from_bars(normalize_symbol(stock_symbol), [bar async for bar in bars])
+
     async def purchase_stock(self, stock_symbol: str, amount: int) -> None:
         """Purchase a specific amount of stock for a given stock symbol.
 
+        The purchased amount is not cached, so the new total shows up in the next lookup right away. With
+        `purchase_group_commit_enabled`, the purchase is committed together with the concurrent ones by
+        `purchase_buffer`; it is committed either way when this returns.
+
         Args:
             stock_symbol (str): The symbol of the stock to purchase.
             amount (float): The amount of stock to purchase.
@@ -72,4 +517,60 @@ class StockService:
         Returns:
             None
         """
-        await self.purchases_repository.purchase_stock(company_code=stock_symbol, amount=amount)
+        stock_symbol = normalize_symbol(stock_symbol)
+        if purchase_buffer.running:
+            await purchase_buffer.purchase_stock(company_code=stock_symbol, amount=amount)
+        else:
+            await self.purchases_repository.purchase_stock(company_code=stock_symbol, amount=amount)
+
+    async def purchase_stocks(self, entries: AsyncIterator[BulkPurchaseEntry]) -> BulkPurchaseResponse:
+        """Purchase many stocks at once, writing every purchase and the totals in a single transaction.
+
+        Args:
+            entries (AsyncIterator[BulkPurchaseEntry]): The symbol and amount of each purchase, e.g. parsed from an
+                upload as it is received.
+
+        Returns:
+            BulkPurchaseResponse: How many purchases and symbols were written, and at how many rows per second.
+
+        Raises:
+            HTTPException: 400 if there are no purchases, 413 if there are more than `purchase_bulk_max_rows`.
+        """
+        start_time: float = time.perf_counter()
+        purchases: list[tuple[str, int]] = []
+        async for entry in entries:
+            if len(purchases) >= self.settings.purchase_bulk_max_rows:
+                raise HTTPException(
+                    status_code=413, detail=f"At most {self.settings.purchase_bulk_max_rows} purchases per request"
+                )
+            purchases.append((normalize_symbol(entry.symbol), entry.amount))
+        if not purchases:
+            raise HTTPException(status_code=400, detail="No purchases were uploaded")
+
+        await self.purchases_repository.purchase_stocks(purchases)
+        stock_symbols: set[str] = {stock_symbol for stock_symbol, _ in purchases}
+
+        elapsed_seconds: float = time.perf_counter() - start_time
+        rows_per_second: float = len(purchases) / elapsed_seconds if elapsed_seconds > 0 else 0.0
+        logger.info(
+            "Bulk purchase of %d rows for %d symbols at %.0f rows/s",
+            len(purchases),
+            len(stock_symbols),
+            rows_per_second,
+        )
+        return BulkPurchaseResponse(
+            rows=len(purchases),
+            symbols=len(stock_symbols),
+            elapsed_seconds=elapsed_seconds,
+            rows_per_second=rows_per_second,
+        )
+
+
+def get_stock_service(settings: SettingsDep, session: SessionDep, http_client: PolygonClientDep) -> StockService:
+    """
+    Builds the StockService of a request from its settings, database session and shared Polygon client.
+    """
+    return StockService(settings, session, http_client)
+
+
+StockServiceDep = Annotated[StockService, Depends(get_stock_service)]
@@ -0,0 +1,75 @@
+from datetime import date, datetime
+
+import pytest
+
+from app.common.datetime_utils import MARKET_TIMEZONE
+from app.common.market_calendar import (
+    get_cache_ttl,
+    get_market_holidays,
+    get_next_market_open,
+    is_market_open,
+    is_session_final,
+    is_trading_day,
+)
+
+DEFAULT_TTL = 60
+FINAL_TTL = 86400
+
+
+def market_time(year: int, month: int, day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(year, month, day, hour, minute, tzinfo=MARKET_TIMEZONE)
+
+
+class TestMarketCalendar:
+    def test_market_holidays(self) -> None:
+        assert get_market_holidays(2023) == {
+            date(2023, 1, 2),
+            date(2023, 1, 16),
+            date(2023, 2, 20),
+            date(2023, 4, 7),
+            date(2023, 5, 29),
+            date(2023, 6, 19),
+            date(2023, 7, 4),
+            date(2023, 9, 4),
+            date(2023, 11, 23),
+            date(2023, 12, 25),
+        }
+
+    @pytest.mark.parametrize(
+        "day, expected",
+        [
+            pytest.param(date(2021, 12, 31), True, id="new-year-on-saturday-not-observed"),
+            pytest.param(date(2027, 6, 18), False, id="juneteenth-observed-on-friday"),
+            pytest.param(date(2026, 7, 3), False, id="independence-day-observed-on-friday"),
+            pytest.param(date(2024, 3, 29), False, id="good-friday"),
+            pytest.param(date(2024, 10, 12), False, id="saturday"),
+            pytest.param(date(2024, 10, 14), True, id="weekday"),
+        ],
+    )
+    def test_is_trading_day(self, day: date, expected: bool) -> None:
+        assert is_trading_day(day) is expected
+
+    def test_is_market_open(self) -> None:
+        assert is_market_open(market_time(2024, 10, 14, 9, 30))
+        assert not is_market_open(market_time(2024, 10, 14, 16))
+
+    def test_next_open_skips_weekend_and_holiday(self) -> None:
+        assert get_next_market_open(market_time(2024, 3, 28, 17)) == market_time(2024, 4, 1, 9, 30)
+
+    def test_session_is_final_after_extended_hours(self) -> None:
+        assert not is_session_final(date(2024, 10, 14), market_time(2024, 10, 14, 17))
+        assert is_session_final(date(2024, 10, 14), market_time(2024, 10, 14, 20))
+        assert is_session_final(date(2024, 10, 11), market_time(2024, 10, 14, 10))
+
+    @pytest.mark.parametrize(
+        "session_date, now, expected",
+        [
+            pytest.param(date(2024, 10, 11), market_time(2024, 10, 14, 10), FINAL_TTL, id="past-session"),
+            pytest.param(None, market_time(2024, 10, 14, 10), DEFAULT_TTL, id="market-open"),
+            pytest.param(date(2024, 10, 14), market_time(2024, 10, 14, 17), DEFAULT_TTL, id="extended-hours"),
+            pytest.param(None, market_time(2024, 10, 12, 9, 30), 2 * 86400, id="weekend"),
+            pytest.param(None, market_time(2024, 10, 14, 9, 29), DEFAULT_TTL, id="just-before-open"),
+        ],
+    )
+    def test_get_cache_ttl(self, session_date: date | None, now: datetime, expected: int) -> None:
+        assert get_cache_ttl(DEFAULT_TTL, FINAL_TTL, session_date, now) == expected
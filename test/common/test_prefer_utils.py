@@ -0,0 +1,15 @@
+import pytest
+
+from app.common.prefer_utils import prefers_respond_async
+
+
+@pytest.mark.parametrize(
+    "prefer, expected",
+    [
+        pytest.param(None, False, id="missing"),
+        pytest.param("return=minimal", False, id="other-preference"),
+        pytest.param("respond-async, wait=10", True, id="respond-async"),
+    ],
+)
+def test_prefers_respond_async(prefer: str | None, expected: bool) -> None:
+    assert prefers_respond_async(prefer) is expected
@@ -0,0 +1,85 @@
+from collections.abc import AsyncIterator
+
+import pytest
+from fastapi import HTTPException
+
+from app.common.purchase_upload_utils import iter_lines, iter_purchase_entries
+from app.models.dto.stock_endpoint_models import BulkPurchaseEntry
+
+MAX_JSON_BYTES = 1024
+
+
+async def iter_chunks(*chunks: bytes) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.asyncio
+async def test_iter_lines_across_chunks() -> None:
+    lines: list[bytes] = [
+        line async for line in iter_lines(iter_chunks(b"symbol,am", b"ount\r\nAAPL,1", b"0\n\nMSFT,5"))
+    ]
+
+    assert lines == [b"symbol,amount", b"AAPL,10", b"MSFT,5"]
+
+
+@pytest.mark.asyncio
+async def test_parse_json_upload() -> None:
+    chunks: AsyncIterator[bytes] = iter_chunks(b'[{"symbol": "AAPL", ', b'"amount": 10}]')
+
+    entries: list[BulkPurchaseEntry] = [
+        entry async for entry in iter_purchase_entries("application/json", chunks, MAX_JSON_BYTES)
+    ]
+
+    assert entries == [BulkPurchaseEntry(symbol="AAPL", amount=10)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content_type, body",
+    [
+        pytest.param("text/csv", b"\xef\xbb\xbfsymbol,amount\nAAPL,10\n", id="csv"),
+        pytest.param("application/x-ndjson", b'\xef\xbb\xbf{"symbol": "AAPL", "amount": 10}\n', id="ndjson"),
+        pytest.param("application/json", b'\xef\xbb\xbf[{"symbol": "AAPL", "amount": 10}]', id="json"),
+    ],
+)
+async def test_parse_upload_with_byte_order_mark(content_type: str, body: bytes) -> None:
+    entries: list[BulkPurchaseEntry] = [
+        entry async for entry in iter_purchase_entries(content_type, iter_chunks(body), MAX_JSON_BYTES)
+    ]
+
+    assert entries == [BulkPurchaseEntry(symbol="AAPL", amount=10)]
+
+
+@pytest.mark.asyncio
+async def test_reject_row_that_is_not_utf8() -> None:
+    body: bytes = "symbol,amount\nAAPL,10\nSOCIÉTÉ,10\n".encode("latin-1")
+
+    with pytest.raises(HTTPException) as exp:
+        [entry async for entry in iter_purchase_entries("text/csv", iter_chunks(body), MAX_JSON_BYTES)]
+
+    assert exp.value.status_code == 422  # noqa: PLR2004
+    assert exp.value.detail.startswith("Invalid purchase on line 3:")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "content_type, body, status_code",
+    [
+        pytest.param("text/plain", b"AAPL 10", 415, id="unsupported-media-type"),
+        pytest.param("text/csv", b"ticker,amount\nAAPL,10\n", 422, id="csv-header"),
+        pytest.param("text/csv", b"symbol,amount\nAAPL,10,extra\n", 422, id="csv-columns"),
+        pytest.param("text/csv", "symbol,amount\nSOCIÉTÉ,10\n".encode("latin-1"), 422, id="csv-not-utf8"),
+        pytest.param("application/x-ndjson", b'{"symbol": "SOCI\xc9T\xc9", "amount": 10}\n', 422, id="ndjson-not-utf8"),
+        pytest.param("application/x-ndjson", b'{"symbol": "AAPL"}\n', 422, id="ndjson-missing-amount"),
+        pytest.param("application/json", b'{"symbol": "AAPL", "amount": 10}', 422, id="json-not-a-list"),
+        pytest.param(
+            "application/json", b'[{"symbol": "AAPL", "amount": 10}' + b", {}" * 512 + b"]", 413, id="json-too-big"
+        ),
+    ],
+)
+async def test_reject_invalid_upload(content_type: str, body: bytes, status_code: int) -> None:
+    with pytest.raises(HTTPException) as exp:
+        [entry async for entry in iter_purchase_entries(content_type, iter_chunks(body), MAX_JSON_BYTES)]
+
+    assert exp.value.status_code == status_code
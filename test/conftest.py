@@ -4,9 +4,12 @@ from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 import pytest
 from httpx import AsyncClient
 
+from app.cache import NegativeCache, StaleWhileRevalidateCache
+from app.repository.cookie_store import MemoryCookieStore
 from app.repository.marketwatch_repository import MarketWatchRepository
 from app.repository.open_close_stock_repository import OpenCloseStockRepository
 from app.repository.purchases_repository import PurchasesRepository
+from app.repository.scrape_pacer import AdaptivePacer
 
 
 @pytest.fixture(scope="function")
@@ -19,6 +22,7 @@ def mock_open_close_stock_repository() -> Generator[dict[str, MagicMock | AsyncM
 def mock_marketwatch_repository() -> Generator[dict[str, MagicMock | AsyncMock], Any, None]:
     with patch.multiple(
         MarketWatchRepository,
+        get_stock_page=DEFAULT,
         get_stock_performance_by_symbol=DEFAULT,
         get_company_name_by_symbol=DEFAULT,
         get_stock_competitors_by_symbol=DEFAULT,
@@ -41,4 +45,23 @@ def mock_httpx_async_client() -> Generator[dict[str, MagicMock | AsyncMock], Any
         yield mock
 
 
-patch("fastapi_cache.decorator.cache", lambda *args, **kwargs: lambda f: f).start()
+@pytest.fixture(autouse=True)
+def bypass_shared_cache() -> Generator[None, Any, None]:
+    with (
+        patch.object(StaleWhileRevalidateCache, "get", lambda self, key, compute, ttl=None: compute()),
+        patch.multiple(NegativeCache, check=AsyncMock(return_value=None), remember=AsyncMock(return_value=None)),
+    ):
+        yield
+
+
+@pytest.fixture(autouse=True)
+def memory_cookie_store() -> Generator[MemoryCookieStore, Any, None]:
+    store = MemoryCookieStore(ttl=60)
+    with patch("app.repository.marketwatch_repository.cookie_store", store):
+        yield store
+
+
+@pytest.fixture(autouse=True)
+def bypass_scrape_pacing() -> Generator[None, Any, None]:
+    with patch.object(AdaptivePacer, "wait", AsyncMock(return_value=None)):
+        yield
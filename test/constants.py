@@ -1,6 +1,7 @@
-from datetime import date
+from datetime import date, datetime, timezone
 
 from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
 from app.models.dto.stock_response import CompetitorData, MarketCapData, PerformanceData, StockData
 
 AAPL_DAILY_OPEN_CLOSE_STOCK_DATA = {
@@ -37,6 +38,13 @@ AAPL_PURCHASES_AMOUNT = 100.0
 AAPL_COMPETITORS: list[CompetitorData] = [
     CompetitorData(name="Competitor1", market_cap=MarketCapData(currency="$", value=123_000_000))
 ]
+AAPL_MARKETWATCH_STOCK_PAGE = MarketWatchStockPage(
+    symbol="AAPL",
+    company_name=AAPL_COMPANY_NAME,
+    performance=AAPL_PERFORMANCE_DATA,
+    competitors=AAPL_COMPETITORS,
+    fetched_at=datetime(2023, 10, 1, tzinfo=timezone.utc),
+)
 AAPL_EXPECTED_STOCK: StockData = StockData.model_validate(
     {
         "status": "OK",
@@ -88,6 +96,13 @@ GE_COMPETITORS: list[CompetitorData] = [
     CompetitorData(name="Competitor1", market_cap=MarketCapData(currency="$", value=124000000)),
     CompetitorData(name="Competitor2", market_cap=MarketCapData(currency="R$", value=12000000)),
 ]
+GE_MARKETWATCH_STOCK_PAGE = MarketWatchStockPage(
+    symbol="GE",
+    company_name=GE_COMPANY_NAME,
+    performance=GE_PERFORMANCE_DATA,
+    competitors=GE_COMPETITORS,
+    fetched_at=datetime(2023, 10, 2, tzinfo=timezone.utc),
+)
 GE_EXPECTED_STOCK: StockData = StockData.model_validate(
     {
         "status": "OK",
@@ -110,3 +125,6 @@ GE_EXPECTED_STOCK: StockData = StockData.model_validate(
         ],
     }
 )
+
+MARKETWATCH_HTML_DIR = "./test/repository/marketwatch_html"
+MARKETWATCH_STOCK_PAGE_HTML = f"{MARKETWATCH_HTML_DIR}/stock_page.html"
@@ -0,0 +1,206 @@
+import asyncio
+from datetime import date
+from typing import Any
+
+import pytest
+from fastapi import HTTPException
+
+from app.app_config import Settings
+from app.jobs.job_queue import QUEUE_KEY, ScrapeJobQueue
+from app.models.dto.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.models.dto.stock_response import StockError
+from test.constants import AAPL_EXPECTED_STOCK
+
+
+class FakePipeline:
+    def __init__(self, redis: "FakeRedis") -> None:
+        self.redis = redis
+        self.commands: list[tuple[str, tuple[Any, ...], dict[str, Any]]] = []
+
+    async def __aenter__(self) -> "FakePipeline":
+        return self
+
+    async def __aexit__(self, *_: object) -> None:
+        return None
+
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args, **kwargs: self.commands.append((name, args, kwargs))
+
+    async def execute(self) -> None:
+        for name, args, kwargs in self.commands:
+            await getattr(self.redis, name)(*args, **kwargs)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, bytes] = {}
+        self.lists: dict[str, list[bytes]] = {}
+        self.sets: dict[str, set[bytes]] = {}
+
+    def pipeline(self, transaction: bool = True) -> FakePipeline:
+        return FakePipeline(self)
+
+    async def get(self, key: str) -> bytes | None:
+        value: bytes | None = self.values.get(key)
+        await asyncio.sleep(0)
+        return value
+
+    async def set(self, key: str, value: str | int, ex: int | None = None, nx: bool = False) -> bool | None:
+        if nx and key in self.values:
+            return None
+        self.values[key] = str(value).encode()
+        return True
+
+    async def exists(self, key: str) -> int:
+        return int(key in self.values)
+
+    async def delete(self, key: str) -> None:
+        self.values.pop(key, None)
+
+    async def llen(self, key: str) -> int:
+        return len(self.lists.get(key, []))
+
+    async def lpush(self, key: str, value: str) -> None:
+        self.lists.setdefault(key, []).insert(0, value.encode())
+
+    async def rpush(self, key: str, value: str) -> None:
+        self.lists.setdefault(key, []).append(value.encode())
+
+    async def lrem(self, key: str, count: int, value: str | bytes) -> None:
+        value = value if isinstance(value, bytes) else value.encode()
+        if value in self.lists.get(key, []):
+            self.lists[key].remove(value)
+
+    async def lmove(self, source: str, destination: str, src: str, dest: str) -> bytes | None:
+        if not self.lists.get(source):
+            return None
+        value: bytes = self.lists[source].pop() if src == "RIGHT" else self.lists[source].pop(0)
+        destination_list: list[bytes] = self.lists.setdefault(destination, [])
+        destination_list.append(value) if dest == "RIGHT" else destination_list.insert(0, value)
+        return value
+
+    async def blmove(self, source: str, destination: str, timeout: int, src: str, dest: str) -> bytes | None:
+        return await self.lmove(source, destination, src, dest)
+
+    async def sadd(self, key: str, value: str) -> None:
+        self.sets.setdefault(key, set()).add(value.encode())
+
+    async def smembers(self, key: str) -> frozenset[bytes]:
+        return frozenset(self.sets.get(key, ()))
+
+    async def srem(self, key: str, value: str) -> None:
+        self.sets.get(key, set()).discard(value.encode())
+
+
+def build_queue(**settings_kwargs: Any) -> ScrapeJobQueue:
+    return ScrapeJobQueue(settings=Settings(polygon_api_key="", **settings_kwargs), redis=FakeRedis())
+
+
+class TestScrapeJobQueue:
+    @pytest.mark.asyncio
+    async def test_enqueue_same_lookup_once(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+
+        first_job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 14))
+        second_job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 14))
+        other_job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 11))
+
+        assert second_job.id == first_job.id
+        assert other_job.id != first_job.id
+        assert await job_queue.redis.llen(QUEUE_KEY) == 2  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_enqueue_normalizes_symbol(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+
+        first_job: ScrapeJob = await job_queue.enqueue("aapl", date(2024, 10, 14))
+        second_job: ScrapeJob = await job_queue.enqueue(" AAPL ", date(2024, 10, 14))
+
+        assert second_job.id == first_job.id
+        assert first_job.symbol == "AAPL"
+
+    @pytest.mark.asyncio
+    async def test_enqueue_concurrent_same_lookup_once(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+
+        jobs: list[ScrapeJob] = await asyncio.gather(*(job_queue.enqueue("AAPL", date(2024, 10, 14)) for _ in range(5)))
+
+        assert {job.id for job in jobs} == {jobs[0].id}
+        assert await job_queue.redis.llen(QUEUE_KEY) == 1
+        assert [key for key in job_queue.redis.values if ":job:" in key] == [f"scrape-jobs:job:{jobs[0].id}"]
+
+    @pytest.mark.asyncio
+    async def test_enqueue_takes_over_claim_of_expired_job(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+        expired_job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 14))
+        await job_queue.redis.delete(f"scrape-jobs:job:{expired_job.id}")
+
+        job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 14))
+
+        assert job.id != expired_job.id
+        assert (await job_queue.enqueue("AAPL", date(2024, 10, 14))).id == job.id
+
+    @pytest.mark.asyncio
+    async def test_reject_when_queue_is_full(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue(scrape_job_max_queue_depth=1)
+        await job_queue.enqueue("AAPL", date(2024, 10, 14))
+
+        with pytest.raises(HTTPException) as exc_info:
+            await job_queue.enqueue("MSFT", date(2024, 10, 14))
+
+        assert exc_info.value.status_code == 503  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_run_job_to_completion(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+        queued_job: ScrapeJob = await job_queue.enqueue("AAPL", date(2024, 10, 14))
+
+        running_job: ScrapeJob | None = await job_queue.dequeue("consumer")
+        assert running_job is not None
+        assert (await job_queue.get(queued_job.id)).status == ScrapeJobStatus.RUNNING
+        assert job_queue.redis.lists["scrape-jobs:processing:consumer"] == [queued_job.id.encode()]
+        await job_queue.complete("consumer", running_job, AAPL_EXPECTED_STOCK)
+
+        finished_job: ScrapeJob | None = await job_queue.get(queued_job.id)
+        assert finished_job.status == ScrapeJobStatus.SUCCEEDED
+        assert finished_job.result == AAPL_EXPECTED_STOCK
+        assert finished_job.finished_at is not None
+        assert job_queue.redis.lists["scrape-jobs:processing:consumer"] == []
+        assert (await job_queue.enqueue("AAPL", date(2024, 10, 14))).id != queued_job.id
+
+    @pytest.mark.asyncio
+    async def test_fail_and_requeue_jobs(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+        await job_queue.enqueue("AAPL", date(2024, 10, 14))
+        await job_queue.enqueue("MSFT", date(2024, 10, 14))
+
+        interrupted_job: ScrapeJob | None = await job_queue.dequeue("consumer")
+        await job_queue.requeue("consumer", interrupted_job)
+        failing_job: ScrapeJob | None = await job_queue.dequeue("consumer")
+        await job_queue.fail("consumer", failing_job, StockError(status_code=404, detail="Not found"))
+
+        assert failing_job.id == interrupted_job.id
+        assert (await job_queue.get(failing_job.id)).error.status_code == 404  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_recover_jobs_of_stopped_consumers(self) -> None:
+        job_queue: ScrapeJobQueue = build_queue()
+        await job_queue.enqueue("AAPL", date(2024, 10, 14))
+        await job_queue.enqueue("MSFT", date(2024, 10, 14))
+        await job_queue.heartbeat("stopped")
+        await job_queue.heartbeat("alive")
+        abandoned_job: ScrapeJob | None = await job_queue.dequeue("stopped")
+        running_job: ScrapeJob | None = await job_queue.dequeue("alive")
+        await job_queue.redis.delete("scrape-jobs:heartbeat:stopped")
+
+        assert await job_queue.recover_abandoned() == 1
+
+        assert (await job_queue.get(abandoned_job.id)).status == ScrapeJobStatus.QUEUED
+        assert (await job_queue.get(running_job.id)).status == ScrapeJobStatus.RUNNING
+        assert job_queue.redis.sets["scrape-jobs:consumers"] == {b"alive"}
+        assert (await job_queue.dequeue("alive")).id == abandoned_job.id
+        assert await job_queue.recover_abandoned() == 0
+
+    @pytest.mark.asyncio
+    async def test_dequeue_nothing(self) -> None:
+        assert await build_queue().dequeue("consumer") is None
@@ -0,0 +1,36 @@
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.jobs.job_queue import get_scrape_job_queue
+from app.jobs.job_router import router
+from app.models.dto.scrape_job import ScrapeJob, ScrapeJobStatus
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+mock_job_queue = MagicMock(get=AsyncMock())
+app.dependency_overrides[get_scrape_job_queue] = lambda: mock_job_queue
+
+
+def test_get_job() -> None:
+    mock_job_queue.get.return_value = ScrapeJob(
+        id="abc",
+        status=ScrapeJobStatus.RUNNING,
+        symbol="AAPL",
+        request_date=date(2024, 10, 14),
+        created_at=datetime(2024, 10, 15, tzinfo=UTC),
+    )
+    response: Response = client.get("/jobs/abc")
+    mock_job_queue.get.assert_called_with("abc")
+    assert response.json()["status"] == "running"
+
+
+def test_get_unknown_job() -> None:
+    mock_job_queue.get.return_value = None
+    response: Response = client.get("/jobs/unknown")
+    assert response.status_code == 404  # noqa: PLR2004
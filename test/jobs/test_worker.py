@@ -0,0 +1,68 @@
+import asyncio
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.jobs.worker import consume, process_job
+from app.models.dto.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.models.dto.stock_response import StockError
+from app.stocks.stock_service import StockService
+from test.constants import AAPL_EXPECTED_STOCK
+
+JOB = ScrapeJob(
+    id="abc",
+    status=ScrapeJobStatus.RUNNING,
+    symbol="AAPL",
+    request_date=date(2024, 10, 14),
+    created_at=datetime(2024, 10, 15, tzinfo=UTC),
+)
+
+
+class TestWorker:
+    @pytest.mark.asyncio
+    async def test_complete_job_with_stock_data(self) -> None:
+        job_queue = AsyncMock()
+        with (
+            patch("app.jobs.worker.sessionmanager", MagicMock()),
+            patch.object(StockService, "get_stock_by_symbol", return_value=AAPL_EXPECTED_STOCK) as mock_get_stock,
+        ):
+            await process_job(job_queue, "consumer", JOB)
+
+        mock_get_stock.assert_called_once_with("AAPL", date(2024, 10, 14))
+        job_queue.complete.assert_called_once_with("consumer", JOB, AAPL_EXPECTED_STOCK)
+
+    @pytest.mark.asyncio
+    async def test_fail_job_with_http_error(self) -> None:
+        job_queue = AsyncMock()
+        with (
+            patch("app.jobs.worker.sessionmanager", MagicMock()),
+            patch.object(
+                StockService, "get_stock_by_symbol", side_effect=HTTPException(status_code=404, detail="Not found")
+            ),
+        ):
+            await process_job(job_queue, "consumer", JOB)
+
+        job_queue.fail.assert_called_once_with("consumer", JOB, StockError(status_code=404, detail="Not found"))
+
+    @pytest.mark.asyncio
+    async def test_requeue_interrupted_job(self) -> None:
+        job_queue = AsyncMock()
+        job_queue.dequeue.return_value = JOB
+        started = asyncio.Event()
+
+        async def slow_process_job(*_: object) -> None:
+            started.set()
+            await asyncio.Event().wait()
+
+        with patch("app.jobs.worker.process_job", slow_process_job):
+            consumer = asyncio.ensure_future(consume(job_queue))
+            await started.wait()
+            consumer.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await consumer
+
+        consumer_id: str = job_queue.dequeue.call_args.args[0]
+        job_queue.heartbeat.assert_called_with(consumer_id)
+        job_queue.requeue.assert_called_once_with(consumer_id, JOB)
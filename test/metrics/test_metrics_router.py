@@ -0,0 +1,31 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from httpx import Response
+
+from app.metrics.metrics_router import router
+from app.repository.marketwatch_repository import fetch_tier_metrics
+from app.repository.page_snapshot_cache import stock_page_cache
+
+app = FastAPI()
+app.include_router(router)
+client = TestClient(app)
+
+
+def test_get_metrics() -> None:
+    fetch_tier_metrics.attempts.clear()
+    fetch_tier_metrics.hits.clear()
+    fetch_tier_metrics.record("http", hit=True)
+    fetch_tier_metrics.record("http", hit=False)
+
+    response: Response = client.get("/metrics")
+
+    assert response.json()["marketwatch_fetch_tiers"] == {"http": {"attempts": 2, "hits": 1, "hit_rate": 0.5}}
+
+
+def test_get_page_cache_metrics() -> None:
+    stock_page_cache.clear()
+
+    response: Response = client.get("/metrics")
+
+    assert response.json()["marketwatch_page_cache"]["entries"] == 0
+    assert response.json()["marketwatch_page_cache"]["max_bytes"] == stock_page_cache.max_bytes
@@ -0,0 +1,65 @@
+import argparse
+import importlib.util
+import os
+import time
+import tracemalloc
+
+from app.repository.marketwatch_extractor import FullPageExtractor, StockPageExtractorInterface, StrainedPageExtractor
+from app.repository.page_archive import PageArchive
+from test.constants import MARKETWATCH_HTML_DIR
+
+
+def get_extractors() -> dict[str, StockPageExtractorInterface]:
+    parsers: list[str] = ["html.parser"] + (["lxml"] if importlib.util.find_spec("lxml") is not None else [])
+    extractors: dict[str, StockPageExtractorInterface] = {}
+    for parser in parsers:
+        extractors[f"full/{parser}"] = FullPageExtractor(parser)
+        extractors[f"strained/{parser}"] = StrainedPageExtractor(parser)
+    return extractors
+
+
+def benchmark(extractor: StockPageExtractorInterface, page_html: str, rounds: int) -> tuple[float, float]:
+    """Returns the mean extraction time in milliseconds and the peak memory allocated by one extraction in MiB."""
+    start_time: float = time.perf_counter()
+    for _ in range(rounds):
+        extractor.extract("AAPL", page_html)
+    mean_time: float = (time.perf_counter() - start_time) / rounds * 1000
+
+    tracemalloc.start()
+    extractor.extract("AAPL", page_html)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return mean_time, peak_memory / 1024 / 1024
+
+
+def load_pages(archive_dir: str | None) -> dict[str, str]:
+    """Returns the pages to benchmark: the HTML fixtures, or the latest archived page of every symbol."""
+    if archive_dir is None:
+        with open(os.path.join(MARKETWATCH_HTML_DIR, "stock_page.html"), "r") as arq:
+            return {"stock_page.html": arq.read()}
+    archive = PageArchive(archive_dir)
+    return {
+        f"{stock_symbol} archive": archive.load(archive.snapshots(stock_symbol)[-1])
+        for stock_symbol in archive.symbols()
+    }
+
+
+def main() -> None:
+    """Micro-benchmark of the stock page extractors.
+
+    Run with `python -m test.repository.benchmark_marketwatch_extractor`.
+    """
+    arg_parser = argparse.ArgumentParser(description=main.__doc__)
+    arg_parser.add_argument("--rounds", type=int, default=20)
+    arg_parser.add_argument("--archive", help="Replay the pages of a page archive directory instead of the fixtures")
+    args: argparse.Namespace = arg_parser.parse_args()
+
+    for page_name, page_html in load_pages(args.archive).items():
+        print(f"{page_name} ({len(page_html) / 1024:.0f} KiB), {args.rounds} rounds")
+        for name, extractor in get_extractors().items():
+            mean_time, peak_memory = benchmark(extractor, page_html, args.rounds)
+            print(f"{name:<22} {mean_time:8.1f} ms {peak_memory:8.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main()
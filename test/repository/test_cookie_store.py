@@ -0,0 +1,84 @@
+from typing import Any
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from redis.exceptions import RedisError
+
+from app.app_config import Settings
+from app.models.dto.cookie_jar import CookieJar
+from app.repository.cookie_store import (
+    COOKIE_JAR_KEY,
+    MemoryCookieStore,
+    RedisCookieStore,
+    build_cookie_store,
+)
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.expires: dict[str, int] = {}
+
+    async def hgetall(self, key: str) -> dict[bytes, bytes]:
+        return self.hashes.get(key, {})
+
+    async def eval(self, script: str, numkeys: int, key: str, cookies: str, ttl: int) -> int:
+        cookie_jar: dict[bytes, bytes] = self.hashes.setdefault(key, {})
+        version = int(cookie_jar.get(b"version", b"0")) + 1
+        cookie_jar.update({b"version": str(version).encode(), b"cookies": cookies.encode()})
+        self.expires[key] = ttl
+        return version
+
+
+COOKIES: list[dict[str, Any]] = [{"name": "datadome", "value": "abc"}]
+
+
+class TestMemoryCookieStore:
+    @pytest.mark.asyncio
+    async def test_save_new_versions(self) -> None:
+        store = MemoryCookieStore(ttl=60)
+
+        assert await store.load() is None
+        assert await store.save(COOKIES) == 1
+        assert await store.save(COOKIES) == 2  # noqa: PLR2004
+        assert await store.load() == CookieJar(version=2, cookies=COOKIES)
+
+    @pytest.mark.asyncio
+    async def test_expire_cookies(self) -> None:
+        store = MemoryCookieStore(ttl=0)
+        await store.save(COOKIES)
+
+        assert await store.load() is None
+
+
+class TestRedisCookieStore:
+    @pytest.mark.asyncio
+    async def test_share_cookies_between_stores(self) -> None:
+        redis = FakeRedis()
+        first_worker = RedisCookieStore(ttl=60, redis=redis)
+        second_worker = RedisCookieStore(ttl=60, redis=redis)
+
+        assert await second_worker.load() is None
+        await first_worker.save([{"name": "datadome", "value": "old"}])
+        version: int = await second_worker.save(COOKIES)
+
+        assert await first_worker.load() == CookieJar(version=version, cookies=COOKIES)
+        assert redis.expires[COOKIE_JAR_KEY] == 60  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_treat_redis_failures_as_missing_cookies(self) -> None:
+        redis = AsyncMock()
+        redis.hgetall.side_effect = RedisError("down")
+        redis.eval.side_effect = RedisError("down")
+        store = RedisCookieStore(ttl=60, redis=redis)
+
+        assert await store.load() is None
+        assert await store.save(COOKIES) == 0
+
+
+def test_build_cookie_store_from_settings() -> None:
+    with patch("app.repository.cookie_store.cache_backend"):
+        assert isinstance(build_cookie_store(Settings(polygon_api_key="")), RedisCookieStore)
+    assert isinstance(
+        build_cookie_store(Settings(polygon_api_key="", cookie_store_backend="memory")), MemoryCookieStore
+    )
@@ -0,0 +1,76 @@
+import contextlib
+import datetime
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app_config import Settings
+from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
+from app.models.tables.daily_bars import DailyBars
+from app.repository.daily_bars_repository import DailyBarsRepository, SessionFactory
+from test.constants import AAPL_DAILY_OPEN_CLOSE_STOCK
+
+
+def session_factory(session: AsyncSession) -> SessionFactory:
+    @contextlib.asynccontextmanager
+    async def factory() -> AsyncIterator[AsyncSession]:
+        yield session
+
+    return factory
+
+
+class TestDailyBarsRepository:
+    @pytest.mark.asyncio
+    async def test_return_stored_daily_bar(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        mock_session.scalar = AsyncMock(
+            return_value=DailyBars(
+                **AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump(exclude={"date"}), date=datetime.date(2023, 10, 1)
+            )
+        )
+        repo = DailyBarsRepository(Settings(polygon_api_key=""), session_factory(mock_session))
+
+        daily_bar: DailyOpenCloseStock | None = await repo.get_daily_bar("AAPL", datetime.date(2023, 10, 1))
+
+        assert daily_bar.model_dump() == AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_return_none_for_missing_daily_bar(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        mock_session.scalar = AsyncMock(return_value=None)
+        repo = DailyBarsRepository(Settings(polygon_api_key=""), session_factory(mock_session))
+
+        assert await repo.get_daily_bar("AAPL", datetime.date(2023, 10, 1)) is None
+
+    @pytest.mark.asyncio
+    async def test_return_stored_daily_bars_in_range(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        mock_session.scalars = AsyncMock(
+            return_value=[
+                DailyBars(**AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump(exclude={"date"}), date=datetime.date(2023, 10, 1))
+            ]
+        )
+        repo = DailyBarsRepository(Settings(polygon_api_key=""), session_factory(mock_session))
+
+        daily_bars: list[DailyOpenCloseStock] = await repo.get_daily_bars(
+            "AAPL", datetime.date(2023, 9, 1), datetime.date(2023, 10, 1)
+        )
+
+        assert [daily_bar.model_dump() for daily_bar in daily_bars] == [AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump()]
+
+    @pytest.mark.asyncio
+    async def test_save_daily_bar_ignores_existing(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        repo = DailyBarsRepository(Settings(polygon_api_key=""), session_factory(mock_session))
+
+        await repo.save_daily_bar(AAPL_DAILY_OPEN_CLOSE_STOCK)
+
+        statement = mock_session.execute.call_args[0][0]
+        compiled = statement.compile(dialect=postgresql.dialect())
+        assert "ON CONFLICT (symbol, date) DO NOTHING" in str(compiled)
+        assert compiled.params["date"] == datetime.date(2023, 10, 1)
+        assert compiled.params["created_at"] is not None
+        mock_session.commit.assert_called_once()
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import pytest
+
+from app.app_config import Settings
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+from app.repository.marketwatch_extractor import (
+    FullPageExtractor,
+    StrainedPageExtractor,
+    build_stock_page_extractor,
+    get_fastest_parser,
+)
+from test.constants import MARKETWATCH_STOCK_PAGE_HTML
+
+
+@pytest.fixture(scope="module")
+def stock_page_html() -> str:
+    with open(MARKETWATCH_STOCK_PAGE_HTML, "r") as arq:
+        return arq.read()
+
+
+class TestStockPageExtractor:
+    def test_strained_extraction_matches_full_extraction(self, stock_page_html: str) -> None:
+        full_page: MarketWatchStockPage = FullPageExtractor("html.parser").extract("AAPL", stock_page_html)
+        strained_page: MarketWatchStockPage = StrainedPageExtractor("html.parser").extract("AAPL", stock_page_html)
+
+        assert strained_page.model_dump(exclude={"fetched_at"}) == full_page.model_dump(exclude={"fetched_at"})
+        assert strained_page.company_name == "Apple Inc."
+        assert strained_page.performance.one_year == 37.56  # noqa: PLR2004
+        assert strained_page.competitors[0].name == "Microsoft Corp."
+
+    def test_build_extractor_from_settings(self) -> None:
+        full_extractor = build_stock_page_extractor(
+            Settings(polygon_api_key="", marketwatch_extractor="full", marketwatch_html_parser="html.parser")
+        )
+        default_extractor = build_stock_page_extractor(Settings(polygon_api_key=""))
+
+        assert type(full_extractor) is FullPageExtractor
+        assert full_extractor.parser == "html.parser"
+        assert type(default_extractor) is StrainedPageExtractor
+        assert default_extractor.parser == get_fastest_parser()
+
+    def test_fall_back_to_builtin_parser_without_lxml(self) -> None:
+        get_fastest_parser.cache_clear()
+        with patch("app.repository.marketwatch_extractor.importlib.util.find_spec", return_value=None):
+            assert get_fastest_parser() == "html.parser"
+        get_fastest_parser.cache_clear()
@@ -1,26 +1,60 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
 from typing import Any, Generator
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
-from bs4 import BeautifulSoup
+from fastapi import HTTPException
 from pytest import FixtureRequest
 from selenium import webdriver
 from selenium.webdriver.remote.webelement import WebElement
+from tenacity import wait_none
 
 from app.app_config import Settings
+from app.executor import BoundedExecutor
+from app.models.dto.cookie_jar import CookieJar
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
 from app.models.dto.stock_response import CompetitorData, PerformanceData
-from app.repository.marketwatch_repository import MarketWatchRepository
+from app.repository.cookie_store import MemoryCookieStore
+from app.repository.marketwatch_repository import (
+    CatchByBotDetectionError,
+    MarketWatchRepository,
+    fetch_tier_metrics,
+    marketwatch_client_manager,
+    seed_stock_page_cache,
+)
+from app.repository.page_archive import PageArchive
+from app.repository.page_snapshot_cache import stock_page_cache
+from app.repository.webdriver_pool import WebDriverPool
 
 
 @pytest.fixture(params=["stock_page.html"], scope="function")
 def mock_get_stock_page_html(request: FixtureRequest) -> Generator[MagicMock | AsyncMock, Any, None]:
     filename = request.param
+    stock_page_cache.clear()
     with patch.object(MarketWatchRepository, "_async_get_stock_page_html") as mock:
         with open(f"./test/repository/marketwatch_html/{filename}", "r") as arq:
-            mock.return_value = BeautifulSoup(arq, "html.parser")
+            mock.return_value = arq.read()
         yield mock
 
 
+@pytest.fixture(params=["stock_page.html"], scope="function")
+def mock_http_client(request: FixtureRequest) -> Generator[list[httpx.Request], Any, None]:
+    with open(f"./test/repository/marketwatch_html/{request.param}", "r") as arq:
+        html = arq.read()
+    requests: list[httpx.Request] = []
+
+    def handler(http_request: httpx.Request) -> httpx.Response:
+        requests.append(http_request)
+        return httpx.Response(200, text=html)
+
+    marketwatch_client_manager.start(transport=httpx.MockTransport(handler))
+    yield requests
+    asyncio.run(marketwatch_client_manager.close())
+
+
 class TestMarketWatchRepository:
     @pytest.mark.asyncio
     async def test_get_stock_performance_by_symbol_success(self, mock_get_stock_page_html: AsyncMock) -> None:
@@ -54,6 +88,167 @@ class TestMarketWatchRepository:
         result = await repo.get_company_name_by_symbol("AAPL")
         assert result == "Apple Inc."
 
+    @pytest.mark.asyncio
+    async def test_get_stock_page_fetches_once_for_all_extractors(self, mock_get_stock_page_html: AsyncMock) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        await repo.get_stock_performance_by_symbol("AAPL")
+        await repo.get_stock_competitors_by_symbol("AAPL")
+        await repo.get_company_name_by_symbol("AAPL")
+        mock_get_stock_page_html.assert_called_once_with("AAPL")
+
+    @pytest.mark.asyncio
+    async def test_get_stock_page_shared_across_instances(self, mock_get_stock_page_html: AsyncMock) -> None:
+        settings = Settings(polygon_api_key="")
+        first: MarketWatchStockPage = await MarketWatchRepository(settings).get_stock_page("AAPL")
+        second: MarketWatchStockPage = await MarketWatchRepository(settings).get_stock_page("AAPL")
+        assert first is second
+        mock_get_stock_page_html.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_get_stock_page_refetch_when_stale(self, mock_get_stock_page_html: AsyncMock) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key="", marketwatch_page_freshness_time=0))
+        await repo.get_stock_page("AAPL")
+        await repo.get_stock_page("AAPL")
+        expected_calls = 2
+        assert mock_get_stock_page_html.call_count == expected_calls
+
+    @pytest.mark.asyncio
+    async def test_archived_pages_seed_the_cache_after_restart(
+        self, mock_get_stock_page_html: AsyncMock, tmp_path: Path
+    ) -> None:
+        settings = Settings(polygon_api_key="", page_archive_enabled=True)
+        with patch("app.repository.marketwatch_repository.page_archive", PageArchive(str(tmp_path), codec="gzip")):
+            fetched: MarketWatchStockPage = await MarketWatchRepository(settings).get_stock_page("AAPL")
+            stock_page_cache.clear()
+            seeded: int = await seed_stock_page_cache(settings)
+            restored: MarketWatchStockPage = await MarketWatchRepository(settings).get_stock_page("AAPL")
+
+        assert seeded == 1
+        assert restored.model_dump(exclude={"fetched_at"}) == fetched.model_dump(exclude={"fetched_at"})
+        mock_get_stock_page_html.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_seed_pages_within_the_seed_window(self, mock_get_stock_page_html: AsyncMock, tmp_path: Path) -> None:
+        settings = Settings(polygon_api_key="", page_archive_enabled=True, page_archive_seed_max_age=3600)
+        archive = PageArchive(str(tmp_path))
+        now: datetime = datetime.now(timezone.utc)
+        archive.save("AAPL", mock_get_stock_page_html.return_value, now - timedelta(minutes=30))
+        archive.save("MSFT", mock_get_stock_page_html.return_value, now - timedelta(hours=2))
+
+        with patch("app.repository.marketwatch_repository.page_archive", archive):
+            seeded: int = await seed_stock_page_cache(settings)
+            await MarketWatchRepository(settings).get_stock_page("AAPL")
+
+        assert seeded == 1
+        mock_get_stock_page_html.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_stock_page_concurrent_callers_share_fetch(self, mock_get_stock_page_html: AsyncMock) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key="", marketwatch_page_freshness_time=0))
+        pages: list[MarketWatchStockPage] = await asyncio.gather(*(repo.get_stock_page("AAPL") for _ in range(3)))
+        assert all(page is pages[0] for page in pages)
+        mock_get_stock_page_html.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_browser_get_stock_page_html_retries_on_new_session(self) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        stock_page = "<html></html>"
+        with (
+            patch(
+                "app.repository.marketwatch_repository.webdriver_pool", WebDriverPool(size=1, max_uses=10, max_age=60)
+            ),
+            patch.object(MarketWatchRepository._browser_get_stock_page_html.retry, "wait", wait_none()),
+            patch.object(MarketWatchRepository, "_create_webdriver", side_effect=MagicMock) as create,
+            patch.object(
+                MarketWatchRepository, "_get_stock_page_html", side_effect=[CatchByBotDetectionError(), stock_page]
+            ) as get_html,
+        ):
+            result = await repo._browser_get_stock_page_html("AAPL")
+
+        assert result is stock_page
+        expected_sessions = 2
+        assert create.call_count == expected_sessions
+        first_driver, second_driver = (call.args[0] for call in get_html.call_args_list)
+        assert first_driver is not second_driver
+        first_driver.quit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_browser_get_stock_page_html_paces_scrapes(self) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        stock_page = "<html></html>"
+        with (
+            patch(
+                "app.repository.marketwatch_repository.webdriver_pool", WebDriverPool(size=1, max_uses=10, max_age=60)
+            ),
+            patch("app.repository.marketwatch_repository.scrape_pacer") as pacer,
+            patch.object(MarketWatchRepository, "_create_webdriver", side_effect=MagicMock),
+            patch.object(
+                MarketWatchRepository, "_get_stock_page_html", side_effect=[CatchByBotDetectionError(), stock_page]
+            ),
+        ):
+            pacer.wait = AsyncMock()
+            await repo._browser_get_stock_page_html("AAPL")
+
+        expected_attempts = 2
+        assert pacer.wait.call_count == expected_attempts
+        pacer.wait.assert_called_with("www.marketwatch.com")
+        assert [call.kwargs["captcha"] for call in pacer.record.call_args_list] == [True, False]
+
+    def test_wait_for_page_tolerates_timeout(self) -> None:
+        driver = MagicMock(spec=webdriver.Chrome)
+        driver.execute_script.return_value = False
+        repo = MarketWatchRepository(Settings(polygon_api_key="", marketwatch_page_ready_timeout=0.01))
+
+        repo._wait_for_page(driver)
+
+        driver.execute_script.assert_called()
+
+    @pytest.mark.asyncio
+    async def test_browser_get_stock_page_html_sheds_load_when_saturated(self) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        saturated_executor = BoundedExecutor(max_workers=1, max_queue_depth=0, queue_timeout=1)
+        with patch("app.repository.marketwatch_repository.scraper_executor", saturated_executor):
+            async with saturated_executor.admit():
+                with pytest.raises(HTTPException) as excinfo:
+                    await repo._browser_get_stock_page_html("AAPL")
+
+        error_status_code = 503
+        assert excinfo.value.status_code == error_status_code
+
+    @pytest.mark.asyncio
+    async def test_async_get_stock_page_html_served_by_http_tier(
+        self, mock_http_client: list[httpx.Request], memory_cookie_store: MemoryCookieStore
+    ) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        await memory_cookie_store.save([{"name": "datadome", "value": "abc"}])
+        fetch_tier_metrics.attempts.clear()
+        with patch.object(MarketWatchRepository, "_browser_get_stock_page_html") as browser:
+            result: str = await repo._async_get_stock_page_html("AAPL")
+
+        assert '<h1 class="company__name">Apple Inc.</h1>' in result
+        assert mock_http_client[0].headers["Cookie"] == "datadome=abc"
+        browser.assert_not_called()
+        assert fetch_tier_metrics.attempts == {"http": 1}
+
+    @pytest.mark.parametrize("mock_http_client", ["bot_detected.html"], indirect=True)
+    @pytest.mark.asyncio
+    async def test_async_get_stock_page_html_escalates_captcha_to_browser(
+        self, mock_http_client: list[httpx.Request]
+    ) -> None:
+        repo = MarketWatchRepository(Settings(polygon_api_key=""))
+        stock_page = "<html></html>"
+        fetch_tier_metrics.attempts.clear()
+        fetch_tier_metrics.hits.clear()
+        with patch.object(MarketWatchRepository, "_browser_get_stock_page_html", return_value=stock_page) as browser:
+            result: str = await repo._async_get_stock_page_html("AAPL")
+
+        assert result is stock_page
+        browser.assert_called_once_with("AAPL")
+        assert fetch_tier_metrics.snapshot() == {
+            "http": {"attempts": 1, "hits": 0, "hit_rate": 0.0},
+            "browser": {"attempts": 1, "hits": 1, "hit_rate": 1.0},
+        }
+
     @pytest.mark.asyncio
     async def test_returns_true_when_captcha_present(self) -> None:
         driver = MagicMock()
@@ -83,18 +278,47 @@ class TestMarketWatchRepository:
         mock_driver = MagicMock()
         mock_driver.get = MagicMock()
         mock_driver.add_cookie = MagicMock()
-        MarketWatchRepository.cookies = [{"name": "test", "value": "123"}]
         repo = MarketWatchRepository(Settings(polygon_api_key=""))
-        repo._set_cookies(mock_driver)
+        repo._set_cookies(mock_driver, CookieJar(version=1, cookies=[{"name": "test", "value": "123"}]))
+        repo._set_cookies(mock_driver, CookieJar(version=1, cookies=[{"name": "test", "value": "123"}]))
         mock_driver.add_cookie.assert_called_once_with({"name": "test", "value": "123"})
 
     @pytest.mark.asyncio
-    async def test_save_cookies_from_valid_driver(self) -> None:
+    async def test_save_cookies_from_valid_driver(self, memory_cookie_store: MemoryCookieStore) -> None:
+        mock_driver = MagicMock()
+        mock_driver.get_cookies.return_value = [{"name": "datadome", "value": "new_value"}]
+        repository = MarketWatchRepository(Settings(polygon_api_key=""))
+        await memory_cookie_store.save([{"name": "datadome", "value": "old_value"}])
+
+        await repository._save_cookies(mock_driver, await repository._load_cookies())
+
+        cookie_jar: CookieJar = await repository._load_cookies()
+        assert cookie_jar == CookieJar(version=2, cookies=[{"name": "datadome", "value": "new_value"}])
+        repository._set_cookies(mock_driver, cookie_jar)
+        mock_driver.add_cookie.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_skip_saving_cookies_with_unchanged_datadome(self, memory_cookie_store: MemoryCookieStore) -> None:
         mock_driver = MagicMock()
-        mock_driver.get_cookies.return_value = [{"name": "test_cookie", "value": "test_value"}]
+        mock_driver.get_cookies.return_value = [
+            {"name": "datadome", "value": "abc"},
+            {"name": "analytics", "value": "changes-on-every-load"},
+        ]
         repository = MarketWatchRepository(Settings(polygon_api_key=""))
-        repository._save_cookies(mock_driver)
-        assert MarketWatchRepository.cookies == [{"name": "test_cookie", "value": "test_value"}]
+        await memory_cookie_store.save([{"name": "datadome", "value": "abc"}])
+        loaded_cookie_jar: CookieJar = await repository._load_cookies()
+
+        await repository._save_cookies(mock_driver, loaded_cookie_jar)
+
+        assert await repository._load_cookies() == loaded_cookie_jar
+        repository._set_cookies(mock_driver, loaded_cookie_jar)
+        mock_driver.add_cookie.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_load_initial_cookies_when_store_is_empty(self) -> None:
+        cookie_jar: CookieJar = await MarketWatchRepository(Settings(polygon_api_key=""))._load_cookies()
+        assert cookie_jar.version == 0
+        assert cookie_jar.cookies[0]["name"] == "datadome"
 
     @pytest.mark.asyncio
     async def test_headless_mode_disabled(self) -> None:
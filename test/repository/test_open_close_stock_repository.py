@@ -1,13 +1,16 @@
 from datetime import date
 from typing import Any
-from unittest.mock import AsyncMock, MagicMock
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import httpx
 import pytest
 from fastapi import HTTPException
+from sqlalchemy.exc import OperationalError
 
 from app.app_config import Settings
+from app.models.dto.daily_bars_history import DailyBar
 from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
+from app.repository.daily_bars_repository import DailyBarsRepositoryInterface
 from app.repository.open_close_stock_repository import OpenCloseStockRepository
 from test.constants import (
     AAPL_DAILY_OPEN_CLOSE_STOCK,
@@ -79,3 +82,150 @@ class TestOpenCloseStockRepository:
             await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
         error_status_code = 500
         assert excinfo.value.status_code == error_status_code
+
+    @pytest.mark.asyncio
+    async def test_use_injected_client(self) -> None:
+        requests: list[httpx.Request] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            return httpx.Response(200, json=AAPL_DAILY_OPEN_CLOSE_STOCK_DATA)
+
+        settings = Settings(polygon_api_key="test_key", polygon_base_url="https://polygon.test")
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            repository = OpenCloseStockRepository(settings, client=client)
+            result: DailyOpenCloseStock = await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
+
+        assert result.model_dump() == AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump()
+        assert requests[0].url.path == "/v1/open-close/AAPL/2023-10-01"
+
+    @pytest.mark.asyncio
+    async def test_serve_past_bar_from_store(self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]) -> None:
+        daily_bars_repository = AsyncMock(spec=DailyBarsRepositoryInterface)
+        daily_bars_repository.get_daily_bar.return_value = AAPL_DAILY_OPEN_CLOSE_STOCK
+        repository = OpenCloseStockRepository(
+            Settings(polygon_api_key="test_key"), daily_bars_repository=daily_bars_repository
+        )
+
+        result: DailyOpenCloseStock = await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
+
+        assert result is AAPL_DAILY_OPEN_CLOSE_STOCK
+        mock_httpx_async_client["get"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_past_bar_fetched_upstream(
+        self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        daily_bars_repository = AsyncMock(spec=DailyBarsRepositoryInterface)
+        daily_bars_repository.get_daily_bar.return_value = None
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = AAPL_DAILY_OPEN_CLOSE_STOCK_DATA
+        mock_httpx_async_client["get"].return_value = mock_response
+        repository = OpenCloseStockRepository(
+            Settings(polygon_api_key="test_key"), daily_bars_repository=daily_bars_repository
+        )
+
+        result: DailyOpenCloseStock = await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
+
+        daily_bars_repository.save_daily_bar.assert_called_once_with(result)
+
+    @pytest.mark.asyncio
+    async def test_current_market_day_bypasses_store(
+        self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        daily_bars_repository = AsyncMock(spec=DailyBarsRepositoryInterface)
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = AAPL_DAILY_OPEN_CLOSE_STOCK_DATA
+        mock_httpx_async_client["get"].return_value = mock_response
+        repository = OpenCloseStockRepository(
+            Settings(polygon_api_key="test_key"), daily_bars_repository=daily_bars_repository
+        )
+
+        with patch("app.repository.open_close_stock_repository.is_session_final", return_value=False):
+            await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
+
+        daily_bars_repository.get_daily_bar.assert_not_called()
+        daily_bars_repository.save_daily_bar.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_store_failure_falls_back_to_upstream(
+        self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        daily_bars_repository = AsyncMock(spec=DailyBarsRepositoryInterface)
+        daily_bars_repository.get_daily_bar.side_effect = OperationalError("SELECT", {}, Exception("down"))
+        daily_bars_repository.save_daily_bar.side_effect = OperationalError("INSERT", {}, Exception("down"))
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = AAPL_DAILY_OPEN_CLOSE_STOCK_DATA
+        mock_httpx_async_client["get"].return_value = mock_response
+        repository = OpenCloseStockRepository(
+            Settings(polygon_api_key="test_key"), daily_bars_repository=daily_bars_repository
+        )
+
+        result: DailyOpenCloseStock = await repository.get_daily_open_close_sotck("AAPL", date(2023, 10, 1))
+
+        assert result.model_dump() == AAPL_DAILY_OPEN_CLOSE_STOCK.model_dump()
+
+    @pytest.mark.asyncio
+    async def test_retrieve_daily_bars_in_one_request(
+        self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        repository = OpenCloseStockRepository(Settings(polygon_api_key="test_key"))
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {
+            "status": "OK",
+            "resultsCount": 2,
+            "results": [
+                {"t": 1696219200000, "o": 150.0, "h": 155.0, "l": 149.0, "c": 154.0, "v": 1000000, "n": 10},
+                {"t": 1696305600000, "o": 154.0, "h": 156.0, "l": 153.0, "c": 155.0, "v": 2000000, "n": 20},
+            ],
+        }
+        mock_httpx_async_client["get"].return_value = mock_response
+
+        result: list[DailyBar] = await repository.get_daily_bars("AAPL", date(2023, 10, 2), date(2023, 10, 3))
+
+        assert [bar.model_dump() for bar in result] == [
+            {"date": "2023-10-02", "open": 150.0, "high": 155.0, "low": 149.0, "close": 154.0, "volume": 1000000},
+            {"date": "2023-10-03", "open": 154.0, "high": 156.0, "low": 153.0, "close": 155.0, "volume": 2000000},
+        ]
+        mock_httpx_async_client["get"].assert_called_once()
+        assert (
+            "/v2/aggs/ticker/AAPL/range/1/day/2023-10-02/2023-10-03" in mock_httpx_async_client["get"].call_args[0][0]
+        )
+
+    @pytest.mark.asyncio
+    async def test_retrieve_no_daily_bars(self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]) -> None:
+        repository = OpenCloseStockRepository(Settings(polygon_api_key="test_key"))
+        mock_response = MagicMock(status_code=200)
+        mock_response.json.return_value = {"status": "OK", "resultsCount": 0}
+        mock_httpx_async_client["get"].return_value = mock_response
+
+        assert await repository.get_daily_bars("AAPL", date(2023, 10, 7), date(2023, 10, 8)) == []
+
+    @pytest.mark.asyncio
+    async def test_daily_bars_unexpected_error(self, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]) -> None:
+        repository = OpenCloseStockRepository(Settings(polygon_api_key="test_key"))
+        mock_response = MagicMock(spec=httpx.Response, status_code=403)
+        mock_response.json.return_value = {}
+        mock_httpx_async_client["get"].return_value = mock_response
+        with pytest.raises(HTTPException) as excinfo:
+            await repository.get_daily_bars("AAPL", date(2023, 10, 2), date(2023, 10, 3))
+        error_status_code = 500
+        assert excinfo.value.status_code == error_status_code
+
+    @pytest.mark.parametrize(
+        "status_code, expected",
+        [
+            pytest.param(200, True, id="known"),
+            pytest.param(404, False, id="unknown"),
+            pytest.param(500, True, id="upstream-failure"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_is_known_symbol(
+        self, status_code: int, expected: bool, mock_httpx_async_client: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        mock_httpx_async_client["get"].return_value = MagicMock(status_code=status_code)
+        repository = OpenCloseStockRepository(Settings(polygon_api_key="test_key"))
+
+        assert await repository.is_known_symbol("AAPL") is expected
+        assert "/v3/reference/tickers/AAPL" in mock_httpx_async_client["get"].call_args.args[0]
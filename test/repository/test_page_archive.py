@@ -0,0 +1,115 @@
+import gzip
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from app.models.dto.archived_page import ArchivedPage
+from app.repository.page_archive import PageArchive
+
+PAGE_HTML = '<html><h1 class="company__name">Apple Inc.</h1></html>'
+
+
+class TestPageArchive:
+    def test_save_and_load_page(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+
+        archived_page: ArchivedPage = archive.save("AAPL", PAGE_HTML, datetime.now(timezone.utc))
+
+        assert archive.load(archived_page) == PAGE_HTML
+        blob_path: Path = tmp_path / "blobs" / archived_page.digest[:2] / f"{archived_page.digest}.html.gz"
+        assert gzip.decompress(blob_path.read_bytes()).decode() == PAGE_HTML
+
+    def test_store_identical_pages_once(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+        fetched_at = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+        first: ArchivedPage = archive.save("AAPL", PAGE_HTML, fetched_at)
+        second: ArchivedPage = archive.save("AAPL", PAGE_HTML, fetched_at + timedelta(minutes=1))
+
+        assert first.digest == second.digest
+        assert len(list((tmp_path / "blobs").rglob("*.html.gz"))) == 1
+        assert archive.snapshots("AAPL") == [first, second]
+        assert archive.symbols() == ["AAPL"]
+
+    def test_latest_skips_old_and_unreadable_pages(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+        now: datetime = datetime.now(timezone.utc)
+        archive.save("AAPL", "old", now - timedelta(hours=1))
+        archive.save("AAPL", PAGE_HTML, now)
+        archive.save("MSFT", "stale", now - timedelta(hours=1))
+        broken: ArchivedPage = archive.save("GOOG", "broken", now)
+        (tmp_path / "blobs" / broken.digest[:2] / f"{broken.digest}.html.gz").write_bytes(b"not gzip")
+
+        latest: list[tuple[ArchivedPage, str]] = list(archive.latest(max_age=60))
+
+        assert [(archived_page.symbol, page_html) for archived_page, page_html in latest] == [("AAPL", PAGE_HTML)]
+
+    def test_normalize_symbol_case(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+
+        archived_page: ArchivedPage = archive.save("aapl", PAGE_HTML, datetime.now(timezone.utc))
+
+        assert archived_page.symbol == "AAPL"
+        assert archive.snapshots("AAPL") == archive.snapshots("aapl") == [archived_page]
+        assert archive.symbols() == ["AAPL"]
+
+    @pytest.mark.parametrize("stock_symbol", ["../../x", "..", "AAPL/../../x", "", "TOOLONGSYMBOL"])
+    def test_reject_invalid_symbol(self, tmp_path: Path, stock_symbol: str) -> None:
+        archive = PageArchive(str(tmp_path / "archive"), codec="gzip")
+
+        with pytest.raises(ValueError):
+            archive.save(stock_symbol, PAGE_HTML, datetime.now(timezone.utc))
+        with pytest.raises(ValueError):
+            archive.snapshots(stock_symbol)
+
+        assert list(tmp_path.rglob("*.json")) == []
+
+    def test_save_pages_from_concurrent_threads(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+        pages: list[str] = [PAGE_HTML * index for index in range(1, 33)]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            archived_pages: list[ArchivedPage] = list(
+                executor.map(lambda page_html: archive.save("AAPL", page_html, datetime.now(timezone.utc)), pages)
+            )
+
+        assert [archive.load(archived_page) for archived_page in archived_pages] == pages
+
+    def test_prune_old_snapshots_and_unreferenced_blobs(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip")
+        now: datetime = datetime.now(timezone.utc)
+        archive.save("AAPL", "expired", now - timedelta(days=2))
+        archive.save("AAPL", PAGE_HTML, now - timedelta(days=2, minutes=-1))
+        kept: ArchivedPage = archive.save("AAPL", PAGE_HTML, now)
+        two_days_ago: float = (now - timedelta(days=2)).timestamp()
+        for blob_path in (tmp_path / "blobs").rglob("*.html.gz"):
+            os.utime(blob_path, (two_days_ago, two_days_ago))
+        # A blob written by a save that has not written its snapshot yet.
+        archive._blob_path("f" * 64, archive.codec).parent.mkdir(parents=True)
+        archive._blob_path("f" * 64, archive.codec).write_bytes(gzip.compress(b"in flight"))
+
+        deleted: int = archive.prune(max_age=86400)
+
+        assert deleted == 3  # noqa: PLR2004
+        assert archive.snapshots("AAPL") == [kept]
+        assert archive.load(kept) == PAGE_HTML
+        assert archive._blob_path("f" * 64, archive.codec).exists()
+
+    def test_save_prunes_in_the_background_once_per_interval(self, tmp_path: Path) -> None:
+        archive = PageArchive(str(tmp_path), codec="gzip", max_age=3600)
+        now: datetime = datetime.now(timezone.utc)
+        with patch("app.repository.page_archive.threading.Thread") as mock_thread:
+            archive.save("AAPL", "expired", now - timedelta(hours=2))
+            recent: ArchivedPage = archive.save("AAPL", PAGE_HTML, now)
+
+        mock_thread.assert_called_once()
+        archive._prune_in_background(*mock_thread.call_args.kwargs["args"])
+        assert archive.snapshots("AAPL") == [recent]
+
+    def test_reject_unavailable_codec(self, tmp_path: Path) -> None:
+        with pytest.raises(ValueError):
+            PageArchive(str(tmp_path), codec="brotli")
@@ -0,0 +1,70 @@
+from unittest.mock import patch
+
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+from app.repository.page_snapshot_cache import PageSnapshotCache
+from test.constants import AAPL_MARKETWATCH_STOCK_PAGE
+
+SNAPSHOT_SIZE: int = len(AAPL_MARKETWATCH_STOCK_PAGE.model_dump_json())
+
+
+def stock_page(stock_symbol: str) -> MarketWatchStockPage:
+    return AAPL_MARKETWATCH_STOCK_PAGE.model_copy(update={"symbol": stock_symbol})
+
+
+class TestPageSnapshotCache:
+    def test_return_stored_snapshot(self) -> None:
+        cache = PageSnapshotCache(max_bytes=SNAPSHOT_SIZE * 4, ttl=60)
+
+        cache.put("AAPL", AAPL_MARKETWATCH_STOCK_PAGE)
+
+        assert cache.get("AAPL") is AAPL_MARKETWATCH_STOCK_PAGE
+        assert cache.get("MSFT") is None
+        assert cache.snapshot()["hits"] == 1
+        assert cache.snapshot()["misses"] == 1
+        assert cache.size_bytes == SNAPSHOT_SIZE
+
+    def test_evict_least_recently_used_beyond_byte_budget(self) -> None:
+        cache = PageSnapshotCache(max_bytes=SNAPSHOT_SIZE * 2, ttl=60)
+
+        cache.put("AAPL", stock_page("AAPL"))
+        cache.put("MSFT", stock_page("MSFT"))
+        cache.get("AAPL")
+        cache.put("GOOG", stock_page("GOOG"))
+
+        assert cache.get("MSFT") is None
+        assert cache.get("AAPL") is not None
+        assert cache.get("GOOG") is not None
+        assert len(cache) == 2  # noqa: PLR2004
+        assert cache.size_bytes <= cache.max_bytes
+        assert cache.evictions == 1
+
+    def test_replace_snapshot_of_the_same_symbol(self) -> None:
+        cache = PageSnapshotCache(max_bytes=SNAPSHOT_SIZE * 2, ttl=60)
+
+        cache.put("AAPL", stock_page("AAPL"))
+        cache.put("AAPL", stock_page("AAPL"))
+
+        assert len(cache) == 1
+        assert cache.size_bytes == SNAPSHOT_SIZE
+        assert cache.evictions == 0
+
+    def test_reject_snapshot_larger_than_budget(self) -> None:
+        cache = PageSnapshotCache(max_bytes=SNAPSHOT_SIZE - 1, ttl=60)
+
+        cache.put("AAPL", AAPL_MARKETWATCH_STOCK_PAGE)
+
+        assert cache.get("AAPL") is None
+        assert cache.rejections == 1
+        assert cache.size_bytes == 0
+
+    def test_expire_snapshot_after_ttl(self) -> None:
+        cache = PageSnapshotCache(max_bytes=SNAPSHOT_SIZE * 2, ttl=60)
+        with patch("app.repository.page_snapshot_cache.time.monotonic", return_value=1000.0):
+            cache.put("AAPL", AAPL_MARKETWATCH_STOCK_PAGE)
+
+        with patch("app.repository.page_snapshot_cache.time.monotonic", return_value=1030.0):
+            assert cache.get("AAPL") is not None
+            assert cache.get("AAPL", ttl=10) is None
+
+        assert cache.expirations == 1
+        assert cache.size_bytes == 0
@@ -0,0 +1,120 @@
+import asyncio
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from sqlalchemy.exc import DataError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.app_config import Settings
+from app.repository.purchase_buffer import PurchaseBuffer
+from app.repository.purchases_repository import PurchasesRepository
+
+
+@asynccontextmanager
+async def session_factory() -> AsyncIterator[AsyncSession]:
+    yield MagicMock(spec=AsyncSession)
+
+
+def build_buffer(**settings_kwargs: Any) -> PurchaseBuffer:
+    buffer_settings: dict[str, Any] = {
+        "purchase_group_commit_enabled": True,
+        "purchase_group_commit_max_batch": 3,
+        "purchase_group_commit_interval": 0.05,
+    }
+    return PurchaseBuffer(
+        Settings(polygon_api_key="", **{**buffer_settings, **settings_kwargs}), session_factory=session_factory
+    )
+
+
+class TestPurchaseBuffer:
+    @pytest.mark.asyncio
+    async def test_commit_concurrent_purchases_together(self) -> None:
+        buffer: PurchaseBuffer = build_buffer()
+        buffer.start()
+        with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+            await asyncio.gather(
+                *(buffer.purchase_stock(symbol, amount) for symbol, amount in [("AAPL", 1), ("MSFT", 2), ("AAPL", 3)])
+            )
+            await buffer.close()
+
+        mock_purchase_stocks.assert_called_once_with([("AAPL", 1), ("MSFT", 2), ("AAPL", 3)])
+        assert buffer.snapshot()["mean_batch_size"] == 3  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_split_batches_beyond_max_batch(self) -> None:
+        buffer: PurchaseBuffer = build_buffer(purchase_group_commit_max_batch=2)
+        buffer.start()
+        with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+            await asyncio.gather(*(buffer.purchase_stock("AAPL", amount) for amount in range(5)))
+            await buffer.close()
+
+        assert [len(call.args[0]) for call in mock_purchase_stocks.call_args_list] == [2, 2, 1]
+
+    @pytest.mark.asyncio
+    async def test_flush_a_partial_batch_after_the_interval(self) -> None:
+        buffer: PurchaseBuffer = build_buffer(purchase_group_commit_interval=0.01)
+        buffer.start()
+        with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+            await asyncio.wait_for(buffer.purchase_stock("AAPL", 1), timeout=1)
+            await buffer.close()
+
+        mock_purchase_stocks.assert_called_once_with([("AAPL", 1)])
+
+    @pytest.mark.asyncio
+    async def test_fail_every_purchase_of_a_failed_batch(self) -> None:
+        buffer: PurchaseBuffer = build_buffer()
+        buffer.start()
+        with patch.object(
+            PurchasesRepository, "purchase_stocks", AsyncMock(side_effect=ConnectionError("connection lost"))
+        ) as mock_purchase_stocks:
+            results: list[BaseException | None] = await asyncio.gather(
+                buffer.purchase_stock("AAPL", 1), buffer.purchase_stock("MSFT", 2), return_exceptions=True
+            )
+            await buffer.close()
+
+        assert [str(result) for result in results] == ["connection lost", "connection lost"]
+        # The batch may have committed before the connection was lost, so it is never retried.
+        mock_purchase_stocks.assert_called_once()
+        assert buffer.failed_flushes == 1
+
+    @pytest.mark.asyncio
+    async def test_fail_only_the_poisoned_purchase_of_a_batch(self) -> None:
+        poisoned_error = DataError("INSERT INTO purchases", {}, ValueError("amount must be positive"))
+
+        async def purchase_stocks(purchases: list[tuple[str, int]]) -> None:
+            if ("POISON", 0) in purchases:
+                raise poisoned_error
+
+        buffer: PurchaseBuffer = build_buffer()
+        buffer.start()
+        with patch.object(PurchasesRepository, "purchase_stocks", side_effect=purchase_stocks) as mock_purchase_stocks:
+            results: list[BaseException | None] = await asyncio.gather(
+                buffer.purchase_stock("AAPL", 1),
+                buffer.purchase_stock("POISON", 0),
+                buffer.purchase_stock("MSFT", 2),
+                return_exceptions=True,
+            )
+            await buffer.close()
+
+        assert results[0] is None
+        assert results[1] is poisoned_error
+        assert results[2] is None
+        assert [call.args[0] for call in mock_purchase_stocks.call_args_list] == [
+            [("AAPL", 1), ("POISON", 0), ("MSFT", 2)],
+            [("AAPL", 1)],
+            [("POISON", 0)],
+            [("MSFT", 2)],
+        ]
+        assert buffer.snapshot()["purchases"] == 2  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_disabled_buffer_does_not_run(self) -> None:
+        buffer: PurchaseBuffer = build_buffer(purchase_group_commit_enabled=False)
+        buffer.start()
+
+        assert not buffer.running
+        with pytest.raises(RuntimeError):
+            await buffer.purchase_stock("AAPL", 1)
@@ -1,9 +1,12 @@
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.schema import CreateTable
 
 from app.app_config import Settings
+from app.models.tables.purchase_totals import PurchaseTotals
 from app.models.tables.purchases import Purchases
 from app.repository.purchases_repository import PurchasesRepository
 
@@ -24,6 +27,49 @@ class TestPurchasesRepository:
         assert added_purchase.amount == amount
         mock_session.commit.assert_called_once()
 
+    @pytest.mark.asyncio
+    async def test_add_purchase_to_symbol_total_in_the_same_transaction(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        repo = PurchasesRepository(Settings(polygon_api_key=""), mock_session)
+
+        await repo.purchase_stock(company_code="AAPL", amount=100)
+
+        upsert_sql = str(mock_session.execute.call_args[0][0].compile(dialect=postgresql.dialect()))
+        assert "INSERT INTO purchase_totals" in upsert_sql
+        assert "ON CONFLICT (company_code) DO UPDATE" in upsert_sql
+        assert "total_amount = (purchase_totals.total_amount + excluded.total_amount)" in upsert_sql
+        assert mock_session.method_calls[-1][0] == "commit"
+
+    @pytest.mark.asyncio
+    async def test_add_purchases_and_totals_in_one_transaction(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        repo = PurchasesRepository(Settings(polygon_api_key=""), mock_session)
+
+        with patch("app.repository.purchases_repository.PURCHASE_TOTALS_BATCH_SIZE", 1):
+            await repo.purchase_stocks([("MSFT", 5), ("AAPL", 10), ("MSFT", 7)])
+
+        purchases_call, *totals_calls = mock_session.execute.call_args_list
+        assert [row["company_code"] for row in purchases_call[0][1]] == ["MSFT", "AAPL", "MSFT"]
+        totals_params = [call[0][0].compile(dialect=postgresql.dialect()).params for call in totals_calls]
+        assert [(params["company_code_m0"], params["total_amount_m0"]) for params in totals_params] == [
+            ("AAPL", 10),
+            ("MSFT", 12),
+        ]
+        mock_session.commit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_add_totals_past_32_bit_integers(self) -> None:
+        max_int4: int = 2**31 - 1
+        mock_session = MagicMock(spec=AsyncSession)
+        repo = PurchasesRepository(Settings(polygon_api_key=""), mock_session)
+
+        await repo.purchase_stocks([("AAPL", max_int4), ("AAPL", max_int4)])
+
+        totals_params = mock_session.execute.call_args_list[1][0][0].compile(dialect=postgresql.dialect()).params
+        assert totals_params["total_amount_m0"] == 2 * max_int4
+        create_sql: str = str(CreateTable(PurchaseTotals.__table__).compile(dialect=postgresql.dialect()))
+        assert "total_amount BIGINT NOT NULL" in create_sql
+
     @pytest.mark.asyncio
     async def test_calculate_total_amount(self) -> None:
         amount = 150.0
@@ -53,3 +99,13 @@ class TestPurchasesRepository:
 
         with pytest.raises(Exception, match="DB error"):
             await repo.purchase_stock(company_code="AAPL", amount=100)
+
+    @pytest.mark.asyncio
+    async def test_get_purchased_symbols(self) -> None:
+        mock_session = MagicMock(spec=AsyncSession)
+        mock_session.scalars.return_value = iter(["AAPL", "MSFT"])
+        repo = PurchasesRepository(Settings(polygon_api_key=""), mock_session)
+
+        purchased_symbols = await repo.get_purchased_symbols()
+
+        assert purchased_symbols == ["AAPL", "MSFT"]
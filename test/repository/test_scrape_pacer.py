@@ -0,0 +1,78 @@
+import time
+from collections.abc import Generator
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from app.app_config import Settings
+from app.repository.scrape_pacer import AdaptivePacer
+
+
+@pytest.fixture(autouse=True)
+def bypass_scrape_pacing() -> Generator[None, Any, None]:
+    yield
+
+
+def build_pacer(**settings_kwargs: Any) -> AdaptivePacer:
+    pacing_settings: dict[str, Any] = {
+        "marketwatch_pacing_initial_interval": 1.0,
+        "marketwatch_pacing_min_interval": 0.5,
+        "marketwatch_pacing_max_interval": 3.0,
+        "marketwatch_pacing_recovery_step": 0.25,
+    }
+    return AdaptivePacer(Settings(polygon_api_key="", **{**pacing_settings, **settings_kwargs}))
+
+
+class TestAdaptivePacer:
+    @pytest.mark.asyncio
+    async def test_space_scrapes_of_the_same_host(self) -> None:
+        pacer: AdaptivePacer = build_pacer(marketwatch_pacing_initial_interval=0.05)
+
+        start_time: float = time.monotonic()
+        await pacer.wait("www.marketwatch.com")
+        await pacer.wait("other.host")
+        first_scrape_time: float = time.monotonic() - start_time
+        await pacer.wait("www.marketwatch.com")
+        second_scrape_time: float = time.monotonic() - start_time
+
+        assert first_scrape_time < 0.03  # noqa: PLR2004
+        assert second_scrape_time >= 0.03  # noqa: PLR2004
+
+    def test_widen_spacing_on_captcha_up_to_max(self) -> None:
+        pacer: AdaptivePacer = build_pacer()
+
+        pacer.record("www.marketwatch.com", captcha=True)
+        assert pacer.snapshot()["www.marketwatch.com"]["interval"] == 2.0  # noqa: PLR2004
+        pacer.record("www.marketwatch.com", captcha=True)
+        assert pacer.snapshot()["www.marketwatch.com"]["interval"] == 3.0  # noqa: PLR2004
+
+    def test_narrow_spacing_only_while_captcha_rate_is_low(self) -> None:
+        pacer: AdaptivePacer = build_pacer(marketwatch_pacing_window=4, marketwatch_pacing_target_captcha_rate=0.25)
+        pacer.record("www.marketwatch.com", captcha=True)
+
+        pacer.record("www.marketwatch.com", captcha=False)
+        assert pacer.snapshot()["www.marketwatch.com"]["interval"] == 2.0  # noqa: PLR2004
+        for _ in range(2):
+            pacer.record("www.marketwatch.com", captcha=False)
+
+        snapshot: dict[str, float] = pacer.snapshot()["www.marketwatch.com"]
+        assert snapshot["captcha_rate"] == 0.25  # noqa: PLR2004
+        assert snapshot["interval"] == 1.75  # noqa: PLR2004
+
+    def test_never_narrow_below_min(self) -> None:
+        pacer: AdaptivePacer = build_pacer()
+        for _ in range(10):
+            pacer.record("www.marketwatch.com", captcha=False)
+
+        assert pacer.snapshot()["www.marketwatch.com"]["interval"] == 0.5  # noqa: PLR2004
+
+    @pytest.mark.asyncio
+    async def test_delay_next_slot_after_captcha(self) -> None:
+        pacer: AdaptivePacer = build_pacer()
+        pacer.record("www.marketwatch.com", captcha=True)
+
+        with patch("app.repository.scrape_pacer.asyncio.sleep") as mock_sleep:
+            await pacer.wait("www.marketwatch.com")
+
+        assert mock_sleep.call_args.args[0] > 1.9  # noqa: PLR2004
@@ -0,0 +1,112 @@
+import asyncio
+from unittest.mock import MagicMock, PropertyMock
+
+import pytest
+from selenium.common.exceptions import WebDriverException
+
+from app.repository.webdriver_pool import PooledWebDriver, WebDriverPool
+
+
+def driver_factory() -> MagicMock:
+    return MagicMock()
+
+
+class TestWebDriverPool:
+    @pytest.mark.asyncio
+    async def test_reuse_idle_session(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=10, max_age=60)
+        factory = MagicMock(side_effect=driver_factory)
+
+        async with pool.acquire(factory) as first:
+            pass
+        async with pool.acquire(factory) as second:
+            pass
+
+        assert first is second
+        factory.assert_called_once()
+        expected_uses = 2
+        assert second.uses == expected_uses
+
+    @pytest.mark.asyncio
+    async def test_recycle_session_after_max_uses(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=1, max_age=60)
+        factory = MagicMock(side_effect=driver_factory)
+
+        async with pool.acquire(factory) as first:
+            pass
+        async with pool.acquire(factory) as second:
+            pass
+
+        assert first is not second
+        first.driver.quit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_recycle_session_after_max_age(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=10, max_age=0)
+        factory = MagicMock(side_effect=driver_factory)
+
+        async with pool.acquire(factory) as first:
+            pass
+        async with pool.acquire(factory) as second:
+            pass
+
+        assert first is not second
+        first.driver.quit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_discard_session_when_borrower_fails(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=10, max_age=60)
+        factory = MagicMock(side_effect=driver_factory)
+
+        with pytest.raises(ValueError):
+            async with pool.acquire(factory) as first:
+                raise ValueError()
+        async with pool.acquire(factory) as second:
+            pass
+
+        assert first is not second
+        assert not first.healthy
+        first.driver.quit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_replace_session_failing_health_check(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=10, max_age=60)
+        dead_driver = MagicMock()
+        type(dead_driver).current_url = PropertyMock(side_effect=WebDriverException())
+        pool._idle.append(PooledWebDriver(dead_driver))
+
+        async with pool.acquire(driver_factory) as session:
+            assert session.driver is not dead_driver
+
+        dead_driver.quit.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_limit_concurrent_sessions_to_pool_size(self) -> None:
+        pool = WebDriverPool(size=2, max_uses=10, max_age=60)
+        borrowed = 0
+        max_borrowed = 0
+
+        async def borrow() -> None:
+            nonlocal borrowed, max_borrowed
+            async with pool.acquire(driver_factory):
+                borrowed += 1
+                max_borrowed = max(max_borrowed, borrowed)
+                await asyncio.sleep(0.01)
+                borrowed -= 1
+
+        await asyncio.gather(*(borrow() for _ in range(5)))
+
+        assert max_borrowed == pool.size
+
+    @pytest.mark.asyncio
+    async def test_close_quits_idle_sessions(self) -> None:
+        pool = WebDriverPool(size=1, max_uses=10, max_age=60)
+        async with pool.acquire(driver_factory) as session:
+            pass
+
+        await pool.close()
+
+        session.driver.quit.assert_called_once()
+        with pytest.raises(RuntimeError):
+            async with pool.acquire(driver_factory):
+                pass
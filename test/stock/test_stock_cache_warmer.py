@@ -0,0 +1,98 @@
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+from redis.exceptions import RedisError
+
+from app.app_config import Settings
+from app.executor import BoundedExecutor
+from app.repository.purchases_repository import PurchasesRepository
+from app.stocks.stock_cache_warmer import REQUESTED_SYMBOLS_KEY, StockCacheWarmer
+from app.stocks.stock_service import StockService, requested_symbols
+
+
+def build_warmer(redis: MagicMock | None = None, **settings_kwargs: object) -> StockCacheWarmer:
+    settings = Settings(polygon_api_key="", cache_warmer_rate=1000, **settings_kwargs)
+    executor = BoundedExecutor(max_workers=2, max_queue_depth=1, queue_timeout=1)
+    return StockCacheWarmer(settings=settings, executor=executor, redis=redis or AsyncMock())
+
+
+class TestStockCacheWarmer:
+    @pytest.mark.asyncio
+    async def test_watchlist_merges_configured_requested_and_purchased_symbols(self) -> None:
+        redis = AsyncMock()
+        redis.zrevrange.return_value = [b"MSFT", b"AAPL"]
+        warmer: StockCacheWarmer = build_warmer(redis, cache_warmer_watchlist=["aapl"], cache_warmer_top_symbols=2)
+
+        with (
+            patch("app.stocks.stock_cache_warmer.sessionmanager", MagicMock()),
+            patch.object(PurchasesRepository, "get_purchased_symbols", return_value=["GE", "MSFT"]),
+        ):
+            watchlist: list[str] = await warmer.get_watchlist()
+
+        assert watchlist == ["AAPL", "MSFT", "GE"]
+        redis.zrevrange.assert_called_once_with(REQUESTED_SYMBOLS_KEY, 0, 1)
+
+    @pytest.mark.asyncio
+    async def test_flush_trims_requested_symbols_to_top_symbols(self) -> None:
+        redis = MagicMock()
+        pipe = redis.pipeline.return_value.__aenter__.return_value = MagicMock(execute=AsyncMock())
+        redis.pipeline.return_value.__aexit__ = AsyncMock(return_value=None)
+        requested_symbols.take()
+        requested_symbols.restore({"AAPL": 2, "MSFT": 1})
+
+        await build_warmer(redis, cache_warmer_top_symbols=10).flush_requested_symbols()
+
+        pipe.zincrby.assert_any_call(REQUESTED_SYMBOLS_KEY, 2, "AAPL")
+        pipe.zremrangebyrank.assert_called_once_with(REQUESTED_SYMBOLS_KEY, 0, -11)
+        pipe.execute.assert_awaited_once()
+        assert requested_symbols.take() == {}
+
+    @pytest.mark.asyncio
+    async def test_keep_requested_symbols_when_flush_fails(self) -> None:
+        redis = MagicMock()
+        redis.pipeline.side_effect = RedisError("down")
+        requested_symbols.take()
+        requested_symbols.restore({"AAPL": 2})
+
+        await build_warmer(redis).flush_requested_symbols()
+
+        assert requested_symbols.take() == {"AAPL": 2}
+
+    @pytest.mark.asyncio
+    async def test_run_once_warms_each_symbol_and_counts_failures(self) -> None:
+        warmer: StockCacheWarmer = build_warmer()
+        with (
+            patch.object(StockCacheWarmer, "get_watchlist", return_value=["AAPL", "INVALID"]),
+            patch("app.stocks.stock_cache_warmer.sessionmanager", MagicMock()),
+            patch.object(
+                StockService, "warm_stock", side_effect=[3, HTTPException(status_code=404, detail="not found")]
+            ) as mock_warm_stock,
+            patch("app.stocks.stock_cache_warmer.get_yesterday", return_value=date(2024, 10, 14)),
+        ):
+            await warmer.run_once()
+
+        mock_warm_stock.assert_any_call("AAPL", date(2024, 10, 14), warmer.settings.cache_warmer_lead_time)
+        assert warmer.snapshot()["warmed_components"] == 3  # noqa: PLR2004
+        assert warmer.snapshot()["failed_symbols"] == 1
+
+    @pytest.mark.asyncio
+    async def test_wait_for_scraper_capacity(self) -> None:
+        warmer: StockCacheWarmer = build_warmer()
+        async with warmer.executor.admit():
+            with (
+                patch("app.stocks.stock_cache_warmer.CAPACITY_POLL_INTERVAL", 0.01),
+                patch.object(BoundedExecutor, "has_spare_capacity", side_effect=[False, False, True]),
+            ):
+                await warmer._wait_for_scraper_capacity()
+
+        assert warmer.snapshot()["capacity_waits"] == 1
+
+    @pytest.mark.asyncio
+    async def test_only_one_worker_warms_per_interval(self) -> None:
+        redis = AsyncMock()
+        redis.set.side_effect = [True, None]
+
+        assert await build_warmer(redis)._acquire_run()
+        assert not await build_warmer(redis)._acquire_run()
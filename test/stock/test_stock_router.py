@@ -1,4 +1,6 @@
-from datetime import date
+import json
+from collections.abc import AsyncIterator
+from datetime import UTC, date, datetime
 from typing import Any, Generator
 from unittest.mock import DEFAULT, AsyncMock, MagicMock, patch
 
@@ -8,6 +10,11 @@ from fastapi.testclient import TestClient
 from httpx import Response
 
 from app.app_config import Settings, get_settings
+from app.jobs.job_queue import ScrapeJobQueue
+from app.models.dto.daily_bars_history import DailyBar, DailyBarsHistory
+from app.models.dto.scrape_job import ScrapeJob, ScrapeJobStatus
+from app.models.dto.stock_response import BatchStockData, BatchStockItem, StockError
+from app.repository.purchases_repository import PurchasesRepository
 from app.stocks.stock_router import router
 from app.stocks.stock_service import StockService
 from test.constants import AAPL_EXPECTED_STOCK
@@ -21,7 +28,15 @@ app.dependency_overrides[get_settings] = lambda: Settings(polygon_api_key="")
 
 @pytest.fixture(scope="function")
 def mock_stock_service() -> Generator[dict[str, AsyncMock | MagicMock], Any, None]:
-    with patch.multiple(StockService, get_stock_by_symbol=DEFAULT, purchase_stock=DEFAULT) as mock:
+    with patch.multiple(
+        StockService,
+        get_stock_by_symbol=DEFAULT,
+        get_cached_stock_by_symbol=DEFAULT,
+        get_stocks_by_symbols=DEFAULT,
+        get_stock_history=DEFAULT,
+        iter_stock_history=DEFAULT,
+        purchase_stock=DEFAULT,
+    ) as mock:
         yield mock
 
 
@@ -33,7 +48,131 @@ def test_get_stock(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None
     )
 
 
+def test_get_stock_as_job(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
+    mock_stock_service["get_cached_stock_by_symbol"].return_value = None
+    job = ScrapeJob(
+        id="abc",
+        status=ScrapeJobStatus.QUEUED,
+        symbol="AAPL",
+        request_date=date(2024, 10, 10),
+        created_at=datetime(2024, 10, 11, tzinfo=UTC),
+    )
+    with patch.object(ScrapeJobQueue, "enqueue", return_value=job) as mock_enqueue:
+        response: Response = client.get(
+            "/stock/AAPL", params={"date": "2024-10-10"}, headers={"Prefer": "respond-async"}
+        )
+
+    mock_enqueue.assert_called_once_with(stock_symbol="AAPL", date=date(year=2024, month=10, day=10))
+    mock_stock_service["get_stock_by_symbol"].assert_not_called()
+    assert response.status_code == 202  # noqa: PLR2004
+    assert response.headers["Location"] == "/jobs/abc"
+    assert response.json()["status"] == "queued"
+
+
+def test_get_cached_stock_without_job(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
+    mock_stock_service["get_cached_stock_by_symbol"].return_value = AAPL_EXPECTED_STOCK
+    with patch.object(ScrapeJobQueue, "enqueue") as mock_enqueue:
+        response: Response = client.get(
+            "/stock/AAPL", params={"date": "2024-10-10"}, headers={"Prefer": "respond-async"}
+        )
+
+    mock_enqueue.assert_not_called()
+    mock_stock_service["get_stock_by_symbol"].assert_not_called()
+    assert response.status_code == 200  # noqa: PLR2004
+    assert response.json() == AAPL_EXPECTED_STOCK.model_dump(mode="json")
+
+
+def test_get_stocks(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
+    mock_stock_service["get_stocks_by_symbols"].return_value = BatchStockData(results={"AAPL": AAPL_EXPECTED_STOCK})
+    response: Response = client.get("/stock", params={"symbols": "AAPL,MSFT", "date": "2024-10-10"})
+    mock_stock_service["get_stocks_by_symbols"].assert_called_once_with(
+        stock_symbols=["AAPL", "MSFT"], date=date(year=2024, month=10, day=10)
+    )
+    assert list(response.json()["results"]) == ["AAPL"]
+
+
+def test_get_stock_history(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
+    mock_stock_service["get_stock_history"].return_value = DailyBarsHistory(symbol="AAPL")
+    response: Response = client.get("/stock/AAPL/history", params={"from": "2024-10-01", "to": "2024-10-10"})
+    mock_stock_service["get_stock_history"].assert_called_once_with(
+        stock_symbol="AAPL", from_date=date(year=2024, month=10, day=1), to_date=date(year=2024, month=10, day=10)
+    )
+    assert response.json()["symbol"] == "AAPL"
+
+
+def test_stream_stocks() -> None:
+    async def iter_items() -> AsyncIterator[BatchStockItem]:
+        yield BatchStockItem(symbol="AAPL", data=AAPL_EXPECTED_STOCK)
+        yield BatchStockItem(symbol="INVALID", error=StockError(status_code=404, detail="Stock INVALID not found"))
+
+    with patch.object(StockService, "iter_stocks_by_symbols", return_value=iter_items()) as mock_iter:
+        response: Response = client.get(
+            "/stock", params={"symbols": "AAPL,INVALID"}, headers={"Accept": "application/x-ndjson"}
+        )
+
+    mock_iter.assert_called_once()
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines: list[dict[str, Any]] = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["symbol"] for line in lines] == ["AAPL", "INVALID"]
+    assert lines[0]["data"]["company_code"] == AAPL_EXPECTED_STOCK.company_code
+    assert lines[1]["error"] == {"status_code": 404, "detail": "Stock INVALID not found"}
+
+
+def test_stream_stock_history(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
+    bars = [
+        DailyBar(date="2024-10-01", open=1.0, high=2.0, low=0.5, close=1.5, volume=100),
+        DailyBar(date="2024-10-02", open=1.5, high=2.5, low=1.0, close=2.0, volume=200),
+    ]
+
+    async def iter_bars() -> AsyncIterator[DailyBar]:
+        for bar in bars:
+            yield bar
+
+    mock_stock_service["iter_stock_history"].return_value = iter_bars()
+    response: Response = client.get(
+        "/stock/AAPL/history",
+        params={"from": "2024-10-01", "to": "2024-10-02"},
+        headers={"Accept": "application/x-ndjson"},
+    )
+
+    mock_stock_service["get_stock_history"].assert_not_called()
+    assert [json.loads(line) for line in response.text.splitlines()] == [bar.model_dump() for bar in bars]
+
+
 def test_purchase_stock(mock_stock_service: dict[str, AsyncMock | MagicMock]) -> None:
     response: Response = client.post("/stock/AAPL", json={"amount": 10})
     mock_stock_service["purchase_stock"].assert_called_once_with(stock_symbol="AAPL", amount=10)
     assert response.json() == {"message": "10 units of stock AAPL were added to your stock record."}
+
+
+@pytest.mark.parametrize(
+    "content, content_type",
+    [
+        pytest.param(json.dumps([{"symbol": "AAPL", "amount": 10}, {"symbol": "MSFT", "amount": 5}]), None, id="json"),
+        pytest.param(
+            '{"symbol": "AAPL", "amount": 10}\n{"symbol": "MSFT", "amount": 5}\n', "application/x-ndjson", id="ndjson"
+        ),
+        pytest.param("symbol,amount\r\nAAPL,10\r\nMSFT,5\r\n", "text/csv", id="csv"),
+    ],
+)
+def test_purchase_stocks_in_bulk(content: str, content_type: str | None) -> None:
+    headers: dict[str, str] = {"Content-Type": content_type or "application/json"}
+    with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+        response: Response = client.post("/stock/purchases:bulk", content=content, headers=headers)
+
+    assert response.status_code == 201  # noqa: PLR2004
+    mock_purchase_stocks.assert_called_once_with([("AAPL", 10), ("MSFT", 5)])
+    assert response.json()["rows"] == 2  # noqa: PLR2004
+    assert response.json()["symbols"] == 2  # noqa: PLR2004
+    assert response.json()["rows_per_second"] > 0
+
+
+def test_purchase_stocks_in_bulk_rejects_invalid_row() -> None:
+    with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+        response: Response = client.post(
+            "/stock/purchases:bulk", content="symbol,amount\nAAPL,10\nMSFT,many\n", headers={"Content-Type": "text/csv"}
+        )
+
+    assert response.status_code == 422  # noqa: PLR2004
+    assert response.json()["detail"].startswith("Invalid purchase on line 3")
+    mock_purchase_stocks.assert_not_called()
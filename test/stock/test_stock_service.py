@@ -1,41 +1,55 @@
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from datetime import date, datetime, tzinfo
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import HTTPException
 from pydantic import BaseModel
+from sqlalchemy.exc import OperationalError
 
+from app.app_config import Settings
+from app.cache import StaleWhileRevalidateCache
+from app.common.datetime_utils import MARKET_TIMEZONE
+from app.models.dto.daily_bars_history import DailyBar, DailyBarsHistory
 from app.models.dto.daily_open_close_stock import DailyOpenCloseStock
-from app.models.dto.stock_response import CompetitorData, PerformanceData, StockData
-from app.stocks.stock_service import StockService
+from app.models.dto.marketwatch_stock_page import MarketWatchStockPage
+from app.models.dto.stock_endpoint_models import BulkPurchaseEntry, BulkPurchaseResponse
+from app.models.dto.stock_response import BatchStockData, BatchStockItem, StockData
+from app.repository.daily_bars_repository import DailyBarsRepository
+from app.repository.open_close_stock_repository import OpenCloseStockRepository
+from app.repository.purchase_buffer import PurchaseBuffer
+from app.repository.purchases_repository import PurchasesRepository
+from app.stocks.stock_service import (
+    StockService,
+    failed_lookups,
+    invalid_symbols,
+    requested_symbols,
+)
 from test.constants import (
-    AAPL_COMPANY_NAME,
-    AAPL_COMPETITORS,
     AAPL_DAILY_OPEN_CLOSE_STOCK,
     AAPL_EXPECTED_STOCK,
-    AAPL_PERFORMANCE_DATA,
+    AAPL_MARKETWATCH_STOCK_PAGE,
     AAPL_PURCHASES_AMOUNT,
-    GE_COMPANY_NAME,
-    GE_COMPETITORS,
     GE_DAILY_OPEN_CLOSE_STOCK,
     GE_EXPECTED_STOCK,
-    GE_PERFORMANCE_DATA,
+    GE_MARKETWATCH_STOCK_PAGE,
     GE_PURCHASES_AMOUNT,
 )
 
 
 class MockValues(BaseModel):
     get_daily_open_close_sotck: DailyOpenCloseStock
-    get_stock_performance_by_symbol: PerformanceData
-    get_stock_competitors_by_symbol: list[CompetitorData]
-    get_company_name_by_symbol: str
+    get_stock_page: MarketWatchStockPage
     get_purchases_total_amount_by_symbol: float
 
 
 AAPL_MOCK_VALUES: MockValues = MockValues.model_validate(
     {
         "get_daily_open_close_sotck": AAPL_DAILY_OPEN_CLOSE_STOCK,
-        "get_stock_performance_by_symbol": AAPL_PERFORMANCE_DATA,
-        "get_stock_competitors_by_symbol": AAPL_COMPETITORS,
-        "get_company_name_by_symbol": AAPL_COMPANY_NAME,
+        "get_stock_page": AAPL_MARKETWATCH_STOCK_PAGE,
         "get_purchases_total_amount_by_symbol": AAPL_PURCHASES_AMOUNT,
     }
 )
@@ -43,9 +57,7 @@ AAPL_MOCK_VALUES: MockValues = MockValues.model_validate(
 GE_MOCK_VALUES: MockValues = MockValues.model_validate(
     {
         "get_daily_open_close_sotck": GE_DAILY_OPEN_CLOSE_STOCK,
-        "get_stock_performance_by_symbol": GE_PERFORMANCE_DATA,
-        "get_stock_competitors_by_symbol": GE_COMPETITORS,
-        "get_company_name_by_symbol": GE_COMPANY_NAME,
+        "get_stock_page": GE_MARKETWATCH_STOCK_PAGE,
         "get_purchases_total_amount_by_symbol": GE_PURCHASES_AMOUNT,
     }
 )
@@ -79,23 +91,119 @@ class TestStockService:
         mock_open_close_stock_repository[
             "get_daily_open_close_sotck"
         ].return_value = mock_values.get_daily_open_close_sotck
-        mock_marketwatch_repository[
-            "get_stock_performance_by_symbol"
-        ].return_value = mock_values.get_stock_performance_by_symbol
-        mock_marketwatch_repository[
-            "get_stock_competitors_by_symbol"
-        ].return_value = mock_values.get_stock_competitors_by_symbol
-        mock_marketwatch_repository["get_company_name_by_symbol"].return_value = mock_values.get_company_name_by_symbol
+        mock_marketwatch_repository["get_stock_page"].return_value = mock_values.get_stock_page
         mock_purchases_repository[
             "get_purchases_total_amount_by_symbol"
         ].return_value = mock_values.get_purchases_total_amount_by_symbol
 
-        stock_service = StockService(settings=MagicMock(), session=MagicMock())
-        stock_data: StockData = await stock_service.get_stock_by_symbol(
-            mock_values.get_daily_open_close_sotck.symbol, mock_values.get_daily_open_close_sotck.date
-        )
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with patch("app.stocks.stock_service.logger") as mock_logger:
+            stock_data: StockData = await stock_service.get_stock_by_symbol(
+                mock_values.get_daily_open_close_sotck.symbol,
+                date.fromisoformat(mock_values.get_daily_open_close_sotck.date),
+            )
 
         assert expected_stock.model_dump() == stock_data.model_dump()
+        timings_log: str = mock_logger.info.call_args.args[-1]
+        assert all(f"{source}=" in timings_log for source in ("open_close", "marketwatch_page", "purchased_amount"))
+
+    @pytest.mark.asyncio
+    async def test_fetch_page_sources_concurrently_after_open_close(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        source_delay = 0.2
+
+        def delayed(value: Any) -> Callable[..., Awaitable[Any]]:
+            async def side_effect(*args, **kwargs) -> Any:
+                await asyncio.sleep(source_delay)
+                return value
+
+            return side_effect
+
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].side_effect = delayed(
+            AAPL_DAILY_OPEN_CLOSE_STOCK
+        )
+        mock_marketwatch_repository["get_stock_page"].side_effect = delayed(AAPL_MARKETWATCH_STOCK_PAGE)
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].side_effect = delayed(AAPL_PURCHASES_AMOUNT)
+
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        start_time = time.perf_counter()
+        await stock_service.get_stock_by_symbol("AAPL", date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date))
+
+        # The open/close and the purchased amount, then the page and the company name, each pair concurrently.
+        assert time.perf_counter() - start_time < source_delay * 3
+
+    @pytest.mark.asyncio
+    async def test_raise_gateway_timeout_when_deadline_exceeded(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+        caplog: pytest.LogCaptureFixture,
+    ) -> None:
+        async def never_answers(*args, **kwargs) -> None:
+            await asyncio.sleep(60)
+
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].return_value = AAPL_DAILY_OPEN_CLOSE_STOCK
+        mock_marketwatch_repository["get_stock_page"].side_effect = never_answers
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].return_value = AAPL_PURCHASES_AMOUNT
+
+        stock_service = StockService(
+            settings=Settings(polygon_api_key="", stock_aggregation_timeout=0.1), session=MagicMock()
+        )
+        with pytest.raises(HTTPException) as excinfo:
+            await stock_service.get_stock_by_symbol("AAPL", date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date))
+
+        error_status_code = 504
+        assert excinfo.value.status_code == error_status_code
+        assert "'open_close'" in caplog.text
+
+    @pytest.mark.asyncio
+    async def test_propagate_source_error(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].side_effect = HTTPException(status_code=404)
+
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with pytest.raises(HTTPException) as excinfo:
+            await stock_service.get_stock_by_symbol("INVALID", date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date))
+
+        error_status_code = 404
+        assert excinfo.value.status_code == error_status_code
+        mock_marketwatch_repository["get_stock_page"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_count_only_resolved_symbols_while_counting_is_enabled(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].side_effect = [
+            AAPL_DAILY_OPEN_CLOSE_STOCK,
+            HTTPException(status_code=404),
+            AAPL_DAILY_OPEN_CLOSE_STOCK,
+        ]
+        mock_marketwatch_repository["get_stock_page"].return_value = AAPL_MARKETWATCH_STOCK_PAGE
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].return_value = AAPL_PURCHASES_AMOUNT
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        request_date: date = date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date)
+
+        with patch.object(requested_symbols, "enabled", True):
+            await stock_service.get_stock_by_symbol("AAPL", request_date)
+            with pytest.raises(HTTPException):
+                await stock_service.get_stock_by_symbol("TYPO", request_date)
+            counts: dict[str, int] = requested_symbols.take()
+        await stock_service.get_stock_by_symbol("AAPL", request_date)
+
+        assert counts == {"AAPL": 1}
+        assert requested_symbols.take() == {}
 
     @pytest.mark.parametrize(
         "symbol, amount",
@@ -117,3 +225,397 @@ class TestStockService:
         await stock_service.purchase_stock(symbol, amount)
 
         mock_purchase_stock.assert_called_once_with(company_code=symbol, amount=amount)
+
+    @pytest.mark.asyncio
+    async def test_purchase_stock_through_running_buffer(
+        self, mock_purchases_repository: dict[str, MagicMock | AsyncMock]
+    ) -> None:
+        with (
+            patch.object(PurchaseBuffer, "running", True),
+            patch.object(PurchaseBuffer, "purchase_stock") as mock_buffered_purchase,
+        ):
+            await StockService(settings=MagicMock(), session=MagicMock()).purchase_stock("AAPL", 10)
+
+        mock_buffered_purchase.assert_called_once_with(company_code="AAPL", amount=10)
+        mock_purchases_repository["purchase_stock"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_purchase_stocks_counts_each_symbol_once(self) -> None:
+        async def iter_entries() -> AsyncIterator[BulkPurchaseEntry]:
+            for symbol, amount in [("AAPL", 10), ("MSFT", 5), ("AAPL", 1)]:
+                yield BulkPurchaseEntry(symbol=symbol, amount=amount)
+
+        with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+            response: BulkPurchaseResponse = await StockService(
+                settings=Settings(polygon_api_key=""), session=MagicMock()
+            ).purchase_stocks(iter_entries())
+
+        mock_purchase_stocks.assert_called_once_with([("AAPL", 10), ("MSFT", 5), ("AAPL", 1)])
+        assert (response.rows, response.symbols) == (3, 2)
+
+    @pytest.mark.asyncio
+    async def test_purchase_stocks_rejects_too_many_rows(self) -> None:
+        async def iter_entries() -> AsyncIterator[BulkPurchaseEntry]:
+            for _ in range(3):
+                yield BulkPurchaseEntry(symbol="AAPL", amount=1)
+
+        stock_service = StockService(
+            settings=Settings(polygon_api_key="", purchase_bulk_max_rows=2), session=MagicMock()
+        )
+        with patch.object(PurchasesRepository, "purchase_stocks") as mock_purchase_stocks:
+            with pytest.raises(HTTPException) as exp:
+                await stock_service.purchase_stocks(iter_entries())
+
+        assert exp.value.status_code == 413  # noqa: PLR2004
+        mock_purchase_stocks.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_get_stock_history_serves_upstream_bars_when_database_fails(self) -> None:
+        upstream_bars = [
+            DailyBar(date="2023-10-02", open=151.0, high=156.0, low=150.0, close=155.0, volume=2000000),
+        ]
+        with (
+            patch.object(OpenCloseStockRepository, "get_daily_bars", return_value=upstream_bars),
+            patch.object(
+                DailyBarsRepository, "get_daily_bars", side_effect=OperationalError("SELECT", {}, Exception())
+            ),
+        ):
+            stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+            history: DailyBarsHistory = await stock_service.get_stock_history(
+                "AAPL", date(2023, 10, 1), date(2023, 10, 2)
+            )
+
+        assert history.dates == ["2023-10-02"]
+
+    @pytest.mark.asyncio
+    async def test_get_stock_history_merges_stored_bars(self) -> None:
+        upstream_bars = [
+            DailyBar(date="2023-10-02", open=151.0, high=156.0, low=150.0, close=155.0, volume=2000000),
+        ]
+        with (
+            patch.object(OpenCloseStockRepository, "get_daily_bars", return_value=upstream_bars),
+            patch.object(DailyBarsRepository, "get_daily_bars", return_value=[AAPL_DAILY_OPEN_CLOSE_STOCK]),
+        ):
+            stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+            history: DailyBarsHistory = await stock_service.get_stock_history(
+                "AAPL", date(2023, 10, 1), date(2023, 10, 2)
+            )
+
+        assert history.model_dump() == {
+            "symbol": "AAPL",
+            "dates": ["2023-10-01", "2023-10-02"],
+            "open": [150.0, 151.0],
+            "high": [155.0, 156.0],
+            "low": [149.0, 150.0],
+            "close": [154.0, 155.0],
+            "volume": [1000000, 2000000],
+        }
+
+    @pytest.mark.asyncio
+    async def test_get_stock_history_rejects_inverted_range(self) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with pytest.raises(HTTPException) as excinfo:
+            await stock_service.get_stock_history("AAPL", date(2023, 10, 2), date(2023, 10, 1))
+
+        error_status_code = 400
+        assert excinfo.value.status_code == error_status_code
+
+    @pytest.mark.asyncio
+    async def test_get_stocks_by_symbols_reports_partial_failures(self) -> None:
+        requested: list[str] = []
+
+        async def get_stock_by_symbol(stock_symbol: str, date: date) -> StockData:
+            requested.append(stock_symbol)
+            if stock_symbol == "INVALID":
+                raise HTTPException(status_code=404, detail="Stock INVALID not found")
+            if stock_symbol == "BROKEN":
+                raise ValueError()
+            return AAPL_EXPECTED_STOCK
+
+        with (
+            patch("app.stocks.stock_service.sessionmanager", MagicMock()),
+            patch.object(StockService, "get_stock_by_symbol", side_effect=get_stock_by_symbol),
+        ):
+            stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+            batch: BatchStockData = await stock_service.get_stocks_by_symbols(
+                ["AAPL", " aapl", "INVALID", "BROKEN", ""], date(2023, 10, 1)
+            )
+
+        assert sorted(requested) == ["AAPL", "BROKEN", "INVALID"]
+        assert list(batch.results) == ["AAPL"]
+        assert batch.errors["INVALID"].model_dump() == {"status_code": 404, "detail": "Stock INVALID not found"}
+        error_status_code = 500
+        assert batch.errors["BROKEN"].status_code == error_status_code
+
+    @pytest.mark.asyncio
+    async def test_get_stocks_by_symbols_bounds_concurrency(self) -> None:
+        running = 0
+        max_running = 0
+
+        async def get_stock_by_symbol(stock_symbol: str, date: date) -> StockData:
+            nonlocal running, max_running
+            running += 1
+            max_running = max(max_running, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return AAPL_EXPECTED_STOCK
+
+        settings = Settings(polygon_api_key="", batch_max_concurrency=2)
+        with (
+            patch("app.stocks.stock_service.sessionmanager", MagicMock()),
+            patch.object(StockService, "get_stock_by_symbol", side_effect=get_stock_by_symbol),
+        ):
+            await StockService(settings=settings, session=MagicMock()).get_stocks_by_symbols(
+                [f"S{index}" for index in range(6)], date(2023, 10, 1)
+            )
+
+        assert max_running == settings.batch_max_concurrency
+
+    @pytest.mark.asyncio
+    async def test_get_stocks_by_symbols_rejects_too_many_symbols(self) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key="", batch_max_symbols=1), session=MagicMock())
+        with pytest.raises(HTTPException) as excinfo:
+            await stock_service.get_stocks_by_symbols(["AAPL", "GE"], date(2023, 10, 1))
+
+        error_status_code = 400
+        assert excinfo.value.status_code == error_status_code
+
+    @pytest.mark.asyncio
+    async def test_iter_stocks_by_symbols_yields_in_completion_order(self) -> None:
+        delays: dict[str, float] = {"SLOW": 0.2, "FAST": 0.0}
+
+        async def get_stock_by_symbol(stock_symbol: str, date: date) -> StockData:
+            await asyncio.sleep(delays[stock_symbol])
+            return AAPL_EXPECTED_STOCK
+
+        with (
+            patch("app.stocks.stock_service.sessionmanager", MagicMock()),
+            patch.object(StockService, "get_stock_by_symbol", side_effect=get_stock_by_symbol),
+        ):
+            stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+            items: AsyncIterator[BatchStockItem] = stock_service.iter_stocks_by_symbols(
+                ["SLOW", "FAST"], date(2023, 10, 1)
+            )
+            start_time = time.perf_counter()
+            first_item: BatchStockItem = await anext(items)
+            first_item_time: float = time.perf_counter() - start_time
+            remaining: list[BatchStockItem] = [item async for item in items]
+
+        assert first_item.symbol == "FAST"
+        assert first_item_time < delays["SLOW"]
+        assert [item.symbol for item in remaining] == ["SLOW"]
+
+    def test_iter_stocks_by_symbols_validates_before_streaming(self) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with pytest.raises(HTTPException):
+            stock_service.iter_stocks_by_symbols([""], date(2023, 10, 1))
+
+    @pytest.mark.asyncio
+    async def test_cache_each_component_separately(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].return_value = AAPL_DAILY_OPEN_CLOSE_STOCK
+        mock_marketwatch_repository["get_stock_page"].return_value = AAPL_MARKETWATCH_STOCK_PAGE
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].return_value = AAPL_PURCHASES_AMOUNT
+        cache_keys: list[tuple[str, str]] = []
+
+        async def get(
+            cache: StaleWhileRevalidateCache[Any],
+            key: str,
+            compute: Callable[[], Awaitable[Any]],
+            ttl: int | None = None,
+        ) -> Any:
+            cache_keys.append((cache.namespace, key))
+            return await compute()
+
+        with patch.object(StaleWhileRevalidateCache, "get", get):
+            stock_data: StockData = await StockService(
+                settings=Settings(polygon_api_key=""), session=MagicMock()
+            ).get_stock_by_symbol("AAPL", date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date))
+
+        assert stock_data.model_dump() == AAPL_EXPECTED_STOCK.model_dump()
+        assert sorted(cache_keys) == [
+            ("company_name", "AAPL"),
+            ("marketwatch_page", "AAPL"),
+            ("open_close", f"AAPL:{AAPL_DAILY_OPEN_CLOSE_STOCK.date}"),
+        ]
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].assert_called_once_with("AAPL")
+
+    @pytest.mark.parametrize(
+        "cached_namespaces, expected_stock",
+        [
+            pytest.param({"open_close", "marketwatch_page", "company_name"}, AAPL_EXPECTED_STOCK, id="all-cached"),
+            pytest.param({"open_close", "company_name"}, None, id="page-missing"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_get_cached_stock_without_upstream_call(
+        self,
+        cached_namespaces: set[str],
+        expected_stock: StockData | None,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].return_value = AAPL_PURCHASES_AMOUNT
+        cached_values: dict[str, Any] = {
+            "open_close": AAPL_DAILY_OPEN_CLOSE_STOCK,
+            "marketwatch_page": AAPL_MARKETWATCH_STOCK_PAGE,
+            "company_name": AAPL_MARKETWATCH_STOCK_PAGE.company_name,
+        }
+
+        async def peek(cache: StaleWhileRevalidateCache[Any], key: str) -> Any:
+            return cached_values[cache.namespace] if cache.namespace in cached_namespaces else None
+
+        with patch.object(StaleWhileRevalidateCache, "peek", peek):
+            stock_data: StockData | None = await StockService(
+                settings=Settings(polygon_api_key=""), session=MagicMock()
+            ).get_cached_stock_by_symbol("aapl", date.fromisoformat(AAPL_DAILY_OPEN_CLOSE_STOCK.date))
+
+        assert stock_data == expected_stock
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].assert_not_called()
+        mock_marketwatch_repository["get_stock_page"].assert_not_called()
+
+    @pytest.mark.parametrize(
+        "now, expected_ttl",
+        [
+            pytest.param(datetime(2023, 10, 2, 11, 0), 60, id="trading-hours"),
+            pytest.param(datetime(2023, 10, 2, 17, 0), 60, id="after-hours"),
+            pytest.param(datetime(2023, 10, 2, 8, 0), 60, id="pre-market"),
+            pytest.param(datetime(2023, 10, 3, 11, 0), 31536000, id="final-session"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_cache_open_close_briefly_until_session_is_final(
+        self,
+        now: datetime,
+        expected_ttl: int,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+        mock_purchases_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].return_value = AAPL_DAILY_OPEN_CLOSE_STOCK
+        mock_marketwatch_repository["get_stock_page"].return_value = AAPL_MARKETWATCH_STOCK_PAGE
+        mock_purchases_repository["get_purchases_total_amount_by_symbol"].return_value = AAPL_PURCHASES_AMOUNT
+        ttls: dict[str, int | None] = {}
+
+        async def get(
+            cache: StaleWhileRevalidateCache[Any],
+            key: str,
+            compute: Callable[[], Awaitable[Any]],
+            ttl: int | None = None,
+        ) -> Any:
+            ttls[cache.namespace] = ttl
+            return await compute()
+
+        class MarketClock(datetime):
+            @classmethod
+            def now(cls, tz: tzinfo | None = None) -> datetime:
+                return now.replace(tzinfo=MARKET_TIMEZONE).astimezone(tz)
+
+        with (
+            patch.object(StaleWhileRevalidateCache, "get", get),
+            patch("app.common.market_calendar.datetime", MarketClock),
+        ):
+            await StockService(settings=Settings(polygon_api_key=""), session=MagicMock()).get_stock_by_symbol(
+                "AAPL", date(2023, 10, 2)
+            )
+
+        assert ttls["open_close"] == expected_ttl
+
+    @pytest.mark.asyncio
+    async def test_warm_upstream_components(self) -> None:
+        warmed_keys: list[tuple[str, str]] = []
+
+        async def warm(
+            cache: StaleWhileRevalidateCache[Any],
+            key: str,
+            compute: Callable[[], Awaitable[Any]],
+            ttl: int | None = None,
+            lead_time: int = 0,
+        ) -> bool:
+            warmed_keys.append((cache.namespace, key))
+            return cache.namespace != "company_name"
+
+        with patch.object(StaleWhileRevalidateCache, "warm", warm):
+            warmed: int = await StockService(settings=Settings(polygon_api_key=""), session=MagicMock()).warm_stock(
+                "AAPL", date(2024, 10, 14), lead_time=600
+            )
+
+        expected_warmed = 2
+        assert warmed == expected_warmed
+        assert sorted(warmed_keys) == [
+            ("company_name", "AAPL"),
+            ("marketwatch_page", "AAPL"),
+            ("open_close", "AAPL:2024-10-14"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_answer_invalid_symbol_without_upstream_call(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+        mock_marketwatch_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with (
+            patch.object(invalid_symbols, "check", side_effect=HTTPException(status_code=404)),
+            pytest.raises(HTTPException),
+        ):
+            await stock_service.get_stock_by_symbol("INVALID", date(2024, 10, 14))
+
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].assert_not_called()
+        mock_marketwatch_repository["get_stock_page"].assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_normalize_symbol_before_negative_caches(
+        self,
+        mock_open_close_stock_repository: dict[str, MagicMock | AsyncMock],
+    ) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with (
+            patch.object(invalid_symbols, "check", new_callable=AsyncMock) as mock_invalid_check,
+            patch.object(failed_lookups, "check", side_effect=HTTPException(status_code=500)) as mock_failed_check,
+            pytest.raises(HTTPException),
+        ):
+            await stock_service.get_stock_by_symbol(" aapl", date(2024, 10, 14))
+
+        mock_invalid_check.assert_awaited_once_with("AAPL")
+        mock_failed_check.assert_called_once_with("AAPL:2024-10-14")
+        mock_open_close_stock_repository["get_daily_open_close_sotck"].assert_not_called()
+
+    @pytest.mark.parametrize(
+        "lookup_date, status_code, known_symbol, expected_cache, expected_ttl",
+        [
+            pytest.param(date(2024, 10, 14), 404, False, "invalid_symbol", 86400, id="unknown-symbol"),
+            pytest.param(date(2024, 10, 14), 404, True, "failed_lookup", 300, id="not-listed-yet"),
+            pytest.param(date(2024, 10, 12), 404, True, "failed_lookup", 31536000, id="weekend"),
+            pytest.param(date(2024, 10, 14), 500, True, "failed_lookup", 5, id="upstream-failure"),
+            pytest.param(date(2024, 10, 14), 504, True, None, None, id="timeout"),
+        ],
+    )
+    @pytest.mark.asyncio
+    async def test_remember_failure(
+        self,
+        lookup_date: date,
+        status_code: int,
+        known_symbol: bool,
+        expected_cache: str | None,
+        expected_ttl: int | None,
+    ) -> None:
+        stock_service = StockService(settings=Settings(polygon_api_key=""), session=MagicMock())
+        with (
+            patch.object(OpenCloseStockRepository, "is_known_symbol", return_value=known_symbol),
+            patch.object(invalid_symbols, "remember") as mock_invalid_symbol,
+            patch.object(failed_lookups, "remember") as mock_failed_lookup,
+        ):
+            await stock_service._remember_failure("AAPL", lookup_date, HTTPException(status_code=status_code))
+
+        remembered: dict[str, AsyncMock] = {"invalid_symbol": mock_invalid_symbol, "failed_lookup": mock_failed_lookup}
+        for cache_name, mock_remember in remembered.items():
+            if cache_name == expected_cache:
+                assert mock_remember.call_args.args[-1] == expected_ttl
+            else:
+                mock_remember.assert_not_called()
@@ -0,0 +1,260 @@
+import asyncio
+import json
+from collections.abc import AsyncIterator, Generator
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from fastapi import HTTPException
+
+from app.cache import (
+    LayeredBackend,
+    MemoryTier,
+    NegativeCache,
+    StaleWhileRevalidateCache,
+    cache_tier_metrics,
+    escape_glob,
+    pending_refreshes,
+    settings,
+)
+
+
+@pytest.fixture(autouse=True)
+def bypass_shared_cache() -> Generator[None, Any, None]:
+    with patch.object(settings, "cache_lock_poll_interval", 0.01):
+        yield
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.values: dict[str, str] = {}
+
+    async def set(self, key: str, value: str, nx: bool = False, px: int | None = None) -> bool | None:
+        if nx and key in self.values:
+            return None
+        self.values[key] = value
+        return True
+
+    async def eval(self, script: str, numkeys: int, key: str, token: str) -> int:
+        if self.values.get(key) != token:
+            return 0
+        del self.values[key]
+        return 1
+
+
+class FakeBackend:
+    def __init__(self) -> None:
+        self.redis = FakeRedis()
+        self.entries: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.entries.get(key)
+
+    async def set(self, key: str, value: bytes, expire: int | None = None) -> None:
+        self.entries[key] = value
+
+
+def build_swr_cache(backend: FakeBackend, ttl: int = 60) -> StaleWhileRevalidateCache[int]:
+    swr_cache: StaleWhileRevalidateCache[int] = StaleWhileRevalidateCache(
+        namespace="ns", type_=int, ttl=ttl, stale_ttl=60
+    )
+    swr_cache.backend = backend
+    return swr_cache
+
+
+def build_backend(redis: MagicMock | None = None) -> LayeredBackend:
+    backend = LayeredBackend(
+        memory=MemoryTier(max_entries=10, max_bytes=1024, max_ttl=60),
+        redis=redis or MagicMock(),
+        channel="invalidate",
+    )
+    backend.remote = AsyncMock()
+    return backend
+
+
+class TestMemoryTier:
+    def test_evict_least_recently_used(self) -> None:
+        memory = MemoryTier(max_entries=2, max_bytes=1024, max_ttl=60)
+        memory.set("a", b"1")
+        memory.set("b", b"2")
+        memory.get_with_ttl("a")
+        memory.set("c", b"3")
+
+        assert memory.get_with_ttl("b") == (0, None)
+        assert memory.get_with_ttl("a")[1] == b"1"
+        assert memory.get_with_ttl("c")[1] == b"3"
+
+    def test_evict_to_stay_under_byte_budget(self) -> None:
+        memory = MemoryTier(max_entries=10, max_bytes=4, max_ttl=60)
+        memory.set("a", b"12")
+        memory.set("b", b"34")
+        memory.set("c", b"56")
+        memory.set("too-large", b"12345")
+
+        assert memory.get_with_ttl("a") == (0, None)
+        assert memory.get_with_ttl("too-large") == (0, None)
+        expected_size = 4
+        assert memory.size_bytes == expected_size
+
+    def test_cap_ttl(self) -> None:
+        memory = MemoryTier(max_entries=10, max_bytes=1024, max_ttl=5)
+        memory.set("a", b"1", expire=60)
+
+        ttl, _ = memory.get_with_ttl("a")
+        max_ttl = 5
+        assert ttl <= max_ttl
+
+    def test_clear_namespace(self) -> None:
+        memory = MemoryTier(max_entries=10, max_bytes=1024, max_ttl=60)
+        memory.set("ns:/stock/AAPL:1", b"1")
+        memory.set("ns:/stock/AAPL/history:1", b"2")
+
+        assert memory.clear(namespace="ns:/stock/AAPL") == 1
+        assert memory.get_with_ttl("ns:/stock/AAPL/history:1")[1] == b"2"
+
+
+class TestLayeredBackend:
+    @pytest.mark.asyncio
+    async def test_read_through_memory_then_redis(self) -> None:
+        cache_tier_metrics.hits.clear()
+        cache_tier_metrics.misses.clear()
+        backend: LayeredBackend = build_backend()
+        backend.remote.get_with_ttl.return_value = (30, b"cached")
+
+        assert await backend.get_with_ttl("key") == (30, b"cached")
+        assert (await backend.get_with_ttl("key"))[1] == b"cached"
+
+        backend.remote.get_with_ttl.assert_called_once_with("key")
+        assert cache_tier_metrics.snapshot() == {
+            "memory": {"hits": 1, "misses": 1, "hit_rate": 0.5},
+            "redis": {"hits": 1, "misses": 0, "hit_rate": 1.0},
+        }
+
+    @pytest.mark.asyncio
+    async def test_clear_publishes_invalidation(self) -> None:
+        async def scan_iter(match: str) -> AsyncIterator[bytes]:
+            yield b"ns:/stock/AAPL:1"
+
+        redis = MagicMock(scan_iter=scan_iter, delete=AsyncMock(return_value=1), publish=AsyncMock())
+        backend: LayeredBackend = build_backend(redis)
+        await backend.set("ns:/stock/AAPL:1", b"cached", 60)
+
+        assert await backend.clear(namespace="ns:/stock/AAPL") == 1
+        assert backend.memory.get_with_ttl("ns:/stock/AAPL:1") == (0, None)
+        redis.delete.assert_called_once_with(b"ns:/stock/AAPL:1")
+        redis.publish.assert_called_once_with("invalidate", json.dumps({"namespace": "ns:/stock/AAPL", "key": None}))
+
+    @pytest.mark.asyncio
+    async def test_apply_invalidations_from_other_workers(self) -> None:
+        received = asyncio.Event()
+
+        async def listen() -> AsyncIterator[dict[str, Any]]:
+            yield {"type": "subscribe", "data": 1}
+            yield {"type": "message", "data": json.dumps({"namespace": None, "key": "key"}).encode()}
+            received.set()
+            await asyncio.sleep(60)
+
+        pubsub = MagicMock(subscribe=AsyncMock(), listen=listen)
+        pubsub.__aenter__ = AsyncMock(return_value=pubsub)
+        pubsub.__aexit__ = AsyncMock(return_value=None)
+        backend: LayeredBackend = build_backend(MagicMock(pubsub=MagicMock(return_value=pubsub), close=AsyncMock()))
+        backend.memory.set("key", b"cached")
+
+        backend.start()
+        await asyncio.wait_for(received.wait(), timeout=1)
+        await backend.close()
+
+        assert backend.memory.get_with_ttl("key") == (0, None)
+        pubsub.subscribe.assert_called_once_with("invalidate")
+
+
+class TestEscapeGlob:
+    def test_escape_glob(self) -> None:
+        assert escape_glob("ns:/stock/A*[B]?") == "ns:/stock/A\\*\\[B\\]\\?"
+
+
+class TestStaleWhileRevalidateCache:
+    @pytest.mark.asyncio
+    async def test_coalesce_concurrent_misses(self) -> None:
+        compute = AsyncMock(return_value=1)
+
+        async def slow_compute() -> int:
+            await asyncio.sleep(0.05)
+            return await compute()
+
+        backend = FakeBackend()
+        first_worker: StaleWhileRevalidateCache[int] = build_swr_cache(backend)
+        second_worker: StaleWhileRevalidateCache[int] = build_swr_cache(backend)
+
+        values: list[int] = await asyncio.gather(
+            *(worker.get("AAPL", slow_compute) for worker in (first_worker, first_worker, second_worker))
+        )
+
+        assert values == [1, 1, 1]
+        compute.assert_called_once()
+        assert backend.redis.values == {}
+
+    @pytest.mark.asyncio
+    async def test_serve_stale_value_while_refreshing(self) -> None:
+        compute = AsyncMock(side_effect=[1, 2])
+        swr_cache: StaleWhileRevalidateCache[int] = build_swr_cache(FakeBackend(), ttl=0)
+
+        assert await swr_cache.get("AAPL", compute) == 1
+        assert await swr_cache.get("AAPL", compute) == 1
+        await asyncio.gather(*pending_refreshes)
+
+        expected_calls = 2
+        assert compute.call_count == expected_calls
+        assert await swr_cache.get("AAPL", compute) == expected_calls
+
+    @pytest.mark.asyncio
+    async def test_peek_without_computing(self) -> None:
+        compute = AsyncMock(side_effect=[1, 2])
+        swr_cache: StaleWhileRevalidateCache[int] = build_swr_cache(FakeBackend(), ttl=0)
+
+        assert await swr_cache.peek("AAPL") is None
+        await swr_cache.get("AAPL", compute)
+
+        assert await swr_cache.peek("AAPL") == 1
+        # The value is already stale, yet peeking never starts a refresh.
+        await asyncio.sleep(0.01)
+        compute.assert_called_once()
+
+    @pytest.mark.asyncio
+    async def test_recompute_when_peer_fails(self) -> None:
+        backend = FakeBackend()
+        backend.redis.values["fastapi-cache:ns:AAPL:lock"] = "peer"
+
+        async def release_peer_lock() -> None:
+            await asyncio.sleep(0.05)
+            del backend.redis.values["fastapi-cache:ns:AAPL:lock"]
+
+        release = asyncio.ensure_future(release_peer_lock())
+        value: int = await build_swr_cache(backend).get("AAPL", AsyncMock(return_value=1))
+        await release
+
+        assert value == 1
+
+    @pytest.mark.asyncio
+    async def test_warm_only_values_about_to_expire(self) -> None:
+        compute = AsyncMock(side_effect=[1, 2])
+        swr_cache: StaleWhileRevalidateCache[int] = build_swr_cache(FakeBackend(), ttl=60)
+
+        assert await swr_cache.warm("AAPL", compute, lead_time=30)
+        assert not await swr_cache.warm("AAPL", compute, lead_time=30)
+        assert await swr_cache.warm("AAPL", compute, lead_time=90)
+        assert await swr_cache.get("AAPL", compute) == 2  # noqa: PLR2004
+
+
+class TestNegativeCache:
+    @pytest.mark.asyncio
+    async def test_raise_remembered_error(self) -> None:
+        negative_cache = NegativeCache(namespace="ns")
+        negative_cache.backend = FakeBackend()
+        await negative_cache.check("AAPL")
+
+        await negative_cache.remember("AAPL", HTTPException(status_code=404, detail="Stock AAPL not found"), 60)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await negative_cache.check("AAPL")
+        assert (excinfo.value.status_code, excinfo.value.detail) == (404, "Stock AAPL not found")
@@ -0,0 +1,86 @@
+import asyncio
+import threading
+
+import pytest
+from pydantic import ValidationError
+
+from app.app_config import Settings
+from app.executor import BoundedExecutor, ExecutorSaturatedError
+
+
+class TestBoundedExecutor:
+    @pytest.mark.asyncio
+    async def test_run_blocking_function(self) -> None:
+        executor = BoundedExecutor(max_workers=1, max_queue_depth=1, queue_timeout=1)
+        async with executor.admit():
+            thread_name: str = await executor.run(lambda: threading.current_thread().name)
+        executor.shutdown()
+
+        assert thread_name.startswith("scraper")
+        assert executor.snapshot()["admitted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_reject_when_queue_is_full(self) -> None:
+        executor = BoundedExecutor(max_workers=1, max_queue_depth=1, queue_timeout=1)
+        release = asyncio.Event()
+
+        async def hold_slot() -> None:
+            async with executor.admit():
+                await release.wait()
+
+        holder = asyncio.ensure_future(hold_slot())
+        waiter = asyncio.ensure_future(hold_slot())
+        await asyncio.sleep(0)
+
+        assert executor.queue_depth == 1
+        with pytest.raises(ExecutorSaturatedError):
+            async with executor.admit():
+                pass
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert executor.snapshot()["rejected"] == 1
+        expected_admitted = 2
+        assert executor.snapshot()["admitted"] == expected_admitted
+
+    @pytest.mark.asyncio
+    async def test_reject_when_queue_wait_times_out(self) -> None:
+        executor = BoundedExecutor(max_workers=1, max_queue_depth=5, queue_timeout=0.05)
+
+        async with executor.admit():
+            with pytest.raises(ExecutorSaturatedError):
+                async with executor.admit():
+                    pass
+
+        assert executor.queue_depth == 0
+        assert executor.snapshot()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_limit_active_to_max_workers(self) -> None:
+        executor = BoundedExecutor(max_workers=2, max_queue_depth=10, queue_timeout=1)
+        max_active = 0
+
+        async def work() -> None:
+            nonlocal max_active
+            async with executor.admit():
+                max_active = max(max_active, executor.active)
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert max_active == executor.max_workers
+        assert executor.snapshot()["max_wait"] > 0
+
+    @pytest.mark.asyncio
+    async def test_spare_capacity_keeps_reserved_slots_free(self) -> None:
+        executor = BoundedExecutor(max_workers=2, max_queue_depth=1, queue_timeout=1)
+
+        assert executor.has_spare_capacity(reserved=1)
+        async with executor.admit():
+            assert executor.has_spare_capacity(reserved=0)
+            assert not executor.has_spare_capacity(reserved=1)
+
+
+def test_webdriver_pool_covers_every_scraper_worker() -> None:
+    with pytest.raises(ValidationError, match="must be at least SCRAPER_MAX_WORKERS"):
+        Settings(polygon_api_key="", webdriver_pool_size=2, scraper_max_workers=4)
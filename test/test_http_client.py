@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+from pydantic import ValidationError
+
+from app.app_config import Settings
+from app.http_client import HttpClientManager, get_polygon_client, polygon_client_manager
+
+
+class TestHttpClientManager:
+    @pytest.mark.asyncio
+    async def test_start_with_local_transport(self) -> None:
+        manager = HttpClientManager()
+        manager.start(transport=httpx.MockTransport(lambda request: httpx.Response(200, json={"ok": True})))
+
+        response: httpx.Response = await manager.client.get("https://example.com")
+
+        assert response.json() == {"ok": True}
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_client_is_reused(self) -> None:
+        manager = HttpClientManager()
+
+        assert manager.client is manager.client
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_client_recreated_after_close(self) -> None:
+        manager = HttpClientManager()
+        first: httpx.AsyncClient = manager.client
+        await manager.close()
+
+        assert manager.client is not first
+        assert first.is_closed
+        await manager.close()
+
+    @pytest.mark.asyncio
+    async def test_get_polygon_client_returns_shared_client(self) -> None:
+        assert await get_polygon_client() is polygon_client_manager.client
+
+
+def test_http2_requires_h2_package() -> None:
+    with patch("app.app_config.importlib.util.find_spec", return_value=None):
+        with pytest.raises(ValidationError, match="requires the h2 package"):
+            Settings(polygon_api_key="", polygon_http2=True)